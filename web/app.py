@@ -1,17 +1,28 @@
 import eventlet
 eventlet.monkey_patch()
-from flask import Flask, render_template, request, redirect, url_for, jsonify, session
+from flask import Flask, render_template, request, redirect, url_for, jsonify, session, g
 from functools import wraps
 from werkzeug.security import check_password_hash
-from flask_socketio import SocketIO, emit
+from flask_socketio import SocketIO, emit, join_room, leave_room
 import psutil
 import time
 import os
-import sqlite3
 import json
 import threading
 from pathlib import Path
 
+import fragcache
+import metrics
+from certdb import CertDB, parse_user
+from filewatch import CachedFile, FileWatcher
+from fragcache import FragmentCache
+from httpbody import VersionedBody
+from livedelta import LiveState
+from proctrack import ProcessTracker
+from spatial import ClusterGrid, GridIndex, pad_bbox, parse_bbox
+from tracks import TrackStore, simplify
+from whazzup import ClientTableDiff, WhazzupCache
+
 # --------------------------------------------------------
 # KONFIG
 # -------------------------------------------------------
@@ -29,17 +40,14 @@ DB_PATH = UNIX_DIR / "cert.sqlitedb3"
 STATUS_FILE = LOG_DIR / "status.json"
 
 LOG_DIR.mkdir(parents=True, exist_ok=True)
-last_mtime = 0
-
-LIVE_CACHE_LOCK = threading.Lock()
-LIVE_CACHE = {
-    "clients": [],
-    "ts": 0,
-    "bot": {"connected": False, "since": None},
-}
 
 BOT_CID = os.environ.get("FSD_BOT_CID", "999999").strip()
 
+# Benutzerverwaltung: Verbindungspool + Index auf der numerischen CID (siehe certdb.py)
+CERT_DB = CertDB(DB_PATH, exclude_cid=BOT_CID)
+USERS_PER_PAGE = int(os.environ.get("FSD_USERS_PER_PAGE", "50"))
+USERS_MAX_PER_PAGE = 500
+
 
 app = Flask(__name__)
 # Session benötigt secret_key (bitte nicht leer lassen)
@@ -69,21 +77,283 @@ def require_admin(view):
     return wrapped
 
 
-socketio = SocketIO(app, cors_allowed_origins="*")
+# fragcache als json-Modul: vorab encodierte Client-Fragmente werden beim Emit eingesetzt
+socketio = SocketIO(app, cors_allowed_origins="*", json=fragcache)
 
 
 # ------------------
 # Live Cache
 # ------------------
 
+# Clients kommen als Keyframe/Delta vom Observer (siehe livedelta.py). Jeder Push baut
+# einen neuen LIVE_STATE (das veröffentlichte dict wird nie verändert)
+LIVE_STATE = LiveState()
+# callsign -> encodierter Client; gültig, solange LIVE_STATE dasselbe dict hält
+LIVE_FRAGS = FragmentCache()
+# Leser und der Referenztausch eines Pushes; der Aufbau (Zustand, Gitter, Regionen,
+# Deltas) und die Emits laufen nur unter LIVE_APPLY_LOCK (Pushes nacheinander)
 LIVE_CACHE_LOCK = threading.Lock()
+LIVE_APPLY_LOCK = threading.Lock()
 LIVE_CACHE = {
-    "clients": [],
     "ts": 0,
     "bot": {"connected": False, "since": None},
+    # /api/live_snapshot: einmal pro Update encodiert (httpbody.VersionedBody)
+    "body": None,
+    "updated": time.time(),
 }
 
 
+# Positionen der Live-Clients im Gitter für bbox-Abfragen, mit laufenden Summen pro
+# Zelle für Cluster (siehe spatial.py)
+LIVE_GRID = ClusterGrid(float(os.environ.get("FSD_GRID_DEG", "1")))
+# Positionsverlauf pro Flugzeug für /api/track (feste Ringgröße, Gesamtgrenze in MB)
+TRACKS_LOCK = threading.Lock()
+TRACKS = TrackStore(
+    samples=int(os.environ.get("FSD_TRACK_SAMPLES", "128")),
+    max_bytes=int(float(os.environ.get("FSD_TRACK_MEMORY_MB", "64")) * 1024 * 1024),
+    min_interval=float(os.environ.get("FSD_TRACK_INTERVAL", "5")),
+)
+# unterhalb dieses Zooms liefern Snapshot-API und Karten-Abos Cluster statt Flugzeuge
+CLUSTER_ZOOM = float(os.environ.get("FSD_CLUSTER_ZOOM", "6"))
+# Cluster-Abos bekommen höchstens so oft (Sekunden) einen neuen Stand
+CLUSTER_INTERVAL = float(os.environ.get("FSD_CLUSTER_INTERVAL", "2"))
+
+
+def live_client_fragments(callsigns=None):
+    """
+    Live-Clients als Fragmente (alle oder nur callsigns); nur geänderte Clients
+    werden neu encodiert. Aufruf unter LIVE_CACHE_LOCK (Leser) oder LIVE_APPLY_LOCK
+    (Emit nach dem Tausch).
+    """
+    clients = LIVE_STATE.clients
+    if callsigns is not None:
+        return [LIVE_FRAGS.lookup(cs, clients[cs]) or LIVE_FRAGS.put(cs, clients[cs], clients[cs])
+                for cs in callsigns]
+    frags = [LIVE_FRAGS.lookup(cs, c) or LIVE_FRAGS.put(cs, c, c) for cs, c in clients.items()]
+    LIVE_FRAGS.retain(clients)
+    return frags
+
+
+def live_snapshot_payload(callsigns=None):
+    """Live-Stand als Keyframe (Snapshot-API, neue Sockets). Lock wie live_client_fragments."""
+    return {
+        "type": "full",
+        "epoch": LIVE_STATE.epoch,
+        "seq": LIVE_STATE.seq,
+        "clients": live_client_fragments(callsigns),
+        "ts": LIVE_CACHE["ts"],
+        "bot": LIVE_CACHE["bot"],
+    }
+
+
+# Karten-Abos: jede Karte abonniert die Regionen (FSD_MAP_REGION_DEG-Kacheln) ihres
+# Ausschnitts und bekommt nur Flugzeuge, die dort eintreten, sich bewegen oder sie verlassen.
+# Ab FSD_MAP_MAX_REGIONS Regionen (Weltansicht) wären das mehr Nachrichten als der
+# komplette Strom -> solche Karten hängen wie die Dashboards im LIVE_ROOM.
+# Status, whazzup usw. gehen nur an DASHBOARD_ROOM.
+DASHBOARD_ROOM = "dashboard"
+LIVE_ROOM = "live"
+MAP_REGIONS = GridIndex(float(os.environ.get("FSD_MAP_REGION_DEG", "5")))
+# Gitter + Regionen doppelt: ein Push schreibt ins Standby-Paar (außerhalb des Locks) und
+# tauscht es dann gegen das aktive; das alte zieht beim nächsten Push die Änderungen nach
+_INDEX_STANDBY = (ClusterGrid(LIVE_GRID.cell_deg), GridIndex(MAP_REGIONS.cell_deg))
+# [(callsign, lat, lon)] des letzten Pushes, lat None = entfernt
+_INDEX_BACKLOG = []
+MAP_MAX_REGIONS = int(os.environ.get("FSD_MAP_MAX_REGIONS", "100"))
+# sid -> abonnierte Regionen, Region -> Anzahl Abonnenten, Karten im LIVE_ROOM
+MAP_VIEWS = {}
+MAP_SUBSCRIBERS = {}
+MAP_WIDE = set()
+# Cluster-Modus: sid -> (Kachelfaktor, Ausschnitt um eine Kachel erweitert); jede Karte
+# bekommt nur die Cluster ihres Ausschnitts
+MAP_CLUSTERS = {}
+_last_cluster_emit = 0.0
+# Update innerhalb der Drossel -> ein nachlaufender Emit am Ende des Fensters ist geplant
+_cluster_trailing = False
+
+
+def region_room(region):
+    return f"map:{region}"
+
+
+# ------------------
+# Metriken (/metrics, siehe metrics.py)
+# ------------------
+METRICS = metrics.REGISTRY
+# pro Endpoint eine Serie, angelegt beim ersten Request
+REQUEST_SECONDS = {}
+EMIT_SECONDS = METRICS.histogram("fsd_web_live_emit_seconds",
+                                 "Socket.IO fan-out time per accepted live update")
+LIVE_UPDATES = METRICS.counter("fsd_web_live_updates_total", "Accepted live updates from the observer")
+LIVE_RESYNCS = METRICS.counter("fsd_web_live_resyncs_total", "Live updates rejected with 409 (sequence gap)")
+
+
+def _room_size(room):
+    return sum(1 for _ in socketio.server.manager.get_participants("/", room))
+
+
+METRICS.gauge("fsd_web_dashboards", "Connected dashboard sockets", fn=lambda: _room_size(DASHBOARD_ROOM))
+METRICS.gauge("fsd_web_map_sockets", "Connected map sockets",
+              fn=lambda: len(MAP_VIEWS.keys() | MAP_CLUSTERS.keys() | MAP_WIDE))
+METRICS.gauge("fsd_web_map_regions", "Map regions with at least one subscriber",
+              fn=lambda: sum(1 for n in MAP_SUBSCRIBERS.values() if n > 0))
+METRICS.gauge("fsd_web_live_clients", "Aircraft in the live state", fn=lambda: len(LIVE_STATE.clients))
+METRICS.gauge("fsd_web_tracks", "Aircraft with a position history", fn=lambda: len(TRACKS))
+METRICS.counter("fsd_web_tracks_evicted_total", "Position histories evicted at FSD_TRACK_MEMORY_MB",
+                fn=lambda: TRACKS.evicted)
+
+
+@app.before_request
+def metrics_request_start():
+    g.metrics_t0 = time.perf_counter()
+
+
+@app.after_request
+def metrics_request_end(resp):
+    endpoint = request.endpoint
+    t0 = g.get("metrics_t0")
+    if endpoint is not None and t0 is not None:
+        hist = REQUEST_SECONDS.get(endpoint)
+        if hist is None:
+            hist = REQUEST_SECONDS[endpoint] = METRICS.histogram(
+                "fsd_web_request_seconds", "HTTP handling time per endpoint", labels={"endpoint": endpoint})
+        hist.observe(time.perf_counter() - t0)
+    return resp
+
+
+def cluster_payload(factor, bbox=None):
+    """Cluster als [kachel, lat, lon, anzahl]; mit bbox nur die, deren Mittelpunkt darin liegt."""
+    clusters = LIVE_GRID.clusters(factor)
+    if bbox is not None:
+        west, south, east, north = bbox
+        wrap = west > east
+        clusters = [c for c in clusters if south <= c[1] <= north
+                    and ((c[2] >= west or c[2] <= east) if wrap else west <= c[2] <= east)]
+    return {
+        "type": "clusters",
+        "cell_deg": factor * LIVE_GRID.cell_deg,
+        "clusters": [[key, round(lat, 4), round(lon, 4), n] for key, lat, lon, n in clusters],
+    }
+
+
+def index_live_update(msg, before, clients, grid, regions, ts):
+    """
+    Gitter und Karten-Regionen (Standby-Paar) sowie Tracks nachziehen: Keyframe ->
+    alle geänderten Clients (before = Client-dicts vor dem Keyframe), Delta -> nur
+    die genannten. Liefert (Region -> {"added", "changed", "removed"}, Änderungen
+    für _INDEX_BACKLOG). Aufruf unter LIVE_APPLY_LOCK und TRACKS_LOCK.
+    """
+    events = {}
+    ops = []
+
+    def event(region):
+        ev = events.get(region)
+        if ev is None:
+            ev = events[region] = {"region": region, "added": [], "changed": [], "removed": []}
+        return ev
+
+    def drop(cs):
+        grid.remove(cs)
+        TRACKS.discard(cs)
+        ops.append((cs, None, None))
+        region = regions.cell_of(cs)
+        if region is not None:
+            regions.remove(cs)
+            event(region)["removed"].append(cs)
+
+    if msg.get("type", "full") == "full":
+        for cs in [cs for cs in regions if cs not in clients]:
+            drop(cs)
+        # unveränderte Clients behalten beim Keyframe ihr dict (LiveState.apply)
+        touched = [(cs, c) for cs, c in clients.items() if before.get(cs) is not c]
+    else:
+        for cs in msg.get("removed", ()):
+            drop(cs)
+        touched = [(c["callsign"], c) for c in msg.get("added", ())]
+        touched += [(c["callsign"], c) for c in msg.get("changed", ())]
+
+    for cs, change in touched:
+        c = clients.get(cs)
+        if c is None:
+            continue
+        if not grid.update(cs, c.get("lat"), c.get("lon")):
+            drop(cs)
+            continue
+        ops.append((cs, c["lat"], c["lon"]))
+        if "lat" in change or "lon" in change:
+            hdg = c.get("hdg_deg_round")
+            TRACKS.record(cs, c.get("ts") or ts, float(c["lat"]), float(c["lon"]),
+                          c.get("alt", 0), c.get("gs", 0), c.get("hdg_deg") if hdg is None else hdg)
+        old = regions.cell_of(cs)
+        regions.update(cs, c["lat"], c["lon"])
+        new = regions.cell_of(cs)
+        if old == new:
+            # Bewegung innerhalb der Region: nur die geänderten Felder
+            event(new)["changed"].append(change)
+        else:
+            if old is not None:
+                event(old)["removed"].append(cs)
+            event(new)["added"].append(LIVE_FRAGS.lookup(cs, c) or LIVE_FRAGS.put(cs, c, c))
+    return events, ops
+
+
+def replay_index(grid, regions, ops):
+    """Änderungen eines Pushes (index_live_update) auf das andere Gitter/Regionen-Paar übertragen."""
+    for cs, lat, lon in ops:
+        if lat is None:
+            grid.remove(cs)
+            regions.remove(cs)
+        else:
+            grid.update(cs, lat, lon)
+            regions.update(cs, lat, lon)
+
+
+def emit_region_updates(events):
+    for region, ev in events.items():
+        if MAP_SUBSCRIBERS.get(region):
+            socketio.emit("map_region", ev, to=region_room(region))
+
+
+def emit_cluster_updates():
+    """Neuer Cluster-Stand an alle Cluster-Abos (gedrosselt). Aufruf unter LIVE_APPLY_LOCK."""
+    global _last_cluster_emit, _cluster_trailing
+    if not MAP_CLUSTERS:
+        return
+    now = time.monotonic()
+    wait = _last_cluster_emit + CLUSTER_INTERVAL - now
+    if wait > 0:
+        # sonst bliebe der Stand stehen, wenn die Updates innerhalb des Fensters aufhören
+        if not _cluster_trailing:
+            _cluster_trailing = True
+            socketio.start_background_task(_trailing_cluster_emit, wait)
+        return
+    _last_cluster_emit = now
+    # Kopie: handle_map_view ändert die Abos unter LIVE_CACHE_LOCK. Pro Karte ein Emit mit
+    # ihrem Ausschnitt; clusters() ist pro Faktor gecacht, gefiltert wird über Kacheln
+    for sid, (factor, bbox) in list(MAP_CLUSTERS.items()):
+        socketio.emit("map_clusters", cluster_payload(factor, bbox), to=sid)
+
+
+def _trailing_cluster_emit(delay):
+    global _cluster_trailing
+    socketio.sleep(delay)
+    with LIVE_APPLY_LOCK:
+        _cluster_trailing = False
+        emit_cluster_updates()
+
+
+def map_region_snapshot(regions):
+    """Region -> alle Clients darin (Fragmente). Aufruf unter LIVE_CACHE_LOCK."""
+    clients = LIVE_STATE.clients
+    out = {}
+    for region in regions:
+        members = MAP_REGIONS.members(region)
+        if members:
+            out[region] = [LIVE_FRAGS.lookup(cs, clients[cs]) or LIVE_FRAGS.put(cs, clients[cs], clients[cs])
+                           for cs in members]
+    return out
+
+
 
 
 # -------------------------------------------------------------------
@@ -120,53 +390,48 @@ def logout():
 @app.route("/fsd-data.json")
 @app.route("/api/fsd-data")
 def api_fsd_data_json():
-    if not FSD_DATA_JSON_PATH.exists():
-        return jsonify({
-            "general": {
-                "version": 3,
-                "reload": 1,
-                "update": "",
-                "update_timestamp": "",
-                "connected_clients": 0,
-                "unique_users": 0
-            },
-            "pilots": [],
-            "controllers": [],
-            "atis": [],
-            "servers": [],
-            "prefiles": [],
-            "facilities": [],
-            "ratings": [],
-            "pilot_ratings": []
-        })
-
-    with open(FSD_DATA_JSON_PATH, "r", encoding="utf-8") as f:
-        return app.response_class(
-            response=f.read(),
-            status=200,
-            mimetype="application/json"
-        )
-
-
+    return FSD_DATA.get().respond(request, app.response_class)
 
 
 # -------------------------------------------------------------------
-# Datei-Watcher (überwacht status.json auf Änderungen)
+# Datei-Watcher: status.json, whazzup.txt und fsd-data.json liegen geparst im
+# Speicher; neu gelesen wird nur, wenn inotify eine Änderung meldet
+# (Fallback: stat() alle FSD_WATCH_POLL Sekunden). Registriert weiter unten.
 # -------------------------------------------------------------------
-def watch_status_file():
-    global last_mtime
-    while True:
-        if STATUS_FILE.exists():
-            mtime = STATUS_FILE.stat().st_mtime
-            if mtime != last_mtime:
-                last_mtime = mtime
-                try:
-                    with open(STATUS_FILE, "r") as f:
-                        data = json.load(f)
-                        socketio.emit("status_update", data)
-                except Exception as e:
-                    print("⚠️ Fehler beim Lesen von status.json:", e)
-        time.sleep(2)
+FILE_WATCHER = FileWatcher(
+    poll_interval=float(os.environ.get("FSD_WATCH_POLL", os.environ.get("FSD_WHAZZUP_POLL", "2"))),
+    use_inotify=os.environ.get("FSD_WATCH_INOTIFY", "1") != "0",
+)
+STATUS_DATA = CachedFile(STATUS_FILE, json.load)
+# fsd-data.json wird unverändert ausgeliefert; ETag/gzip einmal pro Dateiversion
+FSD_DATA_EMPTY = {
+    "general": {
+        "version": 3,
+        "reload": 1,
+        "update": "",
+        "update_timestamp": "",
+        "connected_clients": 0,
+        "unique_users": 0
+    },
+    "pilots": [],
+    "controllers": [],
+    "atis": [],
+    "servers": [],
+    "prefiles": [],
+    "facilities": [],
+    "ratings": [],
+    "pilot_ratings": []
+}
+FSD_DATA = CachedFile(
+    FSD_DATA_JSON_PATH,
+    lambda f: VersionedBody(f.read(), os.fstat(f.fileno()).st_mtime),
+    missing=VersionedBody(json.dumps(FSD_DATA_EMPTY).encode("utf-8")),
+)
+
+
+def on_status_file(cached):
+    if cached.value is not None:
+        socketio.emit("status_update", cached.value, to=DASHBOARD_ROOM)
 
 
 # -------------------------------------------------------------------
@@ -175,50 +440,113 @@ def watch_status_file():
 @socketio.on("connect")
 def handle_connect():
     print("✅ WebSocket verbunden:", request.sid)
+    # Karte (io({query: {view: "map"}})) meldet danach ihren Ausschnitt per "map_view"
+    if request.args.get("view") == "map":
+        return
+    join_room(DASHBOARD_ROOM)
+    join_room(LIVE_ROOM)
     emit("fsd_status", get_fsd_status_payload())
-    if STATUS_FILE.exists():
+    emit("whazzup_clients", WHAZZUP_DIFF.snapshot())
+    data = STATUS_DATA.get()
+    if data is not None:
         try:
-            with open(STATUS_FILE, "r") as f:
-                data = json.load(f)
-                emit("status_update", data)
+            emit("status_update", data)
             with LIVE_CACHE_LOCK:
-                emit("live_clients", LIVE_CACHE)
+                emit("live_clients", live_snapshot_payload())
         except:
             pass
 
 
+@socketio.on("map_view")
+def handle_map_view(data):
+    """
+    Karte meldet ihren Ausschnitt: {"bbox": "west,south,east,north", "zoom": z, "reset": bool}.
+    Antwort "map_view":
+      {"mode": "regions", "regions": [...], "enter": {region: [clients]}} – Clients
+        der neu hinzugekommenen (bei reset: aller) Regionen, danach "map_region"
+      {"mode": "all", "full": <Keyframe>} – zu großer Ausschnitt, danach
+        live_clients/live_delta wie die Dashboards
+      {"mode": "clusters", "cell_deg": d, "clusters": [...]} – zoom < CLUSTER_ZOOM,
+        danach "map_clusters" (nur dieser Ausschnitt) alle CLUSTER_INTERVAL Sekunden
+    """
+    if not isinstance(data, dict):
+        return
+    bbox = parse_bbox(str(data.get("bbox", "")))
+    if bbox is None:
+        return
+    zoom = data.get("zoom")
+    zoom = float(zoom) if isinstance(zoom, (int, float)) else None
+    sid = request.sid
+    with LIVE_CACHE_LOCK:
+        factor = LIVE_GRID.cluster_factor(zoom) if zoom is not None and zoom < CLUSTER_ZOOM else None
+        regions = set() if factor else MAP_REGIONS.cells(bbox)
+        wide = len(regions) > MAP_MAX_REGIONS
+        regions = set() if wide else set(regions)
+        old = MAP_VIEWS.get(sid, set())
+        for region in old - regions:
+            leave_room(region_room(region))
+            MAP_SUBSCRIBERS[region] -= 1
+        for region in regions - old:
+            join_room(region_room(region))
+            MAP_SUBSCRIBERS[region] = MAP_SUBSCRIBERS.get(region, 0) + 1
+        MAP_VIEWS[sid] = regions
+
+        old_clusters = MAP_CLUSTERS.pop(sid, None)
+        if factor is not None:
+            # Rand um eine Kachel: Cluster knapp außerhalb erscheinen beim Verschieben sofort
+            MAP_CLUSTERS[sid] = (factor, pad_bbox(bbox, factor * LIVE_GRID.cell_deg))
+
+        was_wide = sid in MAP_WIDE
+        if wide:
+            MAP_WIDE.add(sid)
+            join_room(LIVE_ROOM)
+            emit("map_view", {"mode": "all", "full": live_snapshot_payload()})
+            return
+        if was_wide:
+            MAP_WIDE.discard(sid)
+            leave_room(LIVE_ROOM)
+        if factor is not None:
+            emit("map_view", dict(cluster_payload(*MAP_CLUSTERS[sid]), mode="clusters"))
+            return
+        enter = regions if data.get("reset") or was_wide or old_clusters is not None else regions - old
+        emit("map_view", {"mode": "regions", "regions": sorted(regions),
+                          "enter": map_region_snapshot(enter)})
+
+
+@socketio.on("disconnect")
+def handle_disconnect(*args):
+    with LIVE_CACHE_LOCK:
+        MAP_WIDE.discard(request.sid)
+        for region in MAP_VIEWS.pop(request.sid, ()):
+            MAP_SUBSCRIBERS[region] -= 1
+        MAP_CLUSTERS.pop(request.sid, None)
 
 
+@socketio.on("whazzup_resync")
+def handle_whazzup_resync():
+    # Client hat eine Lücke in der Sequenz bemerkt
+    emit("whazzup_clients", WHAZZUP_DIFF.snapshot())
 
 
-# === FSD-Prozessprüfung ===
-def get_fsd_process():
-    target = os.path.realpath(str(FSD_PATH))
 
-    for proc in psutil.process_iter(['pid', 'exe', 'cmdline']):
-        try:
-            exe = proc.info.get('exe')
-            cmd = proc.info.get('cmdline')
 
-            # 1) sauberster Fall: exe-Pfad stimmt exakt
-            if exe and os.path.realpath(exe) == target:
-                return proc
 
-            # 2) Fallback: erstes cmdline-Argument ist das Binary
-            if cmd and len(cmd) > 0 and os.path.realpath(cmd[0]) == target:
-                return proc
+# === FSD-Prozessprüfung ===
+# PID einmal suchen, danach nur PID + create_time prüfen (siehe proctrack.py)
+FSD_PROCESS = ProcessTracker(FSD_PATH, scan_interval=float(os.environ.get("FSD_PROC_SCAN_INTERVAL", "5")))
 
-        except (psutil.NoSuchProcess, psutil.AccessDenied):
-            continue
-        except Exception:
-            continue
+# Status wird höchstens einmal pro Intervall berechnet; Broadcaster, /api/status und
+# neue Sockets bekommen dasselbe Ergebnis
+STATUS_INTERVAL = float(os.environ.get("FSD_STATUS_INTERVAL", "1"))
+_status_lock = threading.Lock()
+_status_cache = {"at": float("-inf"), "payload": None}
 
-    return None
 
+def get_fsd_process():
+    return FSD_PROCESS.get()
 
-def get_fsd_status_payload():
-    proc = get_fsd_process()
 
+def compute_fsd_status_payload():
     # Systemwerte (Host)
     try:
         cpu_pct = psutil.cpu_percent(interval=None)  # non-blocking; "letztes Intervall"
@@ -232,145 +560,102 @@ def get_fsd_status_payload():
         ram_used_mb = None
         ram_total_mb = None
 
-    if not proc:
-        return {
-            "status": "stopped",
-            "pid": None,
-            "uptime_sec": 0,
-            "cpu_percent": cpu_pct,
-            "ram_percent": ram_pct,
-            "ram_used_mb": ram_used_mb,
-            "ram_total_mb": ram_total_mb,
-        }
+    payload = {
+        "status": "stopped",
+        "pid": None,
+        "uptime_sec": 0,
+        "cpu_percent": cpu_pct,
+        "ram_percent": ram_pct,
+        "ram_used_mb": ram_used_mb,
+        "ram_total_mb": ram_total_mb,
+        # FSD-Prozess selbst
+        "fsd_cpu_percent": None,
+        "fsd_rss_mb": None,
+    }
 
     try:
-        pid = proc.pid
-        uptime_sec = int(time.time() - proc.create_time())
-        return {
-            "status": "running",
-            "pid": pid,
-            "uptime_sec": uptime_sec,
-            "cpu_percent": cpu_pct,
-            "ram_percent": ram_pct,
-            "ram_used_mb": ram_used_mb,
-            "ram_total_mb": ram_total_mb,
-        }
+        proc = FSD_PROCESS.sample()
     except Exception as e:
-        return {
-            "status": f"error: {e}",
-            "pid": None,
-            "uptime_sec": 0,
-            "cpu_percent": cpu_pct,
-            "ram_percent": ram_pct,
-            "ram_used_mb": ram_used_mb,
-            "ram_total_mb": ram_total_mb,
-        }
+        payload["status"] = f"error: {e}"
+        return payload
+
+    if proc:
+        payload.update({
+            "status": "running",
+            "pid": proc["pid"],
+            "uptime_sec": proc["uptime_sec"],
+            "fsd_cpu_percent": proc["cpu_percent"],
+            "fsd_rss_mb": proc["rss_mb"],
+        })
+    return payload
+
+
+def get_fsd_status_payload():
+    with _status_lock:
+        now = time.monotonic()
+        if _status_cache["payload"] is None or now - _status_cache["at"] >= STATUS_INTERVAL:
+            _status_cache["payload"] = compute_fsd_status_payload()
+            _status_cache["at"] = now
+        return _status_cache["payload"]
 
 
 def status_broadcaster():
     # Sendet kontinuierlich Live-Status an alle verbundenen Clients
     while True:
-        socketio.emit("fsd_status", get_fsd_status_payload())
+        socketio.emit("fsd_status", get_fsd_status_payload(), to=DASHBOARD_ROOM)
         socketio.sleep(1)  # eventlet-/gevent-freundlich
 
 
 
 
 # === Whazzup.txt Parser ===
+# geparster Stand im Speicher; neu gelesen nur, wenn der Server die Datei ersetzt hat
+WHAZZUP = WhazzupCache(WHAZZUP_PATH)
+
+
 def parse_whazzup_clients():
-    clients = []
+    return WHAZZUP.get().clients
 
-    if not os.path.exists(WHAZZUP_PATH):
-        print(f"⚠️ Datei nicht gefunden: {WHAZZUP_PATH}")
-        return clients
 
-    try:
-        with open(WHAZZUP_PATH, "r", encoding="utf-8", errors="ignore") as f:
-            lines = f.readlines()
-
-        in_clients = False
-        for line in lines:
-            line = line.strip()
-            if not line:
-                continue
-
-            if line.startswith("!CLIENTS"):
-                in_clients = True
-                continue
-            elif line.startswith("!SERVERS"):
-                break
-
-            if in_clients and not line.startswith(";"):
-                parts = line.split(":")
-
-                if len(parts) < 8:
-                    continue
-
-                callsign = parts[0]
-                cid = parts[1]
-                realname = parts[2]
-
-                if parts[3].upper() in ["PILOT", "ATC"]:
-                    client_type = parts[3]
-                    lat = parts[5]
-                    lon = parts[6]
-                    alt = parts[7] if len(parts) > 7 else "0"
-                else:
-                    client_type = "UNKNOWN"
-                    lat = parts[4]
-                    lon = parts[5]
-                    alt = parts[6] if len(parts) > 6 else "0"
-
-                clients.append({
-                    "callsign": callsign,
-                    "cid": cid,
-                    "realname": realname,
-                    "type": client_type,
-                    "lat": lat,
-                    "lon": lon,
-                    "alt": alt
-                })
-
-        print(f"✅ {len(clients)} Clients erfolgreich geparst.")
-        return clients
+# Dashboards bekommen die Client-Tabelle per Socket.IO: Snapshot beim Connect,
+# danach nur Zeilen-Diffs – sobald der Datei-Watcher eine neue whazzup.txt meldet.
+WHAZZUP_DIFF = ClientTableDiff()
 
-    except Exception as e:
-        print(f"❌ Fehler beim Parsen von {WHAZZUP_PATH}: {e}")
-        return clients
+
+def on_whazzup_file(cached):
+    delta = WHAZZUP_DIFF.update(cached.value)
+    if delta is not None:
+        socketio.emit("whazzup_delta", delta, to=DASHBOARD_ROOM)
+
+
+FILE_WATCHER.watch(STATUS_DATA, on_status_file)
+FILE_WATCHER.watch(WHAZZUP, on_whazzup_file)
+FILE_WATCHER.watch(FSD_DATA)
+WHAZZUP_DIFF.update(WHAZZUP.get())
 
 
 # === API ===
 @app.route("/api/status")
 def api_status():
-    proc = get_fsd_process()
-
-    if proc:
-        try:
-            pid = proc.pid
-            uptime_sec = int(time.time() - proc.create_time())
-            return jsonify({
-                "status": "Läuft",
-                "pid": pid,
-                "uptime_sec": uptime_sec
-            })
-        except Exception as e:
-            return jsonify({
-                "status": f"error: {e}",
-                "pid": None,
-                "uptime_sec": 0
-            })
-    else:
-        return jsonify({
-            "status": "Gestoppt",
-            "pid": None,
-            "uptime_sec": 0
-        })
+    data = get_fsd_status_payload()
+    labels = {"running": "Läuft", "stopped": "Gestoppt"}
+    return jsonify({
+        "status": labels.get(data["status"], data["status"]),
+        "pid": data["pid"],
+        "uptime_sec": data["uptime_sec"],
+        "cpu_percent": data["fsd_cpu_percent"],
+        "rss_mb": data["fsd_rss_mb"],
+    })
 
 
 @app.route("/api/clients")
 def api_clients():
-    clients = parse_whazzup_clients()
-    return jsonify(clients)
+    entry = WHAZZUP.get()
+    resp = app.response_class(entry.body, mimetype="application/json")
+    resp.set_etag(entry.etag)
+    # Browser fragt jedes Mal nach, bekommt bei unveränderter Datei aber nur 304
+    resp.cache_control.no_cache = True
+    return resp.make_conditional(request)
 
 
 LIVE_PUSH_TOKEN = os.environ.get("FSD_PUSH_TOKEN", "my-super-secret-token")
@@ -384,8 +669,6 @@ def api_live_update():
     data = request.get_json(silent=True) or {}
 
     # Defaults, damit Frontend immer stabile Felder hat
-    if "clients" not in data or not isinstance(data.get("clients"), list):
-        data["clients"] = []
     if "ts" not in data:
         data["ts"] = int(time.time())
     if "bot" not in data or not isinstance(data.get("bot"), dict):
@@ -393,15 +676,60 @@ def api_live_update():
     else:
         data["bot"].setdefault("connected", False)
         data["bot"].setdefault("since", None)
+    # alter Observer ohne Delta-Protokoll: immer komplette Liste
+    if "type" not in data and not isinstance(data.get("clients"), list):
+        data["clients"] = []
 
     # Cache aktualisieren
-    with LIVE_CACHE_LOCK:
-        LIVE_CACHE["clients"] = data["clients"]
-        LIVE_CACHE["ts"] = data["ts"]
-        LIVE_CACHE["bot"] = data["bot"]
-
-    # Broadcast an alle Dashboards
-    socketio.emit("live_clients", data)
+    global LIVE_STATE, LIVE_GRID, MAP_REGIONS, _INDEX_STANDBY, _INDEX_BACKLOG
+    is_full = data.get("type", "full") == "full"
+    with LIVE_APPLY_LOCK:
+        # neuer Stand, Gitter/Regionen und Region-Deltas ohne LIVE_CACHE_LOCK: Leser sehen
+        # bis zum Tausch unverändert den alten Stand
+        before = LIVE_STATE.clients
+        state = LIVE_STATE.advance(data)
+        applied = state is not None
+        if applied:
+            grid, regions = _INDEX_STANDBY
+            replay_index(grid, regions, _INDEX_BACKLOG)
+            with TRACKS_LOCK:
+                events, ops = index_live_update(data, before, state.clients, grid, regions, data["ts"])
+
+        with LIVE_CACHE_LOCK:
+            # abgelöste Objekte erst nach dem Lock freigeben
+            retired = (LIVE_CACHE["body"], _INDEX_BACKLOG)
+            LIVE_CACHE["ts"] = data["ts"]
+            LIVE_CACHE["bot"] = data["bot"]
+            LIVE_CACHE["body"] = None
+            LIVE_CACHE["updated"] = time.time()
+            if applied:
+                _INDEX_STANDBY = (LIVE_GRID, MAP_REGIONS)
+                LIVE_STATE, LIVE_GRID, MAP_REGIONS = state, grid, regions
+                _INDEX_BACKLOG = ops
+        del retired
+
+        if applied:
+            # Emits nach dem Tausch, aber vor dem nächsten Push. Ein Socket, der dazwischen
+            # Snapshot + join_room nimmt, bekommt dieses Delta zusätzlich – die Clients
+            # überspringen Deltas mit seq <= ihrem Stand, Region-Events sind idempotent
+            t0 = time.perf_counter()
+            emit_region_updates(events)
+            emit_cluster_updates()
+            # Broadcast an alle Dashboards: Keyframe komplett (aus den Fragmenten statt die
+            # empfangenen dicts neu zu encodieren), sonst nur die Änderungen
+            if is_full:
+                socketio.emit("live_clients", live_snapshot_payload(), to=LIVE_ROOM)
+            else:
+                socketio.emit("live_delta", data, to=LIVE_ROOM)
+            EMIT_SECONDS.observe(time.perf_counter() - t0)
+
+    if not applied:
+        # Lücke in der Sequenz -> Observer schickt beim nächsten Push einen Keyframe
+        socketio.emit("live_bot", {"ts": data["ts"], "bot": data["bot"]}, to=LIVE_ROOM)
+        LIVE_RESYNCS.inc()
+        return jsonify({"ok": False, "resync": True}), 409
+
+    LIVE_UPDATES.inc()
     return jsonify({"ok": True})
 
 
@@ -413,75 +741,143 @@ def map_view():
 # --- snapshot für karte ---
 @app.route("/api/live_snapshot")
 def api_live_snapshot():
+    # ?bbox=west,south,east,north (Leaflet toBBoxString) -> nur Flugzeuge im Ausschnitt
+    bbox_arg = request.args.get("bbox")
+    if bbox_arg is not None:
+        bbox = parse_bbox(bbox_arg)
+        if bbox is None:
+            return jsonify({"ok": False, "error": "bbox=west,south,east,north erwartet"}), 400
+        zoom = request.args.get("zoom", type=float)
+        with LIVE_CACHE_LOCK:
+            if zoom is not None and zoom < CLUSTER_ZOOM:
+                payload = cluster_payload(LIVE_GRID.cluster_factor(zoom), bbox)
+            else:
+                payload = live_snapshot_payload(LIVE_GRID.query(bbox))
+            payload["bbox"] = list(bbox)
+            payload["zoom"] = zoom
+            body = fragcache.dumps(payload)
+        resp = app.response_class(body, mimetype="application/json")
+        resp.cache_control.no_cache = True
+        return resp
+
     with LIVE_CACHE_LOCK:
-        return jsonify(LIVE_CACHE)
+        body = LIVE_CACHE["body"]
+        if body is None:
+            body = VersionedBody(fragcache.dumps(live_snapshot_payload()).encode("utf-8"),
+                                 LIVE_CACHE["updated"])
+            LIVE_CACHE["body"] = body
+    return body.respond(request, app.response_class)
+
+
+# --- Flugspur ---
+@app.route("/api/track/<callsign>")
+def api_track(callsign):
+    # ?tolerance=<Meter> vereinfacht per Douglas-Peucker, ?since=<ts> nur neuere Punkte
+    tolerance = request.args.get("tolerance", 0.0, type=float)
+    since = request.args.get("since", type=float)
+    with TRACKS_LOCK:
+        samples = TRACKS.trail(callsign, since)
+    if samples is None:
+        return jsonify({"ok": False, "error": "unbekannter Callsign"}), 404
+    keep = simplify(samples, tolerance)
+    return jsonify({
+        "callsign": callsign,
+        "fields": ["ts", "lat", "lon", "alt", "gs", "hdg"],
+        "tolerance_m": tolerance,
+        "raw_count": len(samples),
+        "samples": [samples[i] for i in keep],
+    })
+
+
+# --- Metriken (Prometheus) ---
+@app.route("/metrics")
+def metrics_view():
+    return app.response_class(METRICS.render(), content_type=metrics.CONTENT_TYPE)
 
 
 # --- Benutzer anzeigen ---
 @app.route("/users")
 # @require_admin
 def users():
-    conn = sqlite3.connect(DB_PATH)
-    c = conn.cursor()
-
-    c.execute("""
-        CREATE TABLE IF NOT EXISTS cert (
-            cid TEXT PRIMARY KEY NOT NULL,
-            password TEXT NOT NULL,
-            level INT NOT NULL,
-            twitch_name TEXT
-        )
-    """)
-
-    c.execute(
-        "SELECT cid, password, level, twitch_name FROM cert WHERE cid != ? ORDER BY CAST(cid AS INTEGER)",
-        (BOT_CID,)
-    )
-
-    users = c.fetchall()
-
-    c.execute("SELECT MAX(CAST(cid AS INTEGER)) FROM cert")
-    max_cid = c.fetchone()[0]
-    BASE_CID = 1000001
-    next_cid = max(BASE_CID, (max_cid or 0) + 1)
-    c.execute("SELECT cid, password, level, twitch_name FROM cert WHERE CAST(cid AS INTEGER) != 1 ORDER BY CAST(cid AS INTEGER)")
-
-    conn.close()
+    page = request.args.get("page", 1, type=int)
+    q = request.args.get("q", "").strip()
+    # Weiter/Zurück tragen die CID der Nachbarzeile (Keyset), page nur für die Anzeige
+    rows, total = CERT_DB.page(page, USERS_PER_PAGE, q, after=request.args.get("after"),
+                               before=request.args.get("before"))
+    pages = max(1, -(-total // USERS_PER_PAGE))
 
     return render_template(
         "users.html",
-        users=users,
-        next_cid=next_cid
+        users=rows,
+        total=total,
+        page=page,
+        pages=pages,
+        q=q,
+        imported=request.args.get("imported", type=int),
+        skipped=request.args.get("skipped", type=int),
+        next_cid=CERT_DB.next_cid()
     )
 
 
+@app.route("/api/users")
+# @require_admin
+def api_users():
+    page = request.args.get("page", 1, type=int)
+    per_page = min(request.args.get("per_page", USERS_PER_PAGE, type=int), USERS_MAX_PER_PAGE)
+    q = request.args.get("q", "").strip()
+    rows, total = CERT_DB.page(page, per_page, q, after=request.args.get("after"),
+                               before=request.args.get("before"))
+    return jsonify({
+        "users": [{"cid": cid, "level": level, "twitch_name": twitch_name or ""}
+                  for cid, _password, level, twitch_name in rows],
+        "total": total,
+        # Cursor für ?after= (nächste Seite) bzw. ?before= (vorige Seite)
+        "after": rows[-1][0] if rows else None,
+        "before": rows[0][0] if rows else None,
+        "page": max(1, page),
+        "per_page": max(1, per_page),
+        "next_cid": CERT_DB.next_cid(),
+    })
+
+
 # --- Benutzer hinzufügen ---
 @app.route("/add_user", methods=["POST"])
 # @require_admin
 def add_user():
-    cid = request.form.get("cid", "").strip()
-    password = request.form.get("password", "").strip()
-    levelraw = request.form.get("level", "1").strip()
-    twitch_name = request.form.get("twitch_name", "").strip()
+    try:
+        cid, password, level, twitch_name = parse_user(
+            request.form.get("cid", ""),
+            request.form.get("password", ""),
+            request.form.get("level", "1"),
+            request.form.get("twitch_name", ""),
+        )
+    except ValueError as e:
+        return str(e), 400
+
+    CERT_DB.upsert(cid, password, level, twitch_name)
+
+    return redirect(url_for("users"))
 
-    if not cid or not password:
-        return "Missing cid or password", 400
 
+# --- Benutzer per CSV importieren (eine Transaktion) ---
+@app.route("/import_users", methods=["POST"])
+# @require_admin
+def import_users():
+    upload = request.files.get("csv")
+    if upload is None:
+        return "Missing csv file", 400
     try:
-        level = int(levelraw)
-    except ValueError:
-        return "Invalid level", 400
-
-    conn = sqlite3.connect(str(DB_PATH))
-    c = conn.cursor()
-    c.execute(
-        "INSERT OR REPLACE INTO cert (cid, password, level, twitch_name) VALUES (?, ?, ?, ?)",
-        (cid, password, level, twitch_name)
-    )
-    conn.commit()
-    conn.close()
+        data = upload.read().decode("utf-8-sig")
+    except UnicodeDecodeError:
+        return "CSV must be UTF-8", 400
 
-    return redirect(url_for("users"))
+    result = CERT_DB.import_csv(data)
+    for err in result["errors"]:
+        print(f"⚠️ CSV-Import: {err}")
+
+    if request.accept_mimetypes.best == "application/json":
+        return jsonify(result)
+    return redirect(url_for("users", imported=result["imported"], skipped=result["skipped"]))
 
 
 # --- Benutzer löschen ---
@@ -490,19 +886,16 @@ def add_user():
 def delete_user(cid):
     if str(cid) == BOT_CID:
         return jsonify({"ok": False, "error": "Cannot delete BOT account"}), 400
-    conn = sqlite3.connect(DB_PATH)
-    c = conn.cursor()
-    c.execute("DELETE FROM cert WHERE cid = ?", (cid,))
-    conn.commit()
-    conn.close()
+    CERT_DB.delete(str(cid))
     return redirect(url_for("users"))
 
 # -------------------------------------------------------------------
 # Start des Servers + Hintergrund-Thread
 # -------------------------------------------------------------------
 if __name__ == "__main__":
-    socketio.start_background_task(watch_status_file)
+    socketio.start_background_task(FILE_WATCHER.run)
     socketio.start_background_task(status_broadcaster)
 
-    print("🚀 Flask-SocketIO Server läuft auf Port 8080")
-    socketio.run(app, host="0.0.0.0", port=8080, debug=False)
+    port = int(os.environ.get("FSD_WEB_PORT", "8080"))
+    print(f"🚀 Flask-SocketIO Server läuft auf Port {port}")
+    socketio.run(app, host=os.environ.get("FSD_WEB_HOST", "0.0.0.0"), port=port, debug=False)
@@ -0,0 +1,6 @@
+"""
+Benchmarks für web/ (Observer + Web-App).
+
+Aufruf aus dem web/-Verzeichnis, z.B.:
+    cd web && python -m bench.bench_engine
+"""
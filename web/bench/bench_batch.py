@@ -0,0 +1,117 @@
+"""
+Benchmark: skalare PBH-Dekodierung pro Paket gegen NumPy-Batch pro Empfangs-Burst.
+
+Simuliert eine Sekunde Feed bei 5k bzw. 50k Flugzeug-Updates/s (64-KB-Chunks wie
+im asyncio-Modus): Framing, Parsen, Dekodieren und Übernahme in die Client-Tabelle.
+Prüft vorab, dass der Batch-Pfad für alle 10-Bit-Werte identisch zu unpack_pbh ist.
+
+    cd web && python -m bench.bench_batch
+"""
+import argparse
+import threading
+import time
+
+from bench.common import pack_pbh, pilot_line
+from framer import LineFramer
+from fsdparse import FeedParser, PilotPosition
+from observer import unpack_pbh
+
+try:
+    import numpy as np
+    import pbhbatch
+except ImportError:
+    np = None
+
+
+def check_identical():
+    words = [(v << 22) | (v << 12) | (v << 2) | ((v & 1) << 1) for v in range(1024)]
+    arr = np.array(words, dtype=np.uint32)
+    cols = [c.tolist() for c in pbhbatch.decode_pbh_array(arr)]
+    for i, w in enumerate(words):
+        d = unpack_pbh(w)
+        expect = (round(d["heading_deg"], 2), d["heading_deg_rounded"], d["pitch_deg"],
+                  d["bank_deg"], d["on_ground"])
+        got = tuple(c[i] for c in cols)
+        assert got == expect, (w, got, expect)
+
+
+def make_chunks(updates: int, aircraft: int, chunk_size: int = 65536):
+    data = b"".join(
+        pilot_line(f"BEN{i % aircraft:05d}", 50.0 + (i % aircraft) * 1e-3, 8.0, 35000, 450,
+                   pack_pbh((i % 20) - 10, (i % 60) - 30, i % 360))
+        for i in range(updates)
+    )
+    return [data[i:i + chunk_size] for i in range(0, len(data), chunk_size)]
+
+
+def ingest_scalar(chunks, ts=None):
+    table = {}
+    lock = threading.Lock()
+    framer = LineFramer()
+    parser = FeedParser(decode=True)
+    ts = int(time.time()) if ts is None else ts
+    for chunk in chunks:
+        for raw in framer.feed(chunk):
+            r = parser.parse(raw.decode("utf-8", errors="ignore"), ts)
+            if isinstance(r, PilotPosition):
+                with lock:
+                    table[r.callsign] = r
+    return table
+
+
+def ingest_batch(chunks, ts=None):
+    table = {}
+    lock = threading.Lock()
+    framer = LineFramer()
+    parser = FeedParser(decode=False)
+    ts = int(time.time()) if ts is None else ts
+    for chunk in chunks:
+        pending = []
+        for raw in framer.feed(chunk):
+            r = parser.parse(raw.decode("utf-8", errors="ignore"), ts)
+            if isinstance(r, PilotPosition):
+                pending.append(r)
+        pbhbatch.decode_records(pending)
+        with lock:
+            for r in pending:
+                table[r.callsign] = r
+    return table
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--repeat", type=int, default=3)
+    args = ap.parse_args()
+
+    if np is None:
+        print("numpy nicht installiert – Benchmark übersprungen")
+        return
+
+    check_identical()
+    print("Batch-Dekodierung identisch zu unpack_pbh (alle 1024 Werte je Feld)")
+    print(f"{'updates/s':>10} {'scalar ms':>10} {'batch ms':>10} {'scalar %core':>13} {'batch %core':>12}")
+
+    for updates in (5000, 50000):
+        chunks = make_chunks(updates, aircraft=min(updates, 10000))
+        # fester ts: sonst scheitert der Vergleich, wenn beide Läufe eine Sekundengrenze trennt;
+        # PBH außerhalb uint32 darf np.fromiter nicht sprengen
+        odd = [pilot_line("ODD00001", 50.0, 8.0, 1000, 100, -4), pilot_line("ODD00002", 50.0, 8.0, 1000, 100, 1 << 33)]
+        a = ingest_scalar(chunks + odd, ts=0)
+        b = ingest_batch(chunks + odd, ts=0)
+        assert {k: v.to_dict() for k, v in a.items()} == {k: v.to_dict() for k, v in b.items()}
+
+        res = {}
+        for name, fn in (("scalar", ingest_scalar), ("batch", ingest_batch)):
+            best = float("inf")
+            for _ in range(args.repeat):
+                t0 = time.process_time()
+                fn(chunks)
+                best = min(best, time.process_time() - t0)
+            res[name] = best
+        # eine Sekunde Feed -> Zeit in s entspricht dem Anteil eines Kerns
+        print(f"{updates:10d} {res['scalar'] * 1000:10.1f} {res['batch'] * 1000:10.1f} "
+              f"{res['scalar'] * 100:12.1f}% {res['batch'] * 100:11.1f}%")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+"""
+Benchmark: Mitschnitt der Rohzeilen (capture.py) im heißen Pfad des Observers.
+
+Füttert LiveObserver.feed_chunk mit synthetischen Positionszeilen – ohne und
+mit aktivem CaptureWriter – und misst record() pro Chunk direkt. Danach:
+Durchsatz des Writer-Threads (Zeilen/s inkl. gzip) und Kompressionsrate.
+Ziel: record() < 1 % von feed_chunk; der Writer schafft ein Vielfaches des Feeds.
+
+    cd web && python -m bench.bench_capture --aircraft 2000 --chunk 4096
+"""
+import argparse
+import gc
+import os
+import shutil
+import tempfile
+import time
+
+os.environ.setdefault("FSD_LOG", "warn")
+os.environ.setdefault("FSD_METRICS_PORT", "0")
+
+import observer
+from bench.common import pack_pbh, pilot_line
+from capture import CaptureWriter, read_capture, segments
+from framer import LineFramer
+
+
+def make_chunks(aircraft: int, rounds: int, size: int):
+    data = b"".join(pilot_line(f"BEN{n:05d}", 50.0 + n * 1e-3 + r * 1e-4, 8.0 + n * 1e-3, 30000 + r, 450,
+                               pack_pbh(2.0, -5.0, (n * 7 + r) % 360))
+                    for r in range(rounds) for n in range(aircraft))
+    return [data[i:i + size] for i in range(0, len(data), size)], data
+
+
+def run(chunks, capture) -> float:
+    obs = observer.LiveObserver()
+    obs.capture = capture
+    framer = LineFramer(observer.MAX_LINE_BYTES)
+    gc.collect()
+    gc.disable()
+    try:
+        t0 = time.perf_counter()
+        for chunk in chunks:
+            obs.feed_chunk(framer, chunk)
+        return time.perf_counter() - t0
+    finally:
+        gc.enable()
+
+
+def record_cost(lines, n: int = 200_000) -> float:
+    # Writer nicht gestartet: misst nur das Anhängen, max_pending groß genug gegen Verwerfen
+    writer = CaptureWriter(tempfile.gettempdir(), max_pending=n + 1)
+    t0 = time.perf_counter()
+    for _ in range(n):
+        writer.record(lines)
+    return (time.perf_counter() - t0) / n
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--aircraft", type=int, default=2000)
+    ap.add_argument("--rounds", type=int, default=10, help="Positionsmeldungen pro Flugzeug")
+    ap.add_argument("--chunk", type=int, default=4096, help="Bytes pro recv()")
+    ap.add_argument("--repeat", type=int, default=15)
+    args = ap.parse_args()
+
+    chunks, data = make_chunks(args.aircraft, args.rounds, args.chunk)
+    tmp = tempfile.mkdtemp(prefix="fsd-capture-bench-")
+    try:
+        # Writer läuft nicht -> nur die Kosten im Empfangspfad, nichts konkurriert um die CPU
+        best = {"ohne": float("inf"), "mit": float("inf")}
+        for _ in range(args.repeat):
+            for label in ("ohne", "mit"):
+                cap = CaptureWriter(tmp, max_pending=len(chunks) + 1) if label == "mit" else None
+                best[label] = min(best[label], run(chunks, cap))
+
+        total_lines = data.count(b"\n")
+        lines_per_chunk = LineFramer(observer.MAX_LINE_BYTES).feed(chunks[len(chunks) // 2])
+        cost = record_cost(lines_per_chunk)
+        per_chunk = best["ohne"] / len(chunks)
+        print(f"{len(chunks)} chunks à {args.chunk} B, {total_lines} Zeilen")
+        print(f"feed_chunk ohne Mitschnitt: {best['ohne'] * 1000:8.1f} ms ({per_chunk * 1e6:.1f} µs/chunk)")
+        print(f"feed_chunk mit Mitschnitt:  {best['mit'] * 1000:8.1f} ms")
+        print(f"record() pro Chunk:         {cost * 1e9:8.0f} ns = {cost / per_chunk * 100:.3f} % "
+              f"({'ok' if cost / per_chunk < 0.01 else 'ÜBER 1 %'})")
+
+        # Writer-Thread: alles vormerken, dann Zeit bis zum Schließen
+        out = os.path.join(tmp, "w")
+        writer = CaptureWriter(out, max_pending=len(chunks) + 1, flush_interval=0.05)
+        framer = LineFramer(observer.MAX_LINE_BYTES)
+        pending = [framer.feed(c) for c in chunks]
+        t0 = time.perf_counter()
+        writer.start()
+        for lines in pending:
+            writer.record(lines)
+        writer.close()
+        dt = time.perf_counter() - t0
+        size = sum(p.stat().st_size for p in segments(out))
+        print(f"Writer: {writer.lines / dt:10.0f} Zeilen/s, {len(data) / dt / 1e6:.1f} MB/s roh, "
+              f"{size / 1024:.0f} KiB auf Platte (Faktor {len(data) / size:.1f})")
+
+        t0 = time.perf_counter()
+        n = sum(1 for _ in read_capture(segments(out)))
+        print(f"read_capture: {n / (time.perf_counter() - t0):10.0f} Records/s")
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+"""
+Benchmark: voller Snapshot pro Tick gegen Delta-Protokoll (livedelta.py).
+
+Misst pro Tick Bytes und JSON-Encode+Decode-Zeit bei 10k Clients und
+unterschiedlichem Anteil bewegter Flugzeuge.
+
+    cd web && python -m bench.bench_delta --clients 10000
+"""
+import argparse
+import json
+import time
+
+import fragcache
+from fsdparse import PilotPosition
+from livedelta import DeltaEncoder, LiveState
+
+
+def make_record(i: int, alt: int) -> PilotPosition:
+    return PilotPosition(f"BEN{i:05d}", "1200", "N", 50.0 + i * 1e-3, 8.0, alt, 450, 0, 0, 0, 90.0, 90, 0, 0, False)
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--clients", type=int, default=10000)
+    ap.add_argument("--ticks", type=int, default=5)
+    args = ap.parse_args()
+
+    print(f"{'changed':>8} {'full KB':>9} {'full ms':>8} {'delta KB':>9} {'delta ms':>9}")
+    for frac in (0.0, 0.01, 0.1, 1.0):
+        records = {f"BEN{i:05d}": make_record(i, 1000) for i in range(args.clients)}
+        enc = DeltaEncoder(keyframe_interval=1e9)
+        state = LiveState()
+        state.apply(json.loads(fragcache.dumps(enc.encode(records, 0))))
+
+        full_bytes = full_t = delta_bytes = delta_t = 0.0
+        n_changed = int(args.clients * frac)
+        for tick in range(1, args.ticks + 1):
+            for i in range(n_changed):
+                records[f"BEN{i:05d}"] = make_record(i, 1000 + tick)
+
+            # alt: komplette Liste pro Tick
+            t0 = time.perf_counter()
+            body = json.dumps({"clients": [r.to_dict() for r in records.values()]})
+            json.loads(body)
+            full_t += time.perf_counter() - t0
+            full_bytes += len(body)
+
+            # neu: Delta encodieren, übertragen, anwenden
+            t0 = time.perf_counter()
+            body = fragcache.dumps(enc.encode(records, tick))
+            assert state.apply(json.loads(body))
+            delta_t += time.perf_counter() - t0
+            delta_bytes += len(body)
+
+        n = args.ticks
+        print(f"{frac * 100:7.0f}% {full_bytes / n / 1024:9.1f} {full_t / n * 1000:8.2f} "
+              f"{delta_bytes / n / 1024:9.1f} {delta_t / n * 1000:9.2f}")
+
+
+if __name__ == "__main__":
+    main()
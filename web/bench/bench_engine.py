@@ -0,0 +1,84 @@
+"""
+Vergleicht die Observer-Engines "thread" und "asyncio":
+Feed->Push-Latenz (p50/p99) und CPU-Zeit pro 1.000 Positions-Updates/s.
+
+Die Engines laufen abwechselnd --repeat mal; Latenzen aller Läufe werden
+zusammengefasst. CPU zählt erst nach --warmup Sekunden (ohne Import/Start).
+
+    cd web && python -m bench.bench_engine --rate 1000 --duration 10 --repeat 3
+"""
+import argparse
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import psutil
+
+from bench.common import FakeFsdServer, PushReceiver, OBSERVER_PATH, observer_env, percentile
+
+
+def run_engine(engine: str, rate: int, aircraft: int, duration: float, push_interval: float,
+               warmup: float) -> dict:
+    feed = FakeFsdServer(aircraft=aircraft, rate=rate).start()
+    push = PushReceiver().start()
+    tmp = tempfile.TemporaryDirectory()
+    env = observer_env(
+        FSD_HOST="127.0.0.1",
+        FSD_PORT=feed.port,
+        FSD_PUSH_URL=push.url,
+        FSD_PUSH_INTERVAL=push_interval,
+        FSD_OBSERVER_ENGINE=engine,
+        FSD_DATA_JSON_PATH=Path(tmp.name) / "fsd-data.json",
+    )
+
+    proc = subprocess.Popen([sys.executable, str(OBSERVER_PATH)], env=env,
+                            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    ps = psutil.Process(proc.pid)
+    time.sleep(warmup)
+    t_start = time.time()
+    cpu_before = sum(ps.cpu_times()[:2])
+    time.sleep(duration)
+    cpu = sum(ps.cpu_times()[:2]) - cpu_before
+    proc.terminate()
+    proc.wait()
+
+    feed.stop()
+    push.stop()
+    tmp.cleanup()
+
+    latencies = [(t - feed.sent_at[seq]) * 1000.0 for t, seq, _ in push.samples
+                 if seq in feed.sent_at and t >= t_start]
+    return {"latencies": latencies, "lines": feed.sent_lines, "cpu_sec": cpu}
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--rate", type=int, default=1000, help="Positions-Updates pro Sekunde")
+    ap.add_argument("--aircraft", type=int, default=500)
+    ap.add_argument("--duration", type=float, default=10.0, help="Messzeit pro Lauf")
+    ap.add_argument("--warmup", type=float, default=2.0)
+    ap.add_argument("--repeat", type=int, default=3)
+    ap.add_argument("--push-interval", type=float, default=0.25)
+    args = ap.parse_args()
+
+    engines = ("thread", "asyncio")
+    runs = {e: [] for e in engines}
+    for _ in range(args.repeat):
+        for engine in engines:
+            runs[engine].append(run_engine(engine, args.rate, args.aircraft, args.duration,
+                                           args.push_interval, args.warmup))
+
+    print(f"{'engine':8} {'pushes':>7} {'lines':>8} {'p50 ms':>8} {'p99 ms':>8} {'cpu s':>7} {'cpu%/1k':>8}")
+    for engine in engines:
+        lat = [x for r in runs[engine] for x in r["latencies"]]
+        cpu = sum(r["cpu_sec"] for r in runs[engine])
+        lines = sum(r["lines"] for r in runs[engine])
+        cpu_pct = 100.0 * cpu / (args.duration * args.repeat) / (args.rate / 1000.0)
+        print(f"{engine:8} {len(lat):7d} {lines:8d} {(percentile(lat, 50) or 0):8.1f} "
+              f"{(percentile(lat, 99) or 0):8.1f} {cpu:7.2f} {cpu_pct:8.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+"""
+Benchmark: Latenz von "Datei per rename() ersetzt" bis zum Abonnenten-Aufruf.
+
+Vergleicht filewatch.FileWatcher mit inotify gegen den Polling-Fallback
+(entspricht dem alten watch_status_file mit stat() alle 2 s) und misst,
+was ein Request bei einem Cache-Treffer kostet.
+
+    cd web && python -m bench.bench_filewatch --rounds 20
+"""
+import argparse
+import json
+import os
+import statistics
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+from filewatch import CachedFile, FileWatcher
+
+
+def replace_atomic(path: Path, data: bytes):
+    tmp = path.with_name(path.name + ".tmp")
+    with open(tmp, "wb") as f:
+        f.write(data)
+    os.replace(tmp, path)
+
+
+def measure(use_inotify: bool, poll_interval: float, rounds: int):
+    with tempfile.TemporaryDirectory() as d:
+        path = Path(d) / "status.json"
+        replace_atomic(path, b'{"n": -1}')
+        watcher = FileWatcher(poll_interval=poll_interval, use_inotify=use_inotify)
+        seen = {}
+        cond = threading.Condition()
+
+        def on_change(cached):
+            if cached.value is None:
+                return
+            with cond:
+                seen[cached.value["n"]] = time.perf_counter()
+                cond.notify_all()
+
+        cached = watcher.watch(CachedFile(path, json.load), on_change)
+        threading.Thread(target=watcher.run, daemon=True).start()
+        time.sleep(0.05)
+
+        lat = []
+        for n in range(rounds):
+            t0 = time.perf_counter()
+            replace_atomic(path, json.dumps({"n": n}).encode())
+            with cond:
+                cond.wait_for(lambda: n in seen, timeout=poll_interval * 3)
+            if n in seen:
+                lat.append((seen[n] - t0) * 1000)
+            # zufällige Phase gegenüber dem Poll-Takt
+            time.sleep(0.01 + (n % 7) * poll_interval / 7)
+
+        t0 = time.perf_counter()
+        for _ in range(100_000):
+            cached.get()
+        hit_us = (time.perf_counter() - t0) / 100_000 * 1e6
+        return watcher.mode, lat, hit_us
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--rounds", type=int, default=20)
+    ap.add_argument("--poll", type=float, default=2.0)
+    args = ap.parse_args()
+
+    print(f"{'mode':>8} {'p50 ms':>9} {'max ms':>9} {'get() µs':>9}")
+    for use_inotify in (True, False):
+        mode, lat, hit_us = measure(use_inotify, args.poll, args.rounds)
+        print(f"{mode:>8} {statistics.median(lat):9.2f} {max(lat):9.2f} {hit_us:9.3f}")
+
+    # alter Request-Pfad: bei jedem Aufruf stat() + lesen
+    with tempfile.TemporaryDirectory() as d:
+        path = Path(d) / "fsd-data.json"
+        replace_atomic(path, b"{}" * 50_000)
+        t0 = time.perf_counter()
+        for _ in range(10_000):
+            if path.exists():
+                with open(path, "r", encoding="utf-8") as f:
+                    f.read()
+        print(f"old read-per-request: {(time.perf_counter() - t0) / 10_000 * 1e6:.1f} µs")
+
+
+if __name__ == "__main__":
+    main()
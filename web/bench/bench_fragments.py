@@ -0,0 +1,55 @@
+"""
+Benchmark: Keyframe-/Snapshot-Encoding mit Fragment-Cache (fragcache.py)
+gegen komplettes json.dumps pro Ausgabe.
+
+    cd web && python -m bench.bench_fragments --clients 10000
+"""
+import argparse
+import json
+import time
+
+import fragcache
+from fragcache import FragmentCache
+from fsdparse import PilotPosition
+
+
+def make_record(i: int, alt: int) -> PilotPosition:
+    return PilotPosition(f"BEN{i:05d}", "1200", "N", 50.0 + i * 1e-3, 8.0, alt, 450, 0, 0, 0, 90.0, 90, 0, 0, False)
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--clients", type=int, default=10000)
+    ap.add_argument("--ticks", type=int, default=5)
+    args = ap.parse_args()
+
+    print(f"{'changed':>8} {'dumps ms':>9} {'frag ms':>8} {'speedup':>8}")
+    for frac in (0.0, 0.01, 0.1, 1.0):
+        records = {f"BEN{i:05d}": make_record(i, 1000) for i in range(args.clients)}
+        cache = FragmentCache()
+        for cs, r in records.items():
+            cache.get(cs, r, r.to_dict)
+
+        plain_t = frag_t = 0.0
+        n_changed = int(args.clients * frac)
+        for tick in range(1, args.ticks + 1):
+            for i in range(n_changed):
+                records[f"BEN{i:05d}"] = make_record(i, 1000 + tick)
+
+            t0 = time.perf_counter()
+            a = json.dumps({"clients": [r.to_dict() for r in records.values()]},
+                           ensure_ascii=False, separators=(",", ":"))
+            plain_t += time.perf_counter() - t0
+
+            t0 = time.perf_counter()
+            b = fragcache.dumps({"clients": [cache.get(cs, r, r.to_dict) for cs, r in records.items()]},
+                                ensure_ascii=False, separators=(",", ":"))
+            frag_t += time.perf_counter() - t0
+            assert a == b
+
+        n = args.ticks
+        print(f"{frac * 100:7.0f}% {plain_t / n * 1000:9.2f} {frag_t / n * 1000:8.2f} {plain_t / frag_t:7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
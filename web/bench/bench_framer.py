@@ -0,0 +1,69 @@
+"""
+Microbenchmark: alter Empfangspuffer (bytes += chunk, replace, split) gegen LineFramer.
+
+    cd web && python -m bench.bench_framer --lines 50000 --chunk 4096
+"""
+import argparse
+import time
+
+from bench.common import pack_pbh, pilot_line
+from framer import LineFramer
+
+
+def legacy_frame(chunks):
+    """Logik aus LiveObserver.run() vor dem Framer."""
+    n = 0
+    buf = b""
+    for chunk in chunks:
+        buf += chunk
+        buf = buf.replace(b"\r\n", b"\n").replace(b"\r", b"\n")
+        while b"\n" in buf:
+            raw_line, buf = buf.split(b"\n", 1)
+            if raw_line:
+                n += 1
+    return n
+
+
+def framer_frame(chunks):
+    n = 0
+    framer = LineFramer()
+    for chunk in chunks:
+        n += len(framer.feed(chunk))
+    return n
+
+
+def make_chunks(lines: int, chunk_size: int):
+    data = b"".join(
+        pilot_line(f"BEN{i % 5000:05d}", 50.0 + i * 1e-5, 8.0, 35000, 450, pack_pbh(1, 2, i % 360))
+        for i in range(lines)
+    )
+    return [data[i:i + chunk_size] for i in range(0, len(data), chunk_size)]
+
+
+def bench(fn, chunks, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn(chunks)
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--lines", type=int, default=50000)
+    ap.add_argument("--repeat", type=int, default=3)
+    args = ap.parse_args()
+
+    print(f"{'chunk':>7} {'lines':>7} {'legacy ms':>10} {'framer ms':>10} {'speedup':>8}")
+    # 4 KB = recv im Thread-Modus, 64 KB = asyncio-Modus, 1 MB = großer Burst
+    for chunk_size in (4096, 65536, 1 << 20):
+        chunks = make_chunks(args.lines, chunk_size)
+        assert legacy_frame(chunks) == framer_frame(chunks) == args.lines
+        t_old = bench(legacy_frame, chunks, args.repeat)
+        t_new = bench(framer_frame, chunks, args.repeat)
+        print(f"{chunk_size:7d} {args.lines:7d} {t_old * 1000:10.1f} {t_new * 1000:10.1f} {t_old / t_new:8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+"""
+Benchmark: Requests/s für /fsd-data.json und /api/live_snapshot.
+
+"alt" bildet die bisherigen Handler nach (Datei pro Request lesen bzw.
+Snapshot pro Request neu encodieren), "neu" nutzt app.py mit
+httpbody.VersionedBody – einmal ohne Kompression, mit gzip und als
+Revalidierung per If-None-Match (304). Gemessen über den Flask-Test-Client,
+also ohne Netzwerk; Werkzeug-Overhead ist in allen Varianten enthalten.
+
+    cd web && python -m bench.bench_http --aircraft 2000
+"""
+import argparse
+import json
+import os
+import tempfile
+import time
+from pathlib import Path
+
+import app as A
+import fragcache
+from filewatch import CachedFile
+from httpbody import VersionedBody
+
+
+def fsd_data_doc(n: int):
+    pilots = [{"cid": 100000 + i, "name": f"Pilot {i}", "callsign": f"BEN{i:05d}",
+               "server": "SERV1", "pilot_rating": 0, "latitude": 50.0 + i * 1e-3,
+               "longitude": 8.0 + i * 1e-3, "altitude": 30000, "groundspeed": 450,
+               "transponder": "1200", "heading": 91, "qnh_i_hg": 29.92, "qnh_mb": 1013,
+               "flight_plan": None, "logon_time": "2026-01-01T00:00:00Z",
+               "last_updated": "2026-01-01T00:00:00Z"} for i in range(n)]
+    return {"general": dict(A.FSD_DATA_EMPTY["general"], connected_clients=n), "pilots": pilots,
+            "controllers": [], "atis": [], "servers": [], "prefiles": [],
+            "facilities": [], "ratings": [], "pilot_ratings": []}
+
+
+def live_clients(n: int):
+    return [{"callsign": f"BEN{i:05d}", "squawk": "1200", "type": "N", "lat": 50.0 + i * 1e-3,
+             "lon": 8.0 + i * 1e-3, "alt": 30000, "gs": 450, "vs": 0, "pbh_u32": 0x12345678,
+             "hdg_deg": 91.5, "hdg_deg_round": 92, "pitch_deg": -3, "bank_deg": 4,
+             "on_ground": False, "ts": 1_700_000_000} for i in range(n)]
+
+
+def rate(client, url: str, seconds: float, **kw) -> float:
+    n = 0
+    t0 = time.perf_counter()
+    while time.perf_counter() - t0 < seconds:
+        resp = client.get(url, **kw)
+        resp.get_data()
+        n += 1
+    return n / (time.perf_counter() - t0)
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--aircraft", type=int, default=2000)
+    ap.add_argument("--seconds", type=float, default=2.0)
+    args = ap.parse_args()
+
+    with tempfile.TemporaryDirectory() as d:
+        path = Path(d) / "fsd-data.json"
+        path.write_bytes(json.dumps(fsd_data_doc(args.aircraft), separators=(",", ":")).encode())
+        A.FSD_DATA = CachedFile(path, lambda f: VersionedBody(f.read(), os.fstat(f.fileno()).st_mtime))
+        A.FSD_DATA.watched = True
+        A.FSD_DATA.refresh()
+
+        # bisheriger Handler: Datei bei jedem Request lesen
+        @A.app.route("/bench/old-fsd-data")
+        def old_fsd_data():
+            with open(path, "r", encoding="utf-8") as f:
+                return A.app.response_class(response=f.read(), status=200, mimetype="application/json")
+
+        @A.app.route("/bench/old-live-snapshot")
+        def old_live_snapshot():
+            with A.LIVE_CACHE_LOCK:
+                body = fragcache.dumps(A.live_snapshot_payload())
+            return A.app.response_class(body, mimetype="application/json")
+
+        c = A.app.test_client()
+        tok = {"X-FSD-Token": A.LIVE_PUSH_TOKEN}
+        c.post("/api/live_update", json={"type": "full", "epoch": "b", "seq": 1,
+                                         "clients": live_clients(args.aircraft)}, headers=tok)
+
+        size = path.stat().st_size
+        gz = len(A.FSD_DATA.get().variant("gzip"))
+        print(f"{args.aircraft} aircraft, fsd-data.json {size / 1024:.0f} KiB (gzip {gz / 1024:.0f} KiB)")
+        print(f"{'endpoint':<20} {'variant':<12} {'req/s':>9}")
+        for name, old, new in (("/fsd-data.json", "/bench/old-fsd-data", "/fsd-data.json"),
+                               ("/api/live_snapshot", "/bench/old-live-snapshot", "/api/live_snapshot")):
+            etag = c.get(new).headers["ETag"]
+            gz_etag = c.get(new, headers={"Accept-Encoding": "gzip"}).headers["ETag"]
+            for label, url, headers in (
+                ("alt", old, {}),
+                ("neu", new, {}),
+                ("neu gzip", new, {"Accept-Encoding": "gzip"}),
+                ("neu 304", new, {"If-None-Match": etag}),
+                ("neu gzip 304", new, {"Accept-Encoding": "gzip", "If-None-Match": gz_etag}),
+            ):
+                print(f"{name:<20} {label:<12} {rate(c, url, args.seconds, headers=headers):9.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,231 @@
+"""
+Benchmark: altes parse_position_line (dict pro Paket, try/except-Fallback,
+time.time() pro Paket) gegen fsdparse.FeedParser (Dispatch-Tabelle, Layout pro
+Verbindung gemerkt, __slots__-Records, Squawk/PBH pro Rohtext gemerkt).
+
+    cd web && python -m bench.bench_parser --lines 200000
+"""
+import argparse
+import math
+import time
+from typing import Any, Dict, Optional
+
+from bench.common import pack_pbh, pilot_line
+from fsdparse import FeedParser
+
+# -----------------------------------------------------------------------------
+# Referenz: Parser-Stand vor fsdparse (1:1 übernommen)
+# -----------------------------------------------------------------------------
+PITCH_MULT = 256.0 / 90.0
+BANK_MULT = 512.0 / 180.0
+HDG_MULT = 1024.0 / 360.0
+
+
+def sign_extend_10bit(x: int) -> int:
+    x &= 0x3FF
+    return x - 0x400 if (x & 0x200) else x
+
+
+def unpack_pbh(pbh_u32: int) -> Dict[str, Any]:
+    pbh = pbh_u32 & 0xFFFFFFFF
+    unused = (pbh >> 0) & 0x1
+    onground = (pbh >> 1) & 0x1
+    hdg_raw = (pbh >> 2) & 0x3FF
+    bank_raw = sign_extend_10bit((pbh >> 12) & 0x3FF)
+    pitch_raw = sign_extend_10bit((pbh >> 22) & 0x3FF)
+    pitch_deg = math.floor(pitch_raw / -PITCH_MULT)
+    bank_deg = math.floor(bank_raw / -BANK_MULT)
+    heading_deg = hdg_raw / HDG_MULT
+    return {
+        "pbh_u32": pbh,
+        "unused": unused,
+        "on_ground": bool(onground),
+        "hdg_raw": hdg_raw,
+        "bank_raw": bank_raw,
+        "pitch_raw": pitch_raw,
+        "heading_deg": heading_deg,
+        "heading_deg_rounded": int(round(heading_deg)) % 360,
+        "pitch_deg": pitch_deg,
+        "bank_deg": bank_deg,
+    }
+
+
+def legacy_parse_position_line(line: str) -> Optional[Dict[str, Any]]:
+    """
+    Unterstützte Formate:
+
+    (A) Classic FSD (wie in fsd/clinterface.cpp sendpilotpos):
+      @IDENTFLAG:CALLSIGN:TRANSPONDER:RATING:LAT:LON:ALT:GS:PBH:FLAGS
+
+    (B) Legacy/alt (dein bisheriges Erwartungsformat):
+      @CALLSIGN:SQUAWK:TYPE:LAT:LON:ALT:GS:PBH:VS
+    """
+    if "@" not in line:
+        return None
+
+    line = line[line.find("@"):].strip()
+    if not line.startswith("@"):
+        return None
+
+    parts = line[1:].split(":")
+    if len(parts) < 9:
+        return None
+
+    # --- Versuch A: Classic FSD Format (10 Felder) ---
+    # IDENTFLAG ist oft ein einzelner Buchstabe (z.B. "P"), Callsign ist Text,
+    # LAT ist float etc.
+    if len(parts) >= 10:
+        identflag = parts[0].strip()
+        callsign = parts[1].strip()
+        try:
+            squawk = str(int(parts[2].strip()))
+            # rating = int(parts[3])  # optional
+            lat = float(parts[4])
+            lon = float(parts[5])
+            alt = int(float(parts[6]))
+            gs  = int(float(parts[7]))
+            pbh_raw = int(float(parts[8]))
+            # flags = int(parts[9])  # optional
+            vs = 0  # im Classic-Pilotpos nicht enthalten
+        except ValueError:
+            # falls es doch nicht passt, unten Fallback probieren
+            identflag = None
+        else:
+            decoded = unpack_pbh(pbh_raw)
+            return {
+                "callsign": callsign,
+                "squawk": squawk,
+                "type": identflag,     # für Anzeige im Dashboard
+                "lat": lat,
+                "lon": lon,
+                "alt": alt,
+                "gs": gs,
+                "vs": vs,
+
+                "pbh_u32": decoded["pbh_u32"],
+                "hdg_deg": round(decoded["heading_deg"], 2),
+                "hdg_deg_round": decoded["heading_deg_rounded"],
+                "pitch_deg": decoded["pitch_deg"],
+                "bank_deg": decoded["bank_deg"],
+                "on_ground": decoded["on_ground"],
+
+                "ts": int(time.time())
+            }
+
+    # --- Versuch B: Legacy Format (deine alte Erwartung) ---
+    if len(parts) >= 9:
+        callsign = parts[0].strip()
+        squawk = parts[1].strip()
+        ctype = parts[2].strip()
+
+        try:
+            lat = float(parts[3])
+            lon = float(parts[4])
+            alt = int(float(parts[5]))
+            gs  = int(float(parts[6]))
+            pbh_raw = int(float(parts[7]))
+            vs  = int(float(parts[8]))
+        except ValueError:
+            return None
+
+        decoded = unpack_pbh(pbh_raw)
+        return {
+            "callsign": callsign,
+            "squawk": squawk,
+            "type": ctype,
+            "lat": lat,
+            "lon": lon,
+            "alt": alt,
+            "gs": gs,
+            "vs": vs,
+
+            "pbh_u32": decoded["pbh_u32"],
+            "hdg_deg": round(decoded["heading_deg"], 2),
+            "hdg_deg_round": decoded["heading_deg_rounded"],
+            "pitch_deg": decoded["pitch_deg"],
+            "bank_deg": decoded["bank_deg"],
+            "on_ground": decoded["on_ground"],
+
+            "ts": int(time.time())
+        }
+
+    return None
+
+
+# -----------------------------------------------------------------------------
+
+
+def make_lines(n: int, aircraft: int = 5000):
+    out = []
+    for i in range(n):
+        a = i % aircraft
+        line = pilot_line(f"BEN{a:05d}", 50.0 + a * 1e-3, 8.0 + i * 1e-6, 35000, 450,
+                          pack_pbh(2, -10, (a * 7 + i) % 360), squawk=1000 + a % 7000)
+        out.append(line.decode("ascii").strip())
+    return out
+
+
+def run_legacy(lines):
+    n = 0
+    for s in lines:
+        if legacy_parse_position_line(s):
+            n += 1
+    return n
+
+
+def run_feedparser(lines):
+    n = 0
+    parser = FeedParser()
+    ts = int(time.time())
+    for s in lines:
+        if parser.parse(s, ts) is not None:
+            n += 1
+    return n
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--lines", type=int, default=200000)
+    ap.add_argument("--repeat", type=int, default=3)
+    args = ap.parse_args()
+
+    lines = make_lines(args.lines)
+
+    # Ergebnisgleichheit prüfen (ts ausgenommen)
+    parser = FeedParser()
+    for s in lines[:2000]:
+        old = legacy_parse_position_line(s)
+        new = parser.parse(s, 0).to_dict()
+        old.pop("ts"), new.pop("ts")
+        assert old == new, (old, new)
+
+    # Randfälle: kaputte 9-Feld-Zeile darf das Format nicht festlegen, Squawk mit
+    # führender Null, PBH außerhalb uint32, Wechsel Legacy <-> Classic
+    parser = FeedParser()
+    tricky = ["@N:X:1200:1:1:2:3:4:5", lines[0], "@N:TST1:0200:1:50.0:8.0:1000:100:-4:0",
+              "@N:TST2:7000:1:50.0:8.0:1000:100:%d:0" % (1 << 33 | 0x2C), lines[1],
+              "@TST3:1200:B738:50.0:8.0:1000:100:4:-500", "@TST3:1200:B738:50.1:8.0:1100:100:4:-500",
+              lines[2], "@N:TST4:1200:1:50.0:8.0:1000.0:100:4:0"]
+    for s in tricky:
+        old = legacy_parse_position_line(s)
+        new = parser.parse(s, 0)
+        new = new.to_dict() if new is not None else None
+        if old is not None:
+            old.pop("ts"), new.pop("ts")
+        assert old == new, (s, old, new)
+
+    print(f"{'parser':12} {'lines':>8} {'sec':>8} {'updates/s/core':>15}")
+    results = {}
+    for name, fn in (("legacy", run_legacy), ("feedparser", run_feedparser)):
+        best = float("inf")
+        for _ in range(args.repeat):
+            t0 = time.perf_counter()
+            assert fn(lines) == len(lines)
+            best = min(best, time.perf_counter() - t0)
+        results[name] = len(lines) / best
+        print(f"{name:12} {len(lines):8d} {best:8.3f} {results[name]:15,.0f}")
+    print(f"speedup: {results['feedparser'] / results['legacy']:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+"""
+Benchmark: Push per urllib (neue TCP-Verbindung pro Push) gegen PushChannel
+(persistente Keep-Alive-Verbindung).
+
+Gemessen werden Latenz pro Push, neu aufgebaute Verbindungen und – falls
+strace installiert ist – die Syscalls pro Push (Kindprozess unter strace -c).
+
+    cd web && python -m bench.bench_push --pushes 500
+"""
+import argparse
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+import fragcache
+from bench.common import PushReceiver, percentile
+from observer import PushChannel, http_post_json
+
+
+def make_payload(clients: int) -> dict:
+    return {
+        "type": "delta", "epoch": "bench", "seq": 1, "base": 0, "removed": [], "added": [],
+        "changed": [{"callsign": f"BEN{i:05d}", "lat": 50.0, "lon": 8.0, "alt": 1} for i in range(clients)],
+        "ts": 0, "bot": {"connected": True, "since": 0},
+    }
+
+
+def run_mode(mode: str, url: str, pushes: int, clients: int):
+    """-> (Latenzen in ms, Anzahl Verbindungen)"""
+    payload = make_payload(clients)
+    lat = []
+    if mode == "urllib":
+        for _ in range(pushes):
+            t0 = time.perf_counter()
+            http_post_json(url, "x", payload)
+            lat.append((time.perf_counter() - t0) * 1000)
+        return lat, pushes
+
+    # PushChannel synchron über post() gemessen (ohne Sender-Thread/Queue)
+    channel = PushChannel(url, "x")
+    for _ in range(pushes):
+        t0 = time.perf_counter()
+        channel.post(fragcache.dumps(payload).encode("utf-8"))
+        lat.append((time.perf_counter() - t0) * 1000)
+    return lat, channel.connects
+
+
+def count_syscalls(mode: str, url: str, pushes: int, clients: int):
+    strace = shutil.which("strace")
+    if not strace:
+        return None
+    with tempfile.NamedTemporaryFile(suffix=".strace") as out:
+        cmd = [strace, "-f", "-c", "-o", out.name, sys.executable, "-m", "bench.bench_push",
+               "--child", mode, "--url", url, "--pushes", str(pushes), "--clients", str(clients)]
+        subprocess.run(cmd, check=True, stdout=subprocess.DEVNULL,
+                       cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+        total = None
+        for line in open(out.name):
+            if line.strip().endswith("total"):
+                total = int(line.split()[2])
+    return total
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--pushes", type=int, default=500)
+    ap.add_argument("--clients", type=int, default=50, help="geänderte Clients pro Payload")
+    ap.add_argument("--child", choices=("urllib", "keepalive"), help=argparse.SUPPRESS)
+    ap.add_argument("--url", help=argparse.SUPPRESS)
+    args = ap.parse_args()
+
+    if args.child:
+        run_mode(args.child, args.url, args.pushes, args.clients)
+        return
+
+    receiver = PushReceiver().start()
+    print(f"{'transport':10} {'pushes':>7} {'p50 ms':>8} {'p99 ms':>8} {'connects':>9} {'syscalls/push':>14}")
+    for mode in ("urllib", "keepalive"):
+        lat, connects = run_mode(mode, receiver.url, args.pushes, args.clients)
+        # Interpreterstart herausrechnen
+        base = count_syscalls(mode, receiver.url, 0, args.clients)
+        total = count_syscalls(mode, receiver.url, args.pushes, args.clients)
+        per_push = f"{(total - base) / args.pushes:14.1f}" if total is not None else f"{'n/a (strace)':>14}"
+        print(f"{mode:10} {args.pushes:7d} {percentile(lat, 50):8.3f} {percentile(lat, 99):8.3f} "
+              f"{connects:9d} {per_push}")
+    receiver.stop()
+
+
+if __name__ == "__main__":
+    main()
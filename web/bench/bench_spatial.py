@@ -0,0 +1,105 @@
+"""
+Benchmark: bbox-Abfragen über die Live-Positionen.
+
+Vergleicht spatial.GridIndex mit einem linearen Scan über alle Clients
+(bisher: komplette Liste ausliefern / filtern) für einen Flughafen-Ausschnitt,
+eine Region und die Weltansicht, dazu die Kosten pro Positions-Update.
+Verteilung: Großteil in wenigen Ballungsräumen, Rest weltweit.
+
+Zusätzlich: spatial.ClusterGrid – Mehrkosten pro Update für die laufenden
+Summen und Zeit für clusters() je Zoom (ohne Cache, also nach einer Änderung).
+
+    cd web && python -m bench.bench_spatial --aircraft 10000 50000
+"""
+import argparse
+import random
+import time
+
+from spatial import ClusterGrid, GridIndex
+
+HUBS = [(50.03, 8.57), (51.47, -0.45), (40.64, -73.78), (33.94, -118.41), (35.55, 139.78),
+        (25.25, 55.36), (1.36, 103.99), (-33.95, 151.18), (49.01, 2.55), (52.31, 4.76)]
+
+BOXES = {
+    "airport": (8.0, 49.7, 9.2, 50.4),     # FRA, Zoom ~10
+    "region": (-10.0, 42.0, 20.0, 58.0),   # Mitteleuropa, Zoom ~5
+    "world": (-180.0, -85.0, 180.0, 85.0),  # Zoom 2
+}
+
+
+def positions(n: int, rng: random.Random):
+    out = {}
+    for i in range(n):
+        if rng.random() < 0.7:
+            lat, lon = rng.choice(HUBS)
+            lat += rng.gauss(0, 3.0)
+            lon += rng.gauss(0, 4.0)
+        else:
+            lat, lon = rng.uniform(-70, 75), rng.uniform(-180, 180)
+        out[f"BEN{i:06d}"] = (max(-90.0, min(90.0, lat)), (lon + 180.0) % 360.0 - 180.0)
+    return out
+
+
+def linear(pos, box):
+    w, s, e, n = box
+    return [cs for cs, (lat, lon) in pos.items() if s <= lat <= n and w <= lon <= e]
+
+
+def best_of(fn, repeat: int = 20) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    return best * 1000
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--aircraft", type=int, nargs="+", default=[10000, 50000])
+    ap.add_argument("--cell", type=float, default=1.0)
+    args = ap.parse_args()
+    rng = random.Random(1)
+
+    print(f"{'aircraft':>8} {'box':>8} {'hits':>7} {'linear ms':>10} {'grid ms':>9} {'speedup':>8}")
+    for n in args.aircraft:
+        pos = positions(n, rng)
+        grid = GridIndex(args.cell)
+        for cs, (lat, lon) in pos.items():
+            grid.update(cs, lat, lon)
+        for name, box in BOXES.items():
+            hits = grid.query(box)
+            assert sorted(hits) == sorted(linear(pos, box))
+            t_lin = best_of(lambda: linear(pos, box))
+            t_grid = best_of(lambda: grid.query(box))
+            print(f"{n:>8} {name:>8} {len(hits):>7} {t_lin:10.3f} {t_grid:9.3f} {t_lin / t_grid:7.1f}x")
+
+        # Positions-Update: kleine Bewegung, gelegentlich Zellwechsel
+        moves = [(cs, lat + rng.uniform(-0.01, 0.01), lon + rng.uniform(-0.01, 0.01))
+                 for cs, (lat, lon) in pos.items()]
+        t0 = time.perf_counter()
+        for cs, lat, lon in moves:
+            grid.update(cs, lat, lon)
+        print(f"{n:>8} update {(time.perf_counter() - t0) / len(moves) * 1e6:.2f} µs/aircraft")
+
+        clusters = ClusterGrid(args.cell)
+        for cs, (lat, lon) in pos.items():
+            clusters.update(cs, lat, lon)
+        t0 = time.perf_counter()
+        for cs, lat, lon in moves:
+            clusters.update(cs, lat, lon)
+        print(f"{n:>8} update with cluster sums {(time.perf_counter() - t0) / len(moves) * 1e6:.2f} µs/aircraft")
+        for zoom in (2, 4, 5):
+            factor = clusters.cluster_factor(zoom)
+
+            def fresh():
+                clusters.version += 1
+                return clusters.clusters(factor)
+
+            t = best_of(fresh)
+            print(f"{n:>8} zoom {zoom}: {len(fresh()):>5} clusters ({factor * args.cell:g}°) in {t:.3f} ms, "
+                  f"cached {best_of(lambda: clusters.clusters(factor)) * 1000:.2f} µs")
+
+
+if __name__ == "__main__":
+    main()
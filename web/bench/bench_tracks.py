@@ -0,0 +1,56 @@
+"""
+Benchmark: Positionsverlauf (tracks.TrackStore).
+
+Misst Speicher pro Flugzeug (tracemalloc, inkl. Python-Overhead) gegenüber dem
+nominellen Wert, Kosten pro record() und pro Trail-Abfrage mit und ohne
+Douglas-Peucker.
+
+    cd web && python -m bench.bench_tracks --aircraft 10000 --samples 128
+"""
+import argparse
+import math
+import time
+import tracemalloc
+
+from tracks import SAMPLE_BYTES, TrackStore, simplify
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--aircraft", type=int, default=10000)
+    ap.add_argument("--samples", type=int, default=128)
+    args = ap.parse_args()
+
+    tracemalloc.start()
+    base = tracemalloc.get_traced_memory()[0]
+    store = TrackStore(samples=args.samples, max_bytes=1 << 40, min_interval=0)
+    for i in range(args.aircraft):
+        store.record(f"BEN{i:05d}", 0, 50.0, 8.0, 30000, 450, 90)
+    used = tracemalloc.get_traced_memory()[0] - base
+    tracemalloc.stop()
+    print(f"{args.aircraft} aircraft x {args.samples} samples: nominal {store.bytes_per_aircraft} B/aircraft "
+          f"(payload {args.samples * SAMPLE_BYTES} B), "
+          f"measured {used / args.aircraft:.0f} B/aircraft ({used / 2 ** 20:.1f} MiB)")
+
+    t0 = time.perf_counter()
+    for k in range(1, args.samples + 1):
+        for i in range(0, args.aircraft, 10):
+            store.record(f"BEN{i:05d}", k, 50.0 + 0.01 * math.sin(k / 10), 8.0 + 0.01 * k, 30000, 450, 90)
+    n = args.samples * len(range(0, args.aircraft, 10))
+    print(f"record: {(time.perf_counter() - t0) / n * 1e6:.2f} µs/sample")
+
+    reps = 2000
+    t0 = time.perf_counter()
+    for _ in range(reps):
+        pts = store.trail("BEN00000")
+    t_trail = (time.perf_counter() - t0) / reps * 1e6
+    for tol in (10.0, 100.0, 1000.0):
+        t0 = time.perf_counter()
+        for _ in range(reps // 10):
+            keep = simplify(pts, tol)
+        t_dp = (time.perf_counter() - t0) / (reps // 10) * 1e6
+        print(f"trail {len(pts)} pts: {t_trail:.1f} µs, simplify {tol:g} m -> {len(keep)} pts in {t_dp:.1f} µs")
+
+
+if __name__ == "__main__":
+    main()
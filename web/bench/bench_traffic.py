@@ -0,0 +1,120 @@
+"""
+Benchmark: Speicher und Snapshot-Zeit der Live-Tabelle.
+
+Vergleicht für N Flugzeuge
+  - dict pro Flugzeug (ursprüngliche Variante, ca. 15 Keys),
+  - PilotPosition-Record pro Flugzeug (__slots__),
+  - traffic.TrafficTable (Record + Zeilenversion pro Callsign).
+
+Speicher per tracemalloc (nur die Tabelle, ohne Interpreter), Snapshot =
+was der Observer pro Push unter dem Lock kopiert; "delta in" = Snapshot plus
+Änderungserkennung für einen Push.
+
+    cd web && python -m bench.bench_traffic --aircraft 10000
+"""
+import argparse
+import gc
+import time
+import tracemalloc
+
+from fsdparse import PilotPosition
+from traffic import TrafficTable
+
+
+def make_record(i: int, tick: int) -> PilotPosition:
+    return PilotPosition(f"BEN{i:05d}", "1200", "N", 50.0 + i * 1e-3 + tick * 1e-4, 8.0 + i * 1e-3,
+                         1000 + tick, 450, 0, 0x12345678, 1_700_000_000 + tick, 91.5, 92, -3, 4, False)
+
+
+def measure_memory(build):
+    tracemalloc.start()
+    base = tracemalloc.get_traced_memory()[0]
+    obj = build()
+    used = tracemalloc.get_traced_memory()[0] - base
+    tracemalloc.stop()
+    return obj, used
+
+
+def timeit(fn, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--aircraft", type=int, default=10000)
+    ap.add_argument("--repeat", type=int, default=20)
+    args = ap.parse_args()
+    n = args.aircraft
+
+    def build_dicts():
+        return {f"BEN{i:05d}": make_record(i, 0).to_dict() for i in range(n)}
+
+    def build_records():
+        return {f"BEN{i:05d}": make_record(i, 0) for i in range(n)}
+
+    def build_table():
+        t = TrafficTable()
+        for i in range(n):
+            t.upsert(make_record(i, 0))
+        return t
+
+    dicts, mem_dicts = measure_memory(build_dicts)
+    records, mem_records = measure_memory(build_records)
+    table, mem_table = measure_memory(build_table)
+
+    # Snapshot wie pro Push: dicts tief kopieren (alt), Records flach, Tabelle versioniert
+    def snap_dicts():
+        return [dict(d) for d in dicts.values()]
+
+    def snap_records():
+        return dict(records)
+
+    def snap_table():
+        table.version += 1  # erzwingt neue Kopie statt des gecachten Snapshots
+        return table.snapshot()
+
+    t_dicts = timeit(snap_dicts, args.repeat)
+    t_records = timeit(snap_records, args.repeat)
+    t_table = timeit(snap_table, args.repeat)
+    t_table_versions = timeit(lambda: snap_table().versions(), args.repeat)
+
+    # Update-Kosten pro Position
+    recs = [make_record(i, 1) for i in range(n)]
+    gc.collect()
+    t0 = time.perf_counter()
+    for r in recs:
+        dicts[r.callsign] = r.to_dict()
+    up_dicts = time.perf_counter() - t0
+    gc.collect()
+    t0 = time.perf_counter()
+    for r in recs:
+        records[r.callsign] = r
+    up_records = time.perf_counter() - t0
+    upsert = table.upsert  # wie Observer.update_clients
+    gc.collect()
+    t0 = time.perf_counter()
+    for r in recs:
+        upsert(r)
+    up_table = time.perf_counter() - t0
+    recs = [make_record(i, 2) for i in range(n)]
+    gc.collect()
+    t0 = time.perf_counter()
+    table.upsert_many(recs)
+    up_table_many = time.perf_counter() - t0
+
+    print(f"{n} Flugzeuge")
+    print(f"{'variant':<14} {'MB':>7} {'B/ac':>6} {'snap ms':>8} {'upd us':>7}")
+    print(f"{'dict':<14} {mem_dicts / 1e6:7.2f} {mem_dicts / n:6.0f} {t_dicts * 1000:8.3f} {up_dicts / n * 1e6:7.2f}")
+    print(f"{'record':<14} {mem_records / 1e6:7.2f} {mem_records / n:6.0f} {t_records * 1000:8.3f} {up_records / n * 1e6:7.2f}")
+    print(f"{'table':<14} {mem_table / 1e6:7.2f} {mem_table / n:6.0f} {t_table * 1000:8.3f} {up_table / n * 1e6:7.2f}")
+    print(f"table upsert_many: {up_table_many / n * 1e6:.2f} us/upd")
+    print(f"table snapshot + versions(): {t_table_versions * 1000:.3f} ms")
+
+
+if __name__ == "__main__":
+    main()
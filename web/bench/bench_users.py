@@ -0,0 +1,87 @@
+"""
+Benchmark: Benutzerverwaltung mit vielen Accounts.
+
+"alt" bildet den bisherigen /users-Handler nach (neue Verbindung, CREATE TABLE,
+Full-Scan mit Sortierung über CAST(cid AS INTEGER), MAX() über alle Zeilen und
+eine verworfene dritte Abfrage, danach alle Zeilen ins Template). "neu" ist
+/users bzw. /api/users über certdb.CertDB (Pool, Index auf der numerischen
+CID, eine Seite per Keyset-Cursor; OFFSET zum Vergleich). Außerdem: CSV-Import in einer Transaktion.
+
+    cd web && python -m bench.bench_users --accounts 100000
+"""
+import argparse
+import os
+import sqlite3
+import tempfile
+import time
+
+import app as A
+from certdb import SCHEMA, CertDB
+
+
+def old_users(path: str):
+    conn = sqlite3.connect(path)
+    c = conn.cursor()
+    c.execute(SCHEMA)
+    c.execute("SELECT cid, password, level, twitch_name FROM cert WHERE cid != ? ORDER BY CAST(cid AS INTEGER)",
+              (A.BOT_CID,))
+    users = c.fetchall()
+    c.execute("SELECT MAX(CAST(cid AS INTEGER)) FROM cert")
+    c.fetchone()
+    c.execute("SELECT cid, password, level, twitch_name FROM cert WHERE CAST(cid AS INTEGER) != 1 "
+              "ORDER BY CAST(cid AS INTEGER)")
+    conn.close()
+    return users
+
+
+def per_call_ms(fn, rounds: int) -> float:
+    t0 = time.perf_counter()
+    for _ in range(rounds):
+        fn()
+    return (time.perf_counter() - t0) / rounds * 1000
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--accounts", type=int, default=100_000)
+    ap.add_argument("--rounds", type=int, default=20)
+    args = ap.parse_args()
+
+    with tempfile.TemporaryDirectory() as d:
+        path = os.path.join(d, "cert.sqlitedb3")
+        db = A.CERT_DB = CertDB(path, exclude_cid=A.BOT_CID)
+        csv_data = "cid,password,level,twitch_name\n" + "".join(
+            f"{1000001 + i},pw{i},1,tw{i}\n" for i in range(args.accounts))
+        t0 = time.perf_counter()
+        result = db.import_csv(csv_data)
+        print(f"CSV-Import {result['imported']} Zeilen: {(time.perf_counter() - t0) * 1000:.0f} ms")
+
+        # alter Handler: Template mit allen Zeilen
+        @A.app.route("/bench/old-users")
+        def bench_old_users():
+            return A.render_template("users.html", users=old_users(path), total=args.accounts,
+                                     page=1, pages=1, q="", imported=None, skipped=None, next_cid=0)
+
+        c = A.app.test_client()
+        mid = str(1000001 + args.accounts // 2)[:5]
+        last = max(1, -(-args.accounts // A.USERS_PER_PAGE))
+        cursor = str(1000001 + (last - 1) * A.USERS_PER_PAGE - 1)  # letzte CID der vorletzten Seite
+        print(f"{'variant':<28} {'ms':>9}")
+        for label, fn, rounds in (
+            ("alt Abfragen", lambda: old_users(path), max(1, args.rounds // 4)),
+            ("neu page(1)", lambda: db.page(1, A.USERS_PER_PAGE), args.rounds * 10),
+            ("neu page(letzte) OFFSET", lambda: db.page(last, A.USERS_PER_PAGE), args.rounds),
+            ("neu page(letzte) Keyset", lambda: db.page(last, A.USERS_PER_PAGE, after=cursor), args.rounds * 10),
+            ("neu next_cid", db.next_cid, args.rounds * 10),
+            (f"neu Suche CID {mid}", lambda: db.page(1, A.USERS_PER_PAGE, mid), args.rounds),
+            ("neu Suche Twitch", lambda: db.page(1, A.USERS_PER_PAGE, "tw4242"), args.rounds),
+            ("alt GET /users", lambda: c.get("/bench/old-users").get_data(), max(1, args.rounds // 4)),
+            ("neu GET /users", lambda: c.get("/users").get_data(), args.rounds * 5),
+            ("neu GET /api/users", lambda: c.get("/api/users").get_data(), args.rounds * 5),
+        ):
+            print(f"{label:<28} {per_call_ms(fn, rounds):9.2f}")
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+"""
+Benchmark: Bytes pro Push für eine Karte mit Viewport-Abo gegenüber dem
+bisherigen Broadcast aller Clients.
+
+Spielt Keyframe + Deltas (alle Flugzeuge bewegen sich) über /api/live_update
+ein und zählt, was ein Dashboard-Socket (live_delta an alle) und Karten-Sockets
+mit Flughafen-, Regions- und Weltausschnitt empfangen. "lock" ist die Zeit pro Push
+unter LIVE_CACHE_LOCK (blockiert Snapshots und Karten-Abos).
+
+    cd web && python -m bench.bench_viewport --aircraft 10000
+"""
+import argparse
+import random
+import time
+
+import app as A
+import fragcache
+from bench.bench_spatial import HUBS, positions
+
+VIEWS = {
+    "airport": "8.0,49.7,9.2,50.4",
+    "region": "-10,42,20,58",
+    "world": "-180,-85,180,85",
+}
+
+
+class TimedLock:
+    """Misst, wie lange der Lock gehalten wird."""
+
+    def __init__(self, lock):
+        self.lock = lock
+        self.held = 0.0
+
+    def __enter__(self):
+        self.lock.acquire()
+        self._t0 = time.perf_counter()
+
+    def __exit__(self, *exc):
+        self.held += time.perf_counter() - self._t0
+        self.lock.release()
+
+
+def received_bytes(client) -> int:
+    return sum(len(fragcache.dumps(m["args"])) for m in client.get_received())
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--aircraft", type=int, default=10000)
+    ap.add_argument("--pushes", type=int, default=5)
+    args = ap.parse_args()
+    rng = random.Random(1)
+    assert HUBS
+
+    pos = positions(args.aircraft, rng)
+    clients = [{"callsign": cs, "lat": lat, "lon": lon, "alt": 30000, "gs": 450, "hdg_deg_round": 90}
+               for cs, (lat, lon) in pos.items()]
+    c = A.app.test_client()
+    tok = {"X-FSD-Token": A.LIVE_PUSH_TOKEN}
+    c.post("/api/live_update", json={"type": "full", "epoch": "b", "seq": 1, "clients": clients}, headers=tok)
+
+    dash = A.socketio.test_client(A.app)
+    maps = {}
+    for name, bbox in VIEWS.items():
+        m = A.socketio.test_client(A.app, query_string="view=map")
+        m.emit("map_view", {"bbox": bbox})
+        maps[name] = m
+    dash.get_received()
+    initial = {name: received_bytes(m) for name, m in maps.items()}
+
+    lock = A.LIVE_CACHE_LOCK = TimedLock(A.LIVE_CACHE_LOCK)
+    totals = {name: 0 for name in maps}
+    dash_total = 0
+    push_ms = 0.0
+    lock_ms = 0.0
+    for seq in range(2, 2 + args.pushes):
+        changed = [{"callsign": cl["callsign"], "lat": cl["lat"] + rng.uniform(-0.02, 0.02),
+                    "lon": cl["lon"] + rng.uniform(-0.02, 0.02)} for cl in clients]
+        t0 = time.perf_counter()
+        held = lock.held
+        c.post("/api/live_update", json={"type": "delta", "epoch": "b", "seq": seq, "base": seq - 1,
+                                         "added": [], "changed": changed, "removed": []}, headers=tok)
+        push_ms += (time.perf_counter() - t0) * 1000
+        lock_ms += (lock.held - held) * 1000
+        dash_total += received_bytes(dash)
+        for name, m in maps.items():
+            totals[name] += received_bytes(m)
+
+    n = args.pushes
+    print(f"{args.aircraft} aircraft, {n} pushes, /api/live_update {push_ms / n:.1f} ms/push, "
+          f"lock {lock_ms / n:.2f} ms/push")
+    print(f"{'socket':<14} {'initial KiB':>11} {'KiB/push':>9}")
+    print(f"{'dashboard':<14} {'-':>11} {dash_total / n / 1024:9.1f}")
+    for name in maps:
+        print(f"{'map ' + name:<14} {initial[name] / 1024:11.1f} {totals[name] / n / 1024:9.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,169 @@
+"""
+Gemeinsame Helfer für die Benchmarks: Fake-FSD-Server, Push-Empfänger, PBH-Encoder.
+"""
+import json
+import os
+import resource
+import socket
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Dict, List, Optional
+
+WEB_DIR = Path(__file__).resolve().parent.parent
+OBSERVER_PATH = WEB_DIR / "observer.py"
+
+
+def pack_pbh(pitch_deg: float, bank_deg: float, hdg_deg: float, on_ground: bool = False) -> int:
+    """Gegenstück zu observer.unpack_pbh (Swift-kompatible Skalierung)."""
+    pitch = int(round(-pitch_deg * 256.0 / 90.0)) & 0x3FF
+    bank = int(round(-bank_deg * 512.0 / 180.0)) & 0x3FF
+    hdg = int(round((hdg_deg % 360.0) * 1024.0 / 360.0)) & 0x3FF
+    return (pitch << 22) | (bank << 12) | (hdg << 2) | (int(bool(on_ground)) << 1)
+
+
+def pilot_line(callsign: str, lat: float, lon: float, alt: int, gs: int, pbh: int,
+               squawk: int = 1200, rating: int = 1, identflag: str = "N") -> bytes:
+    """Classic-Format wie fsd/clinterface.cpp sendpilotpos (inkl. CRLF)."""
+    return (f"@{identflag}:{callsign}:{squawk}:{rating}:{lat:.5f}:{lon:.5f}:"
+            f"{alt}:{gs}:{pbh}:0\r\n").encode("ascii")
+
+
+class FakeFsdServer:
+    """
+    Minimaler FSD-Ersatz: nimmt eine Verbindung an, liest den Login und streamt
+    `aircraft` Positionen mit `rate` Updates/s. Die Höhe trägt eine Sequenznummer,
+    damit der Push-Empfänger die Latenz berechnen kann.
+    """
+
+    def __init__(self, aircraft: int = 1000, rate: int = 1000, tick: float = 0.01):
+        self.aircraft = aircraft
+        self.rate = rate
+        self.tick = tick
+        self.sent_at: Dict[int, float] = {}
+        self.sent_lines = 0
+        self._stop = threading.Event()
+        self._srv = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self._srv.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self._srv.bind(("127.0.0.1", 0))
+        self._srv.listen(1)
+        self.port = self._srv.getsockname()[1]
+
+    def start(self):
+        threading.Thread(target=self._serve, daemon=True).start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        try:
+            self._srv.close()
+        except OSError:
+            pass
+
+    def _serve(self):
+        while not self._stop.is_set():
+            try:
+                conn, _ = self._srv.accept()
+            except OSError:
+                return
+            try:
+                self._stream(conn)
+            except OSError:
+                pass
+            finally:
+                conn.close()
+
+    def _stream(self, conn: socket.socket):
+        conn.settimeout(5)
+        conn.recv(4096)  # Login (#AA/#AP + %) verwerfen
+        per_tick = max(1, int(self.rate * self.tick))
+        idx = 0
+        seq = 0
+        next_t = time.perf_counter()
+        while not self._stop.is_set():
+            seq += 1
+            out = []
+            for _ in range(per_tick):
+                n = idx % self.aircraft
+                idx += 1
+                pbh = pack_pbh(2.0, -5.0, (n * 7) % 360)
+                out.append(pilot_line(f"BEN{n:05d}", 50.0 + n * 1e-3, 8.0 + n * 1e-3, seq, 250, pbh))
+            self.sent_at[seq] = time.time()
+            conn.sendall(b"".join(out))
+            self.sent_lines += per_tick
+            next_t += self.tick
+            delay = next_t - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+
+
+class PushReceiver:
+    """HTTP-Endpunkt als Ersatz für /api/live_update; merkt sich Empfangszeit + höchste Sequenz."""
+
+    def __init__(self):
+        self.samples: List[tuple] = []
+        receiver = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            # Header und Body werden getrennt geschrieben -> ohne TCP_NODELAY 40 ms Delayed-ACK bei Keep-Alive
+            disable_nagle_algorithm = True
+
+            def do_POST(self):
+                n = int(self.headers.get("Content-Length", "0"))
+                body = self.rfile.read(n)
+                now = time.time()
+                try:
+                    data = json.loads(body)
+                    # Keyframe: clients, Delta: added + changed (nur geänderte Felder)
+                    items = data.get("clients", []) + data.get("added", []) + data.get("changed", [])
+                    seq = max((int(c.get("alt", 0)) for c in items), default=0)
+                except ValueError:
+                    seq = 0
+                receiver.samples.append((now, seq, len(body)))
+                out = b'{"ok": true}'
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(out)))
+                self.end_headers()
+                self.wfile.write(out)
+
+            def log_message(self, *args):
+                pass
+
+        self._httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self._httpd.daemon_threads = True
+        self.port = self._httpd.server_address[1]
+        self.url = f"http://127.0.0.1:{self.port}/api/live_update"
+
+    def start(self):
+        threading.Thread(target=self._httpd.serve_forever, daemon=True).start()
+        return self
+
+    def stop(self):
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+
+def children_cpu_seconds() -> float:
+    ru = resource.getrusage(resource.RUSAGE_CHILDREN)
+    return ru.ru_utime + ru.ru_stime
+
+
+def percentile(values: List[float], p: float) -> Optional[float]:
+    if not values:
+        return None
+    s = sorted(values)
+    k = min(len(s) - 1, max(0, int(round(p / 100.0 * (len(s) - 1)))))
+    return s[k]
+
+
+def observer_env(**overrides) -> Dict[str, str]:
+    env = dict(os.environ)
+    env.update({
+        "FSD_DEBUG_RX": "0",
+        "PYTHONUNBUFFERED": "1",
+    })
+    env.update({k: str(v) for k, v in overrides.items()})
+    return env
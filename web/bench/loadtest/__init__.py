@@ -0,0 +1,12 @@
+"""
+Ende-zu-Ende-Lasttest: FSD-Simulator -> observer.py -> /api/live_update -> Socket.IO.
+
+- fsdsim.py: lokaler FSD-Ersatz (Login wie der Observer, @-Positionen, #DP)
+- subscriber.py: headless Socket.IO-Abonnenten (Dashboard oder Kartenausschnitt)
+- report.py: Metriken scrapen, Bericht als JSON, Vergleich zweier Läufe
+
+Observer und Web-App laufen als eigene Prozesse wie im Betrieb; CPU und RSS
+werden pro Prozess gemessen.
+
+    cd web && python -m bench.loadtest --aircraft 2000 --rate 1 --dashboards 10 --duration 30
+"""
@@ -0,0 +1,270 @@
+"""
+Lasttest-Lauf; siehe bench/loadtest/__init__.py.
+
+    cd web && python -m bench.loadtest --aircraft 2000 --rate 1 --dashboards 10 --maps 10 \\
+        --duration 30 --label baseline --out /tmp/base.json
+    cd web && python -m bench.loadtest ... --out /tmp/new.json --compare /tmp/base.json
+"""
+import argparse
+import shutil
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from collections import Counter
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import psutil
+
+from bench.common import WEB_DIR, OBSERVER_PATH, observer_env, percentile
+from bench.loadtest import report
+from bench.loadtest.fsdsim import FsdSimulator
+from bench.loadtest.subscriber import SioSubscriber
+
+APP_PATH = WEB_DIR / "app.py"
+TOKEN = "loadtest-token"
+
+
+def free_port() -> int:
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+class LatencyRecorder:
+    """on_event eines Abonnenten: zählt Events und misst Latenz über die Tick-Nummer in alt."""
+
+    def __init__(self, sent_at: Dict[int, float], sample_per_msg: int = 64):
+        self.sent_at = sent_at
+        self.sample_per_msg = sample_per_msg
+        self.active = False
+        self.events: Counter = Counter()
+        self.updates = 0
+        self.samples: List[float] = []
+
+    def __call__(self, name: str, data: Any, recv_ts: float):
+        self.events[name] += 1
+        # Keyframes enthalten auch lange unveränderte Clients -> keine Latenzaussage
+        if not self.active or name not in ("live_delta", "map_region") or not isinstance(data, dict):
+            return
+        items = data.get("added", []) + data.get("changed", [])
+        self.updates += len(items)
+        sent_at = self.sent_at
+        for c in items[::max(1, len(items) // self.sample_per_msg)]:
+            t = sent_at.get(c.get("alt"))
+            if t is not None:
+                self.samples.append((recv_ts - t) * 1000.0)
+
+
+class ProcSampler:
+    """CPU-Sekunden und RSS-Spitze pro Komponente (psutil, alle `interval` Sekunden)."""
+
+    def __init__(self, procs: Dict[str, psutil.Process], interval: float = 0.5):
+        self.procs = procs
+        self.interval = interval
+        self.peak_rss = {name: 0 for name in procs}
+        self._cpu0: Dict[str, float] = {}
+        self._stop = threading.Event()
+
+    @staticmethod
+    def _cpu(p: psutil.Process) -> float:
+        t = p.cpu_times()
+        return t.user + t.system
+
+    def start(self) -> "ProcSampler":
+        self._cpu0 = {name: self._cpu(p) for name, p in self.procs.items()}
+        threading.Thread(target=self._run, daemon=True).start()
+        return self
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            for name, p in self.procs.items():
+                try:
+                    self.peak_rss[name] = max(self.peak_rss[name], p.memory_info().rss)
+                except psutil.Error:
+                    pass
+
+    def stop(self) -> Dict[str, float]:
+        self._stop.set()
+        out = {}
+        for name, p in self.procs.items():
+            try:
+                out[name] = self._cpu(p) - self._cpu0[name]
+            except psutil.Error:
+                out[name] = 0.0
+        return out
+
+
+def wait_for(cond, timeout: float, what: str):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if cond():
+            return
+        time.sleep(0.1)
+    raise TimeoutError(f"timed out waiting for {what}")
+
+
+def spawn(args: List[str], env: Dict[str, str], log: Path) -> subprocess.Popen:
+    with open(log, "wb") as f:
+        return subprocess.Popen([sys.executable, *args], cwd=WEB_DIR, env=env,
+                                stdout=f, stderr=subprocess.STDOUT)
+
+
+def run(args) -> Dict[str, Any]:
+    tmp = Path(tempfile.mkdtemp(prefix="fsd-loadtest-"))
+    web_port = free_port()
+    obs_metrics_port = free_port()
+    web_metrics = f"http://127.0.0.1:{web_port}/metrics"
+    obs_metrics = f"http://127.0.0.1:{obs_metrics_port}/metrics"
+
+    sim = FsdSimulator(aircraft=args.aircraft, rate=args.rate, tick=args.tick,
+                       disconnect_rate=args.disconnect_rate, offline_sec=args.offline_sec).start()
+    procs: Dict[str, subprocess.Popen] = {}
+    subs: List[SioSubscriber] = []
+    try:
+        procs["web"] = spawn([str(APP_PATH)], observer_env(
+            FSD_WEB_PORT=web_port, FSD_WEB_HOST="127.0.0.1", FSD_PUSH_TOKEN=TOKEN,
+        ), tmp / "web.log")
+        wait_for(lambda: report.scrape(web_metrics), 30, "web app")
+
+        procs["observer"] = spawn([str(OBSERVER_PATH)], observer_env(
+            FSD_HOST="127.0.0.1", FSD_PORT=sim.port,
+            FSD_PUSH_URL=f"http://127.0.0.1:{web_port}/api/live_update", FSD_PUSH_TOKEN=TOKEN,
+            FSD_PUSH_INTERVAL=args.push_interval, FSD_OBSERVER_ENGINE=args.engine,
+            FSD_DATA_JSON_PATH=tmp / "fsd-data.json", FSD_METRICS_PORT=obs_metrics_port,
+            FSD_LOG="warn",
+        ), tmp / "observer.log")
+        wait_for(lambda: sim.connected > 0, 30, "observer login")
+
+        recorders: List[LatencyRecorder] = []
+        for i in range(args.dashboards + args.maps):
+            rec = LatencyRecorder(sim.sent_at)
+            is_map = i >= args.dashboards
+            sub = SioSubscriber("127.0.0.1", web_port, query={"view": "map"} if is_map else None,
+                                on_event=rec).connect()
+            if is_map:
+                sub.emit("map_view", {"bbox": args.map_bbox, "zoom": args.map_zoom, "reset": True})
+            subs.append(sub)
+            recorders.append(rec)
+
+        time.sleep(args.warmup)
+
+        # Messfenster
+        sampler = ProcSampler({"observer": psutil.Process(procs["observer"].pid),
+                               "web": psutil.Process(procs["web"].pid),
+                               "loadtest": psutil.Process()}).start()
+        obs0, web0 = report.scrape(obs_metrics), report.scrape(web_metrics)
+        lines0, bytes0 = sim.sent_lines, sim.sent_bytes
+        sub_bytes0 = sum(s.bytes for s in subs)
+        for rec in recorders:
+            rec.active = True
+        t0 = time.monotonic()
+        time.sleep(args.duration)
+        elapsed = time.monotonic() - t0
+        for rec in recorders:
+            rec.active = False
+        cpu = sampler.stop()
+        obs1, web1 = report.scrape(obs_metrics), report.scrape(web_metrics)
+        lines1, bytes1 = sim.sent_lines, sim.sent_bytes
+        sub_bytes1 = sum(s.bytes for s in subs)
+    except Exception:
+        for name in procs:
+            print(f"❌ {name}-Log: {tmp / (name + '.log')}", file=sys.stderr)
+        raise
+    finally:
+        for sub in subs:
+            sub.close()
+        for p in procs.values():
+            p.terminate()
+        for p in procs.values():
+            try:
+                p.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                p.kill()
+        sim.stop()
+    # Logs nur bei Fehlern aufheben
+    shutil.rmtree(tmp, ignore_errors=True)
+
+    def rate(after: Dict[str, float], before: Dict[str, float], key: str) -> Optional[float]:
+        if key not in after:
+            return None
+        return (after[key] - before.get(key, 0.0)) / elapsed
+
+    def quantile_ms(samples: Dict[str, float], name: str, q: float) -> Optional[float]:
+        v = report.histogram_quantile(samples, name, q)
+        return None if v is None else v * 1000.0
+
+    lat = [v for rec in recorders for v in rec.samples]
+    events = sum(sum(rec.events.values()) for rec in recorders)
+    results = {
+        "e2e_p50_ms": percentile(lat, 50),
+        "e2e_p90_ms": percentile(lat, 90),
+        "e2e_p99_ms": percentile(lat, 99),
+        "e2e_max_ms": max(lat) if lat else None,
+        "e2e_samples": len(lat),
+        "sim_lines_per_s": (lines1 - lines0) / elapsed,
+        "sim_kib_per_s": (bytes1 - bytes0) / 1024.0 / elapsed,
+        "sim_late_ticks": sim.late_ticks,
+        "sim_dropped_clients": sim.dropped_clients,
+        "observer_rx_lines_per_s": rate(obs1, obs0, "fsd_observer_rx_lines_total"),
+        "observer_pushes_per_s": rate(obs1, obs0, "fsd_observer_pushes_total"),
+        "observer_chunk_p99_ms": quantile_ms(obs1, "fsd_observer_chunk_seconds", 0.99),
+        "observer_push_p99_ms": quantile_ms(obs1, "fsd_observer_push_seconds", 0.99),
+        "observer_push_failures": obs1.get("fsd_observer_push_failures_total"),
+        "web_live_updates_per_s": rate(web1, web0, "fsd_web_live_updates_total"),
+        "web_resyncs": web1.get("fsd_web_live_resyncs_total"),
+        "web_emit_p99_ms": quantile_ms(web1, "fsd_web_live_emit_seconds", 0.99),
+        "sub_events_per_s": events / elapsed,
+        "sub_updates_per_s": sum(rec.updates for rec in recorders) / elapsed,
+        "sub_kib_per_s": (sub_bytes1 - sub_bytes0) / 1024.0 / elapsed,
+        "sub_errors": sum(s.errors for s in subs),
+    }
+    for name, seconds in cpu.items():
+        results[f"{name}_cpu_pct"] = 100.0 * seconds / elapsed
+    for name, rss in sampler.peak_rss.items():
+        results[f"{name}_rss_mb_peak"] = rss / 1024.0 / 1024.0
+    return results
+
+
+def main():
+    ap = argparse.ArgumentParser(description="FSD -> Observer -> Web-App -> Socket.IO Lasttest")
+    ap.add_argument("--aircraft", type=int, default=1000)
+    ap.add_argument("--rate", type=float, default=1.0, help="Positionsmeldungen pro Flugzeug und Sekunde")
+    ap.add_argument("--tick", type=float, default=0.1, help="Sendetakt des Simulators (s)")
+    ap.add_argument("--disconnect-rate", type=float, default=0.5, help="#DP pro Sekunde")
+    ap.add_argument("--offline-sec", type=float, default=10.0)
+    ap.add_argument("--dashboards", type=int, default=5)
+    ap.add_argument("--maps", type=int, default=5)
+    ap.add_argument("--map-bbox", default="5,47,11,53")
+    ap.add_argument("--map-zoom", type=float, default=8)
+    ap.add_argument("--engine", default="asyncio", choices=("asyncio", "thread"))
+    ap.add_argument("--push-interval", type=float, default=1.0)
+    ap.add_argument("--warmup", type=float, default=5.0)
+    ap.add_argument("--duration", type=float, default=20.0)
+    ap.add_argument("--label", default="")
+    ap.add_argument("--out", help="Bericht als JSON schreiben")
+    ap.add_argument("--compare", help="früheren Bericht (JSON) gegenüberstellen")
+    args = ap.parse_args()
+
+    results = run(args)
+    doc = {
+        "version": report.REPORT_VERSION,
+        "label": args.label,
+        "started": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "env": report.environment(),
+        "config": {k: v for k, v in vars(args).items() if k not in ("out", "compare")},
+        "results": results,
+    }
+    if args.out:
+        report.save(doc, args.out)
+    if args.compare:
+        report.print_compare(report.load(args.compare), doc)
+    else:
+        report.print_report(doc)
+
+
+if __name__ == "__main__":
+    main()
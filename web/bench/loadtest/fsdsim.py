@@ -0,0 +1,255 @@
+"""
+Lokaler FSD-Ersatz für Lasttests.
+
+Nimmt beliebig viele Verbindungen an. Jede muss sich so anmelden, wie es
+observer._build_login_line() tut (#AA mit mindestens 7 bzw. #AP mit mindestens
+8 Feldern, danach optional die %-Position), sonst wird sie geschlossen.
+Angemeldete Verbindungen bekommen ein #TM vom "server" und dann alle denselben
+Verkehr:
+
+- #AP, wenn ein Flugzeug (wieder) auftaucht
+- @-Positionen im Classic-Format mit gültigem PBH-Wort, `rate` Meldungen/s pro Flugzeug
+- #DP-Abmeldungen (`disconnect_rate` pro Sekunde); das Flugzeug meldet sich nach
+  `offline_sec` wieder an
+
+Die Höhe trägt die Tick-Nummer, sent_at[tick] den Sendezeitpunkt (time.time()),
+damit Empfänger die Ende-zu-Ende-Latenz ausrechnen können. Wie ein echter
+FSD-Server wirft der Simulator Verbindungen raus, die nicht schnell genug lesen.
+"""
+import math
+import random
+import socket
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+from bench.common import pack_pbh, pilot_line
+
+# Knoten -> Grad Breite pro Sekunde (1 kt = 1 NM/h = 1/60 Grad/h)
+KT_TO_DEG_S = 1.0 / 60.0 / 3600.0
+
+
+def check_login(line: str) -> Optional[str]:
+    """Callsign aus einer #AA/#AP-Loginzeile; None, wenn sie nicht passt."""
+    if line.startswith("#AA"):
+        fields = line[3:].split(":")
+        ok = len(fields) >= 7
+    elif line.startswith("#AP"):
+        fields = line[3:].split(":")
+        ok = len(fields) >= 8
+    else:
+        return None
+    return fields[0] if ok and fields[0] else None
+
+
+class FsdSimulator:
+    def __init__(self, aircraft: int = 1000, rate: float = 1.0, tick: float = 0.1,
+                 disconnect_rate: float = 0.0, offline_sec: float = 10.0,
+                 center: Tuple[float, float] = (50.0, 8.0), spread_deg: float = 10.0,
+                 send_timeout: float = 5.0, seed: int = 1, host: str = "127.0.0.1", port: int = 0):
+        self.aircraft = aircraft
+        self.rate = rate
+        self.tick = tick
+        self.disconnect_rate = disconnect_rate
+        self.offline_sec = offline_sec
+        self.send_timeout = send_timeout
+        self._rng = random.Random(seed)
+        rng = self._rng
+        # Startposition, Kurs und Geschwindigkeit pro Flugzeug; bewegt wird geradlinig
+        self._lat0 = [center[0] + rng.uniform(-spread_deg, spread_deg) for _ in range(aircraft)]
+        self._lon0 = [center[1] + rng.uniform(-spread_deg, spread_deg) for _ in range(aircraft)]
+        self._hdg = [rng.uniform(0.0, 360.0) for _ in range(aircraft)]
+        self._gs = [rng.randint(140, 480) for _ in range(aircraft)]
+        # Flugzeug -> Zeitpunkt, ab dem es wieder sendet (nur abgemeldete)
+        self._offline: Dict[int, float] = {}
+        self._announced = [False] * aircraft
+
+        self.sent_at: Dict[int, float] = {}
+        self.seq = 0
+        self.sent_lines = 0
+        self.sent_bytes = 0
+        self.logins = 0
+        self.rejected = 0
+        self.dropped_clients = 0
+        self.disconnects = 0
+        self.late_ticks = 0
+
+        self._clients: List[socket.socket] = []
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._srv = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self._srv.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self._srv.bind((host, port))
+        self._srv.listen(16)
+        self.host, self.port = self._srv.getsockname()[:2]
+
+    @property
+    def connected(self) -> int:
+        with self._lock:
+            return len(self._clients)
+
+    def start(self) -> "FsdSimulator":
+        self._t0 = time.time()
+        threading.Thread(target=self._accept_loop, name="fsdsim-accept", daemon=True).start()
+        threading.Thread(target=self._stream_loop, name="fsdsim-stream", daemon=True).start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        try:
+            # weckt das blockierte accept() auf (Linux); sonst nähme es noch einen Reconnect an
+            self._srv.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
+        self._srv.close()
+        self.kick_all()
+
+    def kick_all(self):
+        """Alle Verbindungen trennen (Reconnect-Tests); Listener läuft weiter."""
+        with self._lock:
+            clients, self._clients = self._clients, []
+        for conn in clients:
+            # shutdown statt nur close: ein in recv() blockierter Thread hält das fd sonst offen (kein FIN)
+            try:
+                conn.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+            conn.close()
+
+    # -------------------------------------------------------------------------
+    # Login
+    # -------------------------------------------------------------------------
+    def _accept_loop(self):
+        while not self._stop.is_set():
+            try:
+                conn, _ = self._srv.accept()
+            except OSError:
+                return
+            threading.Thread(target=self._login, args=(conn,), daemon=True).start()
+
+    def _login(self, conn: socket.socket):
+        conn.settimeout(5.0)
+        buf = b""
+        callsign = None
+        try:
+            while b"\n" not in buf and len(buf) < 4096:
+                chunk = conn.recv(4096)
+                if not chunk:
+                    break
+                buf += chunk
+            first = buf.split(b"\n", 1)[0].decode("utf-8", errors="ignore").strip()
+            callsign = check_login(first)
+        except OSError:
+            pass
+        if callsign is None:
+            self.rejected += 1
+        if callsign is None or self._stop.is_set():
+            conn.close()
+            return
+        conn.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        conn.settimeout(self.send_timeout)
+        try:
+            conn.sendall(f"#TMserver:{callsign}:Welcome to the FSD load simulator\r\n".encode("ascii"))
+            # neue Verbindung kennt noch niemanden
+            conn.sendall(self._announce_all())
+        except OSError:
+            conn.close()
+            return
+        with self._lock:
+            self._clients.append(conn)
+        self.logins += 1
+
+    def _announce_all(self) -> bytes:
+        offline = self._offline.copy()
+        return b"".join(self._add_line(n) for n in range(self.aircraft)
+                        if self._announced[n] and n not in offline)
+
+    # -------------------------------------------------------------------------
+    # Verkehr
+    # -------------------------------------------------------------------------
+    @staticmethod
+    def callsign(n: int) -> str:
+        return f"SIM{n:05d}"
+
+    def _add_line(self, n: int) -> bytes:
+        return f"#AP{self.callsign(n)}:SERVER:{1000000 + n}::1:9:1\r\n".encode("ascii")
+
+    def _position(self, n: int, now: float, seq: int) -> bytes:
+        dt = now - self._t0
+        hdg = self._hdg[n]
+        dist = self._gs[n] * KT_TO_DEG_S * dt
+        lat = self._lat0[n] + dist * math.cos(math.radians(hdg))
+        lat = max(-89.0, min(89.0, lat))
+        lon = self._lon0[n] + dist * math.sin(math.radians(hdg)) / max(0.1, math.cos(math.radians(lat)))
+        lon = (lon + 180.0) % 360.0 - 180.0
+        pbh = pack_pbh(2.0, -3.0 + (n % 7), hdg)
+        return pilot_line(self.callsign(n), lat, lon, seq, self._gs[n], pbh, squawk=1000 + n % 7000)
+
+    def _build_tick(self, now: float, seq: int, count: int, start: int) -> Tuple[List[bytes], int]:
+        out: List[bytes] = []
+        offline = self._offline
+        for n in [n for n, until in offline.items() if until <= now]:
+            del offline[n]
+            self._announced[n] = False
+        # Abmeldungen: Erwartungswert disconnect_rate * tick pro Tick
+        if self.disconnect_rate > 0:
+            expected = self.disconnect_rate * self.tick
+            k = int(expected) + (1 if self._rng.random() < expected - int(expected) else 0)
+            for _ in range(k):
+                n = self._rng.randrange(self.aircraft)
+                if n not in offline and self._announced[n]:
+                    offline[n] = now + self.offline_sec
+                    out.append(f"#DP{self.callsign(n)}:{1000000 + n}\r\n".encode("ascii"))
+                    self.disconnects += 1
+        n = start
+        for _ in range(count):
+            n = (n + 1) % self.aircraft
+            if n in offline:
+                continue
+            if not self._announced[n]:
+                self._announced[n] = True
+                out.append(self._add_line(n))
+            out.append(self._position(n, now, seq))
+        return out, n
+
+    def _stream_loop(self):
+        # Bruchteile von Meldungen pro Tick mitnehmen, damit auch kleine Raten stimmen
+        per_tick = self.aircraft * self.rate * self.tick
+        carry = 0.0
+        idx = -1
+        next_t = time.perf_counter()
+        while not self._stop.is_set():
+            carry += per_tick
+            count = int(carry)
+            carry -= count
+            self.seq += 1
+            now = time.time()
+            lines, idx = self._build_tick(now, self.seq, count, idx)
+            if lines:
+                data = b"".join(lines)
+                self.sent_at[self.seq] = time.time()
+                self._broadcast(data)
+                self.sent_lines += len(lines)
+                self.sent_bytes += len(data)
+            next_t += self.tick
+            delay = next_t - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            else:
+                self.late_ticks += 1
+                # nicht hinterherhetzen, sonst kommen die Meldungen in Schüben
+                next_t = time.perf_counter()
+
+    def _broadcast(self, data: bytes):
+        with self._lock:
+            clients = list(self._clients)
+        for conn in clients:
+            try:
+                conn.sendall(data)
+            except OSError:
+                # zu langsam oder weg: wie FSD die Verbindung trennen
+                self.dropped_clients += 1
+                with self._lock:
+                    if conn in self._clients:
+                        self._clients.remove(conn)
+                conn.close()
@@ -0,0 +1,124 @@
+"""
+Berichte der Lasttests: Prometheus-Scrape, JSON-Bericht, Vergleich zweier Läufe.
+
+Ein Bericht ist ein flaches JSON-Dokument (config + results), damit Läufe auf
+verschiedenen Ständen direkt nebeneinander gelegt werden können:
+
+    python -m bench.loadtest --out base.json
+    ... Änderung ...
+    python -m bench.loadtest --out new.json --compare base.json
+"""
+import json
+import os
+import platform
+import subprocess
+import urllib.request
+from typing import Any, Dict, List, Optional, Tuple
+
+REPORT_VERSION = 1
+
+# Bewertung im Vergleich (Endungen der Kennzahlen); alles andere bleibt neutral
+HIGHER_IS_BETTER = ("_per_s",)
+LOWER_IS_BETTER = ("_ms", "_cpu_pct", "_peak", "_errors", "_failures", "_resyncs", "_late_ticks", "_dropped_clients")
+
+
+def scrape(url: str, timeout: float = 3.0) -> Dict[str, float]:
+    """/metrics lesen -> {"name{labels}": wert}; leer, wenn nicht erreichbar."""
+    try:
+        with urllib.request.urlopen(url, timeout=timeout) as resp:
+            text = resp.read().decode("utf-8")
+    except OSError:
+        return {}
+    out = {}
+    for line in text.splitlines():
+        if not line or line.startswith("#"):
+            continue
+        key, _, value = line.rpartition(" ")
+        try:
+            out[key] = float(value)
+        except ValueError:
+            continue
+    return out
+
+
+def histogram_quantile(samples: Dict[str, float], name: str, q: float) -> Optional[float]:
+    """Quantil aus kumulierten Buckets (obere Bucket-Grenze, wie grob geschätzt bei Prometheus)."""
+    buckets: List[Tuple[float, float]] = []
+    prefix = name + '_bucket{le="'
+    for key, value in samples.items():
+        if key.startswith(prefix):
+            le = key[len(prefix):-2]
+            buckets.append((float("inf") if le == "+Inf" else float(le), value))
+    if not buckets:
+        return None
+    buckets.sort()
+    total = buckets[-1][1]
+    if total <= 0:
+        return None
+    for bound, count in buckets:
+        if count >= q * total:
+            return bound
+    return buckets[-1][0]
+
+
+def environment() -> Dict[str, Any]:
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True,
+                                text=True, timeout=5).stdout.strip()
+    except (OSError, subprocess.SubprocessError):
+        commit = ""
+    return {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+        "commit": commit,
+    }
+
+
+def save(report: Dict[str, Any], path: str):
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2, sort_keys=True)
+        f.write("\n")
+
+
+def load(path: str) -> Dict[str, Any]:
+    with open(path, "r", encoding="utf-8") as f:
+        report = json.load(f)
+    if report.get("version") != REPORT_VERSION:
+        raise ValueError(f"{path}: report version {report.get('version')}, expected {REPORT_VERSION}")
+    return report
+
+
+def _fmt(v: Any) -> str:
+    if v is None:
+        return "-"
+    if isinstance(v, float):
+        return f"{v:.2f}" if abs(v) < 1000 else f"{v:.0f}"
+    return str(v)
+
+
+def print_report(report: Dict[str, Any]):
+    print(f"{'metric':<36} {'value':>12}")
+    for key, value in report["results"].items():
+        print(f"{key:<36} {_fmt(value):>12}")
+
+
+def print_compare(base: Dict[str, Any], new: Dict[str, Any]):
+    diff = {k: (base["config"].get(k), v) for k, v in new["config"].items()
+            if k not in ("out", "compare", "label") and base["config"].get(k) != v}
+    if diff:
+        print("⚠️ unterschiedliche Konfiguration: "
+              + ", ".join(f"{k}={a}->{b}" for k, (a, b) in sorted(diff.items())))
+    print(f"{'metric':<36} {base.get('label') or 'base':>12} {new.get('label') or 'new':>12} {'Δ %':>8}")
+    for key in new["results"]:
+        a = base["results"].get(key)
+        b = new["results"][key]
+        change = ""
+        if isinstance(a, (int, float)) and isinstance(b, (int, float)) and a:
+            pct = (b - a) / abs(a) * 100.0
+            mark = " "
+            if abs(pct) >= 5 and key.endswith(HIGHER_IS_BETTER + LOWER_IS_BETTER):
+                better = pct > 0 if key.endswith(HIGHER_IS_BETTER) else pct < 0
+                mark = "+" if better else "-"
+            change = f"{pct:+7.1f}{mark}"
+        print(f"{key:<36} {_fmt(a):>12} {_fmt(b):>12} {change:>8}")
@@ -0,0 +1,126 @@
+"""
+Headless Socket.IO-Abonnent für Lasttests, nur mit der Standardbibliothek.
+
+Spricht Engine.IO v4 per Long-Polling (der Socket.IO-Client von python-socketio
+bräuchte requests bzw. websocket-client): Handshake, "40" für den Namespace,
+danach ein dauerhaft hängender GET, der Pakete getrennt durch \\x1e liefert.
+Pings ("2") werden mit "3" beantwortet. Jedes Event landet mit Empfangszeit bei
+on_event(name, data, recv_ts).
+"""
+import http.client
+import json
+import threading
+import time
+import urllib.parse
+from typing import Any, Callable, Dict, Optional
+
+RECORD_SEP = "\x1e"
+
+EventHandler = Callable[[str, Any, float], None]
+
+
+class SioSubscriber:
+    def __init__(self, host: str, port: int, query: Optional[Dict[str, str]] = None,
+                 on_event: Optional[EventHandler] = None, timeout: float = 60.0):
+        self.host = host
+        self.port = port
+        self.query = dict(query or {})
+        self.on_event = on_event
+        self.timeout = timeout
+        self.sid: Optional[str] = None
+        self.connected = threading.Event()
+        self.closed = False
+        self.events = 0
+        self.bytes = 0
+        self.errors = 0
+        # GET hängt dauerhaft -> POSTs über eine zweite Verbindung
+        self._get = http.client.HTTPConnection(host, port, timeout=timeout)
+        self._post = http.client.HTTPConnection(host, port, timeout=timeout)
+        self._post_lock = threading.Lock()
+
+    def _path(self) -> str:
+        q = dict(self.query, EIO="4", transport="polling", t=f"{time.time():.6f}")
+        if self.sid:
+            q["sid"] = self.sid
+        return "/socket.io/?" + urllib.parse.urlencode(q)
+
+    def _poll(self) -> str:
+        self._get.request("GET", self._path())
+        resp = self._get.getresponse()
+        body = resp.read()
+        if resp.status != 200:
+            raise ConnectionError(f"poll failed: HTTP {resp.status}")
+        self.bytes += len(body)
+        return body.decode("utf-8")
+
+    def _send(self, packet: str):
+        with self._post_lock:
+            self._post.request("POST", self._path(), body=packet.encode("utf-8"),
+                               headers={"Content-Type": "text/plain;charset=UTF-8"})
+            resp = self._post.getresponse()
+            resp.read()
+            if resp.status != 200:
+                raise ConnectionError(f"send failed: HTTP {resp.status}")
+
+    def connect(self, wait: float = 10.0) -> "SioSubscriber":
+        handshake = self._poll()
+        if not handshake.startswith("0"):
+            raise ConnectionError(f"unexpected handshake: {handshake[:80]}")
+        self.sid = json.loads(handshake[1:])["sid"]
+        self._send("40")
+        threading.Thread(target=self._run, name=f"sio-{self.sid[:6]}", daemon=True).start()
+        if not self.connected.wait(wait):
+            raise TimeoutError("socket.io connect timed out")
+        return self
+
+    def emit(self, event: str, data: Any = None):
+        self._send("42" + json.dumps([event] if data is None else [event, data], separators=(",", ":")))
+
+    def close(self):
+        if self.closed:
+            return
+        self.closed = True
+        try:
+            self._send("41")
+            self._send("1")
+        except (OSError, http.client.HTTPException, ConnectionError):
+            pass
+        self._get.close()
+        self._post.close()
+
+    def _run(self):
+        while not self.closed:
+            try:
+                payload = self._poll()
+            except (OSError, http.client.HTTPException, ConnectionError):
+                if not self.closed:
+                    self.errors += 1
+                    self.closed = True
+                return
+            recv_ts = time.time()
+            for packet in payload.split(RECORD_SEP):
+                self._handle(packet, recv_ts)
+
+    def _handle(self, packet: str, recv_ts: float):
+        if not packet:
+            return
+        kind = packet[0]
+        if kind == "2":
+            # Ping vom Server
+            try:
+                self._send("3")
+            except (OSError, http.client.HTTPException, ConnectionError):
+                self.errors += 1
+        elif kind == "1":
+            self.closed = True
+        elif kind == "4":
+            sio = packet[1:2]
+            if sio == "0":
+                self.connected.set()
+            elif sio == "2":
+                name, *args = json.loads(packet[2:])
+                self.events += 1
+                if self.on_event is not None:
+                    self.on_event(name, args[0] if args else None, recv_ts)
+            elif sio == "1":
+                self.closed = True
@@ -0,0 +1,186 @@
+"""
+Mitschnitt der rohen FSD-Zeilen (observer.py) und Lesen für replay.py.
+
+Format: gzip-Segmente `capture-<UTC>-<nr>.fsdcap.gz`, darin Textzeilen
+
+    !start <wall_epoch> <mono_ns>          Kopf jedes Segments
+    !connect <mono_ns> [<quelle>]          neue Verbindung zum FSD-Server
+    <mono_ns>[@<quelle>]\\t<zeile>          empfangene Zeile (ohne CRLF)
+
+Zeilen eines recv()-Chunks tragen denselben Zeitstempel (time.monotonic_ns()).
+<quelle> ist der Index des FSD-Servers (FSD_SERVERS), bei 0 weggelassen.
+
+record() hängt nur (Zeitstempel, Zeilen) an eine Queue und blockiert nie; ist
+sie voll, wird der Chunk verworfen und gezählt. Ein Writer-Thread schreibt
+gesammelt, spült den gzip-Strom nach jedem Schub (Z_SYNC_FLUSH, damit auch ein
+abgebrochenes Segment bis dahin lesbar bleibt) und beginnt nach
+`segment_bytes` bzw. `segment_seconds` ein neues Segment. Vorhandene Dateien
+werden nie überschrieben; mit `keep` bleiben nur die neuesten Segmente.
+"""
+import collections
+import gzip
+import threading
+import time
+import zlib
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Deque, Iterable, Iterator, List, Optional, Tuple
+
+SUFFIX = ".fsdcap.gz"
+
+Record = Tuple[int, str, bytes, int]  # (mono_ns, art, daten, quelle); art "line" | "connect" | "start"
+
+
+class CaptureWriter:
+    def __init__(self, directory, segment_bytes: int = 64 * 1024 * 1024, segment_seconds: float = 3600.0,
+                 keep: int = 0, flush_interval: float = 0.5, max_pending: int = 10000, compresslevel: int = 6):
+        self.directory = Path(directory)
+        self.segment_bytes = segment_bytes
+        self.segment_seconds = segment_seconds
+        self.keep = keep
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        self.compresslevel = compresslevel
+        self.lines = 0
+        self.dropped = 0
+        self.segments = 0
+        self.bytes_written = 0
+        self._queue: Deque[Tuple[int, int, Optional[List[bytes]]]] = collections.deque()
+        self._cond = threading.Condition()
+        self._stop = False
+        self._thread: Optional[threading.Thread] = None
+        self._raw = None
+        self._gz: Optional[gzip.GzipFile] = None
+        self._opened = 0.0
+        self._seq = 0
+
+    def start(self) -> "CaptureWriter":
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self._thread = threading.Thread(target=self._run, name="capture-writer", daemon=True)
+        self._thread.start()
+        return self
+
+    def record(self, lines: List[bytes], source: int = 0):
+        """Zeilen eines Chunks vormerken; kehrt sofort zurück."""
+        if not lines:
+            return
+        queue = self._queue
+        # len()/append() auf deque sind atomar; kein Lock im Empfangspfad
+        if len(queue) >= self.max_pending:
+            self.dropped += len(lines)
+            return
+        queue.append((time.monotonic_ns(), source, lines))
+
+    def mark_connect(self, source: int = 0):
+        self._queue.append((time.monotonic_ns(), source, None))
+
+    def close(self):
+        with self._cond:
+            self._stop = True
+            self._cond.notify()
+        if self._thread is not None:
+            self._thread.join()
+
+    # -------------------------------------------------------------------------
+    # Writer-Thread
+    # -------------------------------------------------------------------------
+    def _run(self):
+        while True:
+            with self._cond:
+                if not self._stop:
+                    self._cond.wait(self.flush_interval)
+                stop = self._stop
+            self._drain()
+            if stop:
+                self._close_segment()
+                return
+
+    def _drain(self):
+        queue = self._queue
+        if not queue:
+            return
+        parts: List[bytes] = []
+        n = 0
+        while queue:
+            ts, source, lines = queue.popleft()
+            if lines is None:
+                parts.append(b"!connect %d %d\n" % (ts, source))
+                continue
+            prefix = b"%d@%d\t" % (ts, source) if source else b"%d\t" % ts
+            parts.append(prefix + (b"\n" + prefix).join(lines) + b"\n")
+            n += len(lines)
+        self._rotate_if_needed()
+        self._gz.write(b"".join(parts))
+        self._gz.flush(zlib.Z_SYNC_FLUSH)
+        self.lines += n
+        self.bytes_written = self._raw.tell()
+
+    def _rotate_if_needed(self):
+        if self._gz is not None:
+            if (self._raw.tell() < self.segment_bytes
+                    and time.monotonic() - self._opened < self.segment_seconds):
+                return
+            self._close_segment()
+        self._open_segment()
+
+    def _open_segment(self):
+        stamp = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+        while True:
+            self._seq += 1
+            path = self.directory / f"capture-{stamp}-{self._seq:04d}{SUFFIX}"
+            try:
+                # "x": niemals eine vorhandene Datei überschreiben
+                self._raw = open(path, "xb")
+                break
+            except FileExistsError:
+                continue
+        self._gz = gzip.GzipFile(fileobj=self._raw, mode="wb", compresslevel=self.compresslevel, mtime=0)
+        self._gz.write(b"!start %.6f %d\n" % (time.time(), time.monotonic_ns()))
+        self._opened = time.monotonic()
+        self.segments += 1
+        self._prune()
+
+    def _close_segment(self):
+        if self._gz is None:
+            return
+        self._gz.close()
+        self._raw.close()
+        self._gz = self._raw = None
+
+    def _prune(self):
+        if self.keep <= 0:
+            return
+        for old in segments(self.directory)[:-self.keep]:
+            try:
+                old.unlink()
+            except OSError:
+                pass
+
+
+def segments(path) -> List[Path]:
+    """Segmente eines Verzeichnisses in Aufnahmereihenfolge (oder die Datei selbst)."""
+    path = Path(path)
+    if path.is_dir():
+        return sorted(p for p in path.iterdir() if p.name.endswith(SUFFIX))
+    return [path]
+
+
+def read_capture(paths: Iterable) -> Iterator[Record]:
+    """Alle Records der Segmente; ein abgeschnittenes letztes Stück (Absturz) wird übersprungen."""
+    for path in paths:
+        with gzip.open(path, "rb") as f:
+            try:
+                for raw in f:
+                    raw = raw.rstrip(b"\n")
+                    if raw.startswith(b"!start "):
+                        yield int(raw.split()[2]), "start", raw, 0
+                    elif raw.startswith(b"!connect "):
+                        fields = raw.split()
+                        yield int(fields[1]), "connect", b"", int(fields[2]) if len(fields) > 2 else 0
+                    else:
+                        head, sep, line = raw.partition(b"\t")
+                        if sep:
+                            ts, _, source = head.partition(b"@")
+                            yield int(ts), "line", line, int(source) if source else 0
+            except (EOFError, gzip.BadGzipFile, zlib.error):
+                continue
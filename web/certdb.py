@@ -0,0 +1,244 @@
+"""
+Zugriff auf die Zertifikatsdatenbank cert.sqlitedb3 (app.py).
+
+Die Tabelle `cert` gehört dem FSD-Server (fsd.cpp liest sie per SELECT * neu
+ein). Deshalb gibt es keine zusätzliche Spalte; die numerische Sortierung nach
+CID läuft über einen Ausdrucks-Index auf (CAST(cid AS INTEGER), cid). Seiten
+werden per Keyset geblättert (nach der letzten CID der vorigen Seite statt
+OFFSET); damit kosten jede Seite und die nächste freie CID nur einen
+Indexzugriff, unabhängig davon, wie weit hinten die Seite liegt.
+
+Verbindungen werden in einem kleinen Pool wiederverwendet (unter eventlet wäre
+threading.local eine Verbindung pro Greenlet, also pro Request). Bewusst kein
+WAL: fsd.cpp lädt die Zertifikate nur neu, wenn sich die mtime von
+cert.sqlitedb3 ändert – mit WAL landen Commits bis zum Checkpoint in der
+-wal-Datei, neue oder gelöschte Benutzer sähe der Server nicht. Die SQL-Texte
+sind Konstanten, sodass der Statement-Cache von sqlite3 sie nur einmal pro
+Verbindung vorbereitet.
+Schema und Index werden einmal beim ersten Zugriff angelegt.
+"""
+import csv
+import io
+import queue
+import sqlite3
+import threading
+from contextlib import contextmanager
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+BASE_CID = 1000001
+
+SCHEMA = """
+    CREATE TABLE IF NOT EXISTS cert (
+        cid TEXT PRIMARY KEY NOT NULL,
+        password TEXT NOT NULL,
+        level INT NOT NULL,
+        twitch_name TEXT
+    )
+"""
+# Ausdruck muss exakt dem in ORDER BY / MAX() entsprechen, sonst nutzt SQLite den Index nicht;
+# cid als zweite Spalte: eindeutige Sortierung und Keyset-Vergleich ohne Sortierschritt
+INDEX = "CREATE INDEX IF NOT EXISTS cert_cid_num_cid ON cert (CAST(cid AS INTEGER), cid)"
+OLD_INDEXES = ("cert_cid_num",)
+
+_COLUMNS = "SELECT cid, password, level, twitch_name FROM cert WHERE "
+# Filter -> Bedingung; Parameter kommen vor exclude_cid
+_FILTERS = {
+    "all": "",
+    # CID-Präfix als Bereich auf dem Primärschlüssel (LIKE nutzt den Index nicht)
+    "cid": "cid >= ? AND cid < ? AND ",
+    "twitch": "twitch_name LIKE ? ESCAPE '\\' AND ",
+}
+_ORDER = " ORDER BY CAST(cid AS INTEGER), cid"
+_ORDER_DESC = " ORDER BY CAST(cid AS INTEGER) DESC, cid DESC"
+# Keyset: Position der Nachbarzeile statt OFFSET -> jede Seite ein Indexzugriff, auch die letzte
+# (der einfache Vergleich vorn gibt SQLite den Bereich auf dem Index, der Row-Value allein nicht)
+_AFTER = (" AND CAST(cid AS INTEGER) >= CAST(? AS INTEGER)"
+          " AND (CAST(cid AS INTEGER), cid) > (CAST(? AS INTEGER), ?)")
+_BEFORE = (" AND CAST(cid AS INTEGER) <= CAST(? AS INTEGER)"
+           " AND (CAST(cid AS INTEGER), cid) < (CAST(? AS INTEGER), ?)")
+# (Filter, Richtung) -> SQL; Richtung "first" | "after" | "before" | "offset"
+SQL_PAGE = {}
+for _name, _cond in _FILTERS.items():
+    _base = _COLUMNS + _cond + "cid != ?"
+    SQL_PAGE[_name, "first"] = _base + _ORDER + " LIMIT ?"
+    SQL_PAGE[_name, "after"] = _base + _AFTER + _ORDER + " LIMIT ?"
+    SQL_PAGE[_name, "before"] = _base + _BEFORE + _ORDER_DESC + " LIMIT ?"
+    # nur noch für direkte Sprünge auf eine Seitenzahl ohne Cursor
+    SQL_PAGE[_name, "offset"] = _base + _ORDER + " LIMIT ? OFFSET ?"
+del _name, _cond, _base
+# COUNT(*) ohne WHERE zählt direkt über die B-Tree-Seiten; mit "cid != ?" wäre es ein Scan
+SQL_COUNT = {
+    "all": "SELECT (SELECT COUNT(*) FROM cert) - (SELECT COUNT(*) FROM cert WHERE cid = ?)",
+    "cid": "SELECT COUNT(*) FROM cert WHERE cid >= ? AND cid < ? AND cid != ?",
+    "twitch": "SELECT COUNT(*) FROM cert WHERE twitch_name LIKE ? ESCAPE '\\' AND cid != ?",
+}
+SQL_MAX_CID = "SELECT MAX(CAST(cid AS INTEGER)) FROM cert"
+SQL_UPSERT = "INSERT OR REPLACE INTO cert (cid, password, level, twitch_name) VALUES (?, ?, ?, ?)"
+SQL_DELETE = "DELETE FROM cert WHERE cid = ?"
+
+Row = Tuple[str, str, int, Optional[str]]
+
+
+def _prefix_range(prefix: str) -> Tuple[str, str]:
+    # alle Strings mit diesem Präfix liegen in [prefix, prefix + U+10FFFF)
+    return prefix, prefix + "\U0010ffff"
+
+
+def _like_escape(s: str) -> str:
+    return s.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+def parse_user(cid: Any, password: Any, level: Any = 1, twitch_name: Any = "") -> Row:
+    """Eingaben wie im Formular normieren; ValueError bei fehlender CID/Passwort oder ungültigem Level."""
+    cid = str(cid or "").strip()
+    password = str(password or "").strip()
+    if not cid or not password:
+        raise ValueError("Missing cid or password")
+    try:
+        level = int(str(level).strip() or 1)
+    except ValueError:
+        raise ValueError("Invalid level")
+    return cid, password, level, str(twitch_name or "").strip()
+
+
+class CertDB:
+    def __init__(self, path, exclude_cid: str = "", pool_size: int = 4, timeout: float = 5.0):
+        self.path = str(path)
+        # BOT-Account: taucht in Listen nicht auf und wird nicht überschrieben/gelöscht
+        self.exclude_cid = exclude_cid
+        self.timeout = timeout
+        self._pool: "queue.LifoQueue[sqlite3.Connection]" = queue.LifoQueue(maxsize=pool_size)
+        self._schema_lock = threading.Lock()
+        self._schema_ready = False
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.path, timeout=self.timeout, check_same_thread=False,
+                               cached_statements=64)
+        # Rollback-Journal: jeder Commit schreibt die Hauptdatei (mtime -> CERTFILECHECK in fsd.cpp);
+        # stellt auch Datenbanken zurück, die eine frühere Version auf WAL umgestellt hat
+        try:
+            conn.execute("PRAGMA journal_mode=DELETE")
+        except sqlite3.OperationalError:
+            # Umstellung von WAL braucht exklusiven Zugriff; beim nächsten Verbindungsaufbau erneut
+            pass
+        if not self._schema_ready:
+            with self._schema_lock:
+                if not self._schema_ready:
+                    self._ensure_schema(conn)
+                    self._schema_ready = True
+        return conn
+
+    def _ensure_schema(self, conn: sqlite3.Connection):
+        with conn:
+            conn.execute(SCHEMA)
+            # fsd.cpp legt die Tabelle ohne twitch_name an
+            cols = {row[1] for row in conn.execute("PRAGMA table_info(cert)")}
+            if "twitch_name" not in cols:
+                conn.execute("ALTER TABLE cert ADD COLUMN twitch_name TEXT")
+            for name in OLD_INDEXES:
+                conn.execute(f"DROP INDEX IF EXISTS {name}")
+            conn.execute(INDEX)
+
+    @contextmanager
+    def connection(self):
+        try:
+            conn = self._pool.get_nowait()
+        except queue.Empty:
+            conn = self._connect()
+        try:
+            yield conn
+        except sqlite3.Error:
+            # kaputte Verbindung nicht zurück in den Pool
+            conn.close()
+            raise
+        else:
+            try:
+                self._pool.put_nowait(conn)
+            except queue.Full:
+                conn.close()
+
+    def close(self):
+        while True:
+            try:
+                self._pool.get_nowait().close()
+            except queue.Empty:
+                return
+
+    def page(self, page: int = 1, per_page: int = 50, q: str = "", after: Optional[str] = None,
+             before: Optional[str] = None) -> Tuple[List[Row], int]:
+        """
+        (Zeilen der Seite nach CID sortiert, Gesamtzahl der Treffer). q: CID-Präfix (Ziffern)
+        oder Twitch-Name. after/before: CID der letzten Zeile der vorigen bzw. der ersten
+        Zeile der nächsten Seite (Keyset); ohne Cursor und page > 1 per OFFSET.
+        """
+        page = max(1, page)
+        per_page = max(1, per_page)
+        q = (q or "").strip()
+        if not q:
+            name, args = "all", ()
+        elif q.isdigit():
+            name, args = "cid", _prefix_range(q)
+        else:
+            name, args = "twitch", (f"%{_like_escape(q)}%",)
+        args += (self.exclude_cid,)
+        if after is not None:
+            direction, page_args = "after", (after, after, after, per_page)
+        elif before is not None:
+            direction, page_args = "before", (before, before, before, per_page)
+        elif page > 1:
+            direction, page_args = "offset", (per_page, (page - 1) * per_page)
+        else:
+            direction, page_args = "first", (per_page,)
+        with self.connection() as conn:
+            rows = conn.execute(SQL_PAGE[name, direction], args + page_args).fetchall()
+            total = conn.execute(SQL_COUNT[name], args).fetchone()[0]
+        if direction == "before":
+            rows.reverse()
+        return rows, total
+
+    def next_cid(self) -> int:
+        with self.connection() as conn:
+            max_cid = conn.execute(SQL_MAX_CID).fetchone()[0]
+        return max(BASE_CID, (max_cid or 0) + 1)
+
+    def upsert(self, cid: str, password: str, level: int, twitch_name: str = ""):
+        with self.connection() as conn, conn:
+            conn.execute(SQL_UPSERT, (cid, password, level, twitch_name))
+
+    def delete(self, cid: str) -> bool:
+        if cid == self.exclude_cid:
+            return False
+        with self.connection() as conn, conn:
+            return conn.execute(SQL_DELETE, (cid,)).rowcount > 0
+
+    def import_rows(self, rows: Iterable[Row]) -> int:
+        """Alle Zeilen in einer Transaktion schreiben (alles oder nichts)."""
+        rows = [r for r in rows if r[0] != self.exclude_cid]
+        with self.connection() as conn, conn:
+            conn.executemany(SQL_UPSERT, rows)
+        return len(rows)
+
+    def import_csv(self, data: str) -> Dict[str, Any]:
+        """
+        CSV mit den Spalten cid,password,level[,twitch_name] importieren, Kopfzeile
+        optional. Ungültige Zeilen werden übersprungen und mit Zeilennummer gemeldet.
+        """
+        reader = csv.reader(io.StringIO(data))
+        rows: List[Row] = []
+        errors: List[str] = []
+        for lineno, rec in enumerate(reader, 1):
+            if not rec or not any(f.strip() for f in rec):
+                continue
+            if lineno == 1 and rec[0].strip().lower() == "cid":
+                continue
+            try:
+                row = parse_user(*rec[:4])
+            except (TypeError, ValueError) as e:
+                errors.append(f"line {lineno}: {e}")
+                continue
+            if row[0] == self.exclude_cid:
+                errors.append(f"line {lineno}: BOT account skipped")
+                continue
+            rows.append(row)
+        imported = self.import_rows(rows)
+        return {"imported": imported, "skipped": len(errors), "errors": errors[:20]}
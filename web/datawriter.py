@@ -0,0 +1,105 @@
+"""
+Schreiber für fsd-data.json (VATSIM-ähnlicher Feed) mit eigenem Worker-Thread.
+
+- submit() blockiert nie; mehrere Aufrufe während eines Schreibvorgangs werden
+  zu einem zusammengefasst (Coalescing) und höchstens alle `min_interval` s geschrieben.
+- Geschrieben wird nur, wenn sich der Inhalt geändert hat (Hash ohne die
+  Zeitstempel in "general").
+- Standard ist kompaktes JSON; optional zusätzlich eine vorkomprimierte .gz-Datei.
+- Der Build darf fragcache.RawJSON-Fragmente enthalten; sie werden unverändert
+  übernommen (auch bei indent bleiben die Einträge selbst kompakt).
+"""
+import gzip
+import hashlib
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional
+
+import fragcache
+import obslog
+
+LOG = obslog.get("datawriter")
+
+# ändern sich bei jedem Build, ohne dass sich der Inhalt ändert
+VOLATILE_GENERAL_KEYS = ("update", "update_timestamp")
+
+
+class FsdDataWriter:
+    def __init__(self, path: Path, build: Callable[[], Dict[str, Any]], indent: Optional[int] = None,
+                 gzip_sibling: bool = False, min_interval: float = 1.0):
+        self.path = Path(path)
+        self.build = build
+        self.indent = indent or None
+        self.gzip_sibling = gzip_sibling
+        self.min_interval = min_interval
+        self.writes = 0
+        self.skipped = 0
+        self._last_hash: Optional[bytes] = None
+        self._last_write = 0.0
+        self._dirty = False
+        self._cond = threading.Condition()
+        self._dir_ready = False
+
+    def start(self) -> "FsdDataWriter":
+        threading.Thread(target=self._run, name="fsd-data-writer", daemon=True).start()
+        return self
+
+    def submit(self):
+        """Markiert den Feed als neu zu bauen; der Worker erledigt Build + Schreiben."""
+        with self._cond:
+            self._dirty = True
+            self._cond.notify()
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while not self._dirty:
+                    self._cond.wait()
+            # Bursts sammeln: frühestens min_interval nach dem letzten Schreiben
+            wait = self._last_write + self.min_interval - time.monotonic()
+            if wait > 0:
+                time.sleep(wait)
+            with self._cond:
+                self._dirty = False
+            try:
+                self.write_if_changed(self.build())
+            except Exception as e:
+                LOG.log(obslog.ERROR, "fsd-data.json write failed", error=str(e))
+            self._last_write = time.monotonic()
+
+    def encode(self, doc: Dict[str, Any]) -> bytes:
+        if self.indent:
+            return fragcache.dumps(doc, ensure_ascii=False, indent=self.indent).encode("utf-8")
+        return fragcache.dumps(doc, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+    def content_hash(self, doc: Dict[str, Any]) -> bytes:
+        general = {k: v for k, v in doc.get("general", {}).items() if k not in VOLATILE_GENERAL_KEYS}
+        stable = dict(doc, general=general)
+        body = fragcache.dumps(stable, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+        return hashlib.blake2b(body, digest_size=16).digest()
+
+    def write_if_changed(self, doc: Dict[str, Any]) -> bool:
+        digest = self.content_hash(doc)
+        if digest == self._last_hash:
+            self.skipped += 1
+            return False
+
+        body = self.encode(doc)
+        self._write_atomic(self.path, body)
+        if self.gzip_sibling:
+            gz_path = self.path.with_name(self.path.name + ".gz")
+            self._write_atomic(gz_path, gzip.compress(body, compresslevel=6, mtime=0))
+        self._last_hash = digest
+        self.writes += 1
+        return True
+
+    def _write_atomic(self, path: Path, data: bytes):
+        if not self._dir_ready:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            self._dir_ready = True
+        tmp = path.with_name(path.name + ".tmp")
+        with open(tmp, "wb") as f:
+            f.write(data)
+        os.replace(tmp, path)
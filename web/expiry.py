@@ -0,0 +1,93 @@
+"""
+Hashed Timer Wheel für das Auslaufen inaktiver Clients (observer.py).
+
+touch() merkt sich nur den letzten Zeitstempel; ein Key bleibt im Slot seiner
+ursprünglichen Deadline. Erst wenn expire() diesen Slot erreicht, wird die
+echte Deadline geprüft: abgelaufen -> entfernen, sonst in den passenden Slot
+umhängen. Pro Tick wird also nur ein Slot angefasst, nie die ganze Tabelle.
+
+Für das Limit (evict_oldest) ist _last nach letzter Aktivität sortiert: touch()
+fügt den Key neu ein, die ältesten stehen vorn. Das hängt nicht an der TTL –
+bei abgeschalteter TTL liegen die Deadlines weit voraus, ein Lauf über die
+Slots müsste dann die ganze Uptime abschreiten.
+"""
+from itertools import islice
+from typing import Dict, List, Optional, Set
+
+
+class ExpiryWheel:
+    def __init__(self, ttl: float, resolution: float = 1.0, slots: int = 256):
+        self.ttl = ttl
+        self.resolution = resolution
+        self._slots: List[Set[str]] = [set() for _ in range(slots)]
+        self._last: Dict[str, float] = {}
+        self._due: Dict[str, int] = {}
+        # nächster noch nicht bearbeiteter Tick
+        self._tick: Optional[int] = None
+
+    def __len__(self) -> int:
+        return len(self._last)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._last
+
+    def _tick_of(self, t: float) -> int:
+        return int(t // self.resolution)
+
+    def _schedule(self, key: str, tick: int):
+        if self._tick is None:
+            self._tick = tick
+        elif tick < self._tick:
+            tick = self._tick
+        self._slots[tick % len(self._slots)].add(key)
+        self._due[key] = tick
+
+    def touch(self, key: str, ts: float) -> bool:
+        """Aktivität von key zum Zeitpunkt ts; True, wenn key neu ist."""
+        # pop + neu einfügen: Reihenfolge in _last = Reihenfolge der letzten Aktivität
+        is_new = self._last.pop(key, None) is None
+        self._last[key] = ts
+        if is_new:
+            self._schedule(key, self._tick_of(ts + self.ttl))
+        return is_new
+
+    def discard(self, key: str):
+        if self._last.pop(key, None) is None:
+            return
+        tick = self._due.pop(key)
+        self._slots[tick % len(self._slots)].discard(key)
+
+    def expire(self, now: float) -> List[str]:
+        """Entfernt und liefert alle Keys, deren letzte Aktivität älter als ttl ist."""
+        if self._tick is None:
+            return []
+        cur = self._tick_of(now)
+        if cur < self._tick:
+            return []
+        n = len(self._slots)
+        expired: List[str] = []
+        # nach langer Pause reicht eine Runde: jeder Slot prüft die echten Deadlines
+        start = max(self._tick, cur - n + 1)
+        self._tick = cur + 1
+        for tick in range(start, cur + 1):
+            idx = tick % n
+            bucket = self._slots[idx]
+            if not bucket:
+                continue
+            self._slots[idx] = set()
+            for key in bucket:
+                deadline = self._last[key] + self.ttl
+                if deadline <= now:
+                    del self._last[key]
+                    del self._due[key]
+                    expired.append(key)
+                else:
+                    self._schedule(key, self._tick_of(deadline))
+        return expired
+
+    def evict_oldest(self, count: int) -> List[str]:
+        """Entfernt und liefert die count am längsten inaktiven Keys (O(count), unabhängig von der TTL)."""
+        evicted = list(islice(self._last, count))
+        for key in evicted:
+            self.discard(key)
+        return evicted
@@ -0,0 +1,318 @@
+"""
+Dateien im Speicher halten und bei Änderungen sofort neu laden (app.py).
+
+- CachedFile: zuletzt gelesener und geparster Inhalt einer Datei, gebunden an
+  (mtime_ns, size). Gehört die Datei einem FileWatcher, liefert get() nur den
+  Stand aus dem Speicher, ohne stat() oder Lesen. Verschwindet die Datei, gilt
+  sie erst nach `missing_grace` Sekunden als fehlend: fsd.cpp ersetzt
+  whazzup.txt per remove() + rename(), dazwischen fehlt sie kurz.
+- FileWatcher: beobachtet die Verzeichnisse per inotify (ctypes, kein extra
+  Paket) und lädt eine Datei neu, sobald sie geschlossen (IN_CLOSE_WRITE) oder
+  per rename() ersetzt (IN_MOVED_TO) wurde; danach werden die Abonnenten
+  aufgerufen. Ohne inotify (kein Linux, Limit erreicht, Verzeichnis fehlt)
+  wird per stat() alle `poll_interval` Sekunden geprüft – als Sicherheitsnetz
+  läuft diese Prüfung auch mit inotify.
+
+Unter eventlet (monkey_patch) wartet select() grün, der Watcher blockiert
+also keinen anderen Greenlet.
+"""
+import ctypes
+import ctypes.util
+import os
+import select
+import struct
+import threading
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+# inotify.h
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_DELETE = 0x00000200
+IN_Q_OVERFLOW = 0x00004000
+IN_NONBLOCK = os.O_NONBLOCK
+IN_CLOEXEC = 0o2000000
+
+WATCH_MASK = IN_CLOSE_WRITE | IN_MOVED_TO | IN_MOVED_FROM | IN_DELETE
+_EVENT = struct.Struct("iIII")
+
+StatKey = Tuple[int, int]
+
+
+def stat_key(path: Path) -> Optional[StatKey]:
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return st.st_mtime_ns, st.st_size
+
+
+class CachedFile:
+    """
+    Inhalt einer Datei, geparst mit load(f) (f im Binärmodus).
+    Fehlt die Datei, ist der Wert `missing`; schlägt das Parsen fehl, bleibt
+    der letzte gute Stand stehen und es wird erst bei der nächsten Änderung
+    erneut versucht (z.B. halb geschriebenes status.json).
+    """
+
+    def __init__(self, path: Path, load: Callable[[Any], Any] = None, missing: Any = None,
+                 missing_grace: float = 1.0):
+        self.path = Path(path)
+        if load is not None:
+            self.load = load
+        self.missing = missing
+        self.missing_grace = missing_grace
+        self.value = missing
+        self.key: Optional[StatKey] = None
+        self.version = 0
+        self.loads = 0
+        self.error: Optional[str] = None
+        # True, solange ein FileWatcher die Datei aktuell hält
+        self.watched = False
+        self._checked = False
+        # seit wann (monotonic) die zuvor vorhandene Datei fehlt; None = nicht
+        self._missing_since: Optional[float] = None
+        self._lock = threading.Lock()
+
+    def load(self, f) -> Any:
+        return f.read()
+
+    def on_missing(self):
+        pass
+
+    def on_error(self, e: Exception):
+        print(f"⚠️ Fehler beim Lesen von {self.path.name}: {e}")
+
+    @property
+    def missing_deadline(self) -> Optional[float]:
+        """Zeitpunkt (monotonic), ab dem eine gerade verschwundene Datei als fehlend gilt."""
+        if self._missing_since is None:
+            return None
+        return self._missing_since + self.missing_grace
+
+    def get(self) -> Any:
+        if not self.watched:
+            self.refresh()
+        return self.value
+
+    def refresh(self) -> bool:
+        """Neu laden, falls sich die Datei geändert hat; True bei neuem Inhalt."""
+        key = stat_key(self.path)
+        if self._checked and key == self.key:
+            return False
+        with self._lock:
+            # während wir gewartet haben, hat evtl. schon jemand anderes geladen
+            if self._checked and stat_key(self.path) == self.key:
+                return False
+            return self._reload()
+
+    def _reload(self) -> bool:
+        self._checked = True
+        try:
+            with open(self.path, "rb") as f:
+                # Schlüssel vom geöffneten File: passt sicher zum gelesenen Inhalt,
+                # auch wenn die Datei gerade per rename() ersetzt wird
+                st = os.fstat(f.fileno())
+                key = (st.st_mtime_ns, st.st_size)
+                value = self.load(f)
+        except FileNotFoundError:
+            if self.key is None and self.version:
+                return False
+            if self.version and self.missing_grace > 0:
+                # kurz weg (remove() + rename()): alten Stand behalten, kein Leer-Zwischenstand
+                now = time.monotonic()
+                if self._missing_since is None:
+                    self._missing_since = now
+                if now - self._missing_since < self.missing_grace:
+                    return False
+            self._missing_since = None
+            self.on_missing()
+            self.key = None
+            self.value = self.missing
+            self.error = None
+            self.version += 1
+            return True
+        except Exception as e:
+            self._missing_since = None
+            self.key = stat_key(self.path)
+            self.error = str(e)
+            self.on_error(e)
+            return False
+        self._missing_since = None
+        self.key = key
+        self.value = value
+        self.error = None
+        self.loads += 1
+        self.version += 1
+        return True
+
+
+def _load_libc():
+    name = ctypes.util.find_library("c")
+    if not name:
+        return None
+    try:
+        libc = ctypes.CDLL(name, use_errno=True)
+        libc.inotify_init1.argtypes = [ctypes.c_int]
+        libc.inotify_add_watch.argtypes = [ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32]
+        return libc
+    except (OSError, AttributeError):
+        return None
+
+
+class Inotify:
+    """Minimaler inotify-Wrapper: Verzeichnisse beobachten, Events als (wd, mask, name)."""
+
+    def __init__(self):
+        libc = _load_libc()
+        if libc is None:
+            raise OSError("inotify nicht verfügbar")
+        fd = libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if fd < 0:
+            err = ctypes.get_errno()
+            raise OSError(err, os.strerror(err))
+        self._libc = libc
+        self.fd = fd
+
+    def add_watch(self, path: Path, mask: int = WATCH_MASK) -> int:
+        wd = self._libc.inotify_add_watch(self.fd, os.fsencode(str(path)), mask)
+        if wd < 0:
+            err = ctypes.get_errno()
+            raise OSError(err, os.strerror(err), str(path))
+        return wd
+
+    def read(self) -> List[Tuple[int, int, str]]:
+        try:
+            buf = os.read(self.fd, 64 * 1024)
+        except BlockingIOError:
+            return []
+        events = []
+        off = 0
+        while off + _EVENT.size <= len(buf):
+            wd, mask, _cookie, length = _EVENT.unpack_from(buf, off)
+            off += _EVENT.size
+            name = buf[off:off + length].split(b"\0", 1)[0]
+            off += length
+            events.append((wd, mask, os.fsdecode(name)))
+        return events
+
+    def close(self):
+        os.close(self.fd)
+
+
+Subscriber = Callable[[CachedFile], None]
+
+
+class FileWatcher:
+    def __init__(self, poll_interval: float = 2.0, use_inotify: bool = True):
+        self.poll_interval = poll_interval
+        self.files: List[CachedFile] = []
+        self.running = False
+        self._subs: Dict[int, List[Subscriber]] = {}
+        self._inotify: Optional[Inotify] = None
+        # wd -> {Dateiname -> CachedFile}
+        self._by_wd: Dict[int, Dict[str, CachedFile]] = {}
+        self._wd_of_dir: Dict[Path, int] = {}
+        if use_inotify:
+            try:
+                self._inotify = Inotify()
+            except OSError as e:
+                print(f"⚠️ inotify nicht verfügbar ({e}) – Dateien werden alle {poll_interval:g}s geprüft")
+
+    @property
+    def mode(self) -> str:
+        return "inotify" if self._inotify is not None and self._by_wd else "poll"
+
+    def watch(self, cached: CachedFile, subscriber: Optional[Subscriber] = None) -> CachedFile:
+        """Datei übernehmen: einmal laden, danach nur noch bei Änderungen."""
+        # erst beobachten, dann laden: sonst ginge eine Änderung dazwischen verloren
+        if self._inotify is not None:
+            self._add_dir_watch(cached)
+        self.files.append(cached)
+        if subscriber is not None:
+            self.subscribe(cached, subscriber)
+        cached.refresh()
+        # get() verlässt sich erst auf den Watcher, wenn run() läuft
+        cached.watched = self.running
+        return cached
+
+    def subscribe(self, cached: CachedFile, subscriber: Subscriber):
+        self._subs.setdefault(id(cached), []).append(subscriber)
+
+    def _add_dir_watch(self, cached: CachedFile):
+        # Verzeichnis beobachten, nicht die Datei: rename() ersetzt den Inode
+        directory = cached.path.parent
+        wd = self._wd_of_dir.get(directory)
+        if wd is None:
+            try:
+                wd = self._inotify.add_watch(directory)
+            except OSError as e:
+                print(f"⚠️ inotify für {directory} nicht möglich ({e}) – Polling")
+                return
+            self._wd_of_dir[directory] = wd
+        self._by_wd.setdefault(wd, {})[cached.path.name] = cached
+
+    def _changed(self, cached: CachedFile):
+        if not cached.refresh():
+            return
+        for fn in self._subs.get(id(cached), ()):
+            try:
+                fn(cached)
+            except Exception as e:
+                print(f"⚠️ Fehler im Abonnenten für {cached.path.name}: {e}")
+
+    def poll(self):
+        """Alle Dateien per stat() prüfen (Fallback / Sicherheitsnetz)."""
+        for cached in self.files:
+            self._changed(cached)
+        # Verzeichnis, das beim Start fehlte, nachträglich beobachten
+        if self._inotify is not None:
+            for cached in self.files:
+                if cached.path.parent not in self._wd_of_dir and cached.path.parent.is_dir():
+                    self._add_dir_watch(cached)
+
+    def _dispatch(self, events: List[Tuple[int, int, str]]):
+        todo: List[CachedFile] = []
+        for wd, mask, name in events:
+            if mask & IN_Q_OVERFLOW:
+                todo = list(self.files)
+                break
+            cached = self._by_wd.get(wd, {}).get(name)
+            if cached is not None and cached not in todo:
+                todo.append(cached)
+        for cached in todo:
+            self._changed(cached)
+
+    def run(self):
+        """Endlosschleife (socketio.start_background_task / Thread)."""
+        self.running = True
+        for cached in self.files:
+            cached.watched = True
+        # alles, was sich vor dem Start geändert hat
+        self.poll()
+        next_poll = time.monotonic() + self.poll_interval
+        while True:
+            now = time.monotonic()
+            wake = next_poll
+            # verschwundene Datei: nach Ablauf der Karenz prüfen, nicht erst beim nächsten Poll
+            for cached in self.files:
+                deadline = cached.missing_deadline
+                if deadline is not None and deadline < wake:
+                    wake = deadline
+            timeout = max(0.0, wake - now)
+            if self._inotify is None:
+                time.sleep(timeout)
+            else:
+                try:
+                    ready, _, _ = select.select([self._inotify.fd], [], [], timeout)
+                except InterruptedError:
+                    ready = []
+                if ready:
+                    self._dispatch(self._inotify.read())
+                # bei Dauer-Events trotzdem pollen, sobald fällig (Sicherheitsnetz nicht aushungern)
+                if time.monotonic() < wake:
+                    continue
+            self.poll()
+            next_poll = time.monotonic() + self.poll_interval
@@ -0,0 +1,104 @@
+"""
+Cache vorab serialisierter JSON-Fragmente pro Callsign.
+
+Ein Fragment wird nur neu encodiert, wenn sich der Schlüssel des Clients
+ändert (Record bzw. dict – beide werden bei Updates ersetzt, nie verändert;
+verglichen wird per Identität). Ausgaben werden aus den Fragmenten
+zusammengesetzt: RawJSON-Werte in beliebigen Strukturen spleißt dumps() 1:1 ein.
+
+dumps/loads sind kompatibel zum json-Modul und können daher auch als
+json-Modul für Flask-SocketIO dienen (SocketIO(app, json=fragcache)).
+"""
+import json
+import secrets
+from typing import Any, Callable, Dict, Mapping, Optional
+
+loads = json.loads
+
+
+class RawJSON:
+    """Bereits encodiertes JSON, das unverändert in die Ausgabe übernommen wird."""
+    __slots__ = ("raw",)
+
+    def __init__(self, raw: str):
+        self.raw = raw
+
+
+# Platzhalter mit Prozess-Nonce, damit Nutzdaten ihn nicht nachbilden können
+_MARK = f"\x00{secrets.token_hex(8)}\x00"
+_MARK_ENCODED = json.dumps(_MARK)
+
+
+def dumps(obj: Any, **kwargs) -> str:
+    """json.dumps mit Unterstützung für RawJSON."""
+    user_default = kwargs.pop("default", None)
+    raws = []
+
+    def default(o):
+        if isinstance(o, RawJSON):
+            raws.append(o.raw)
+            return _MARK
+        if user_default is not None:
+            return user_default(o)
+        raise TypeError(f"Object of type {type(o).__name__} is not JSON serializable")
+
+    out = json.dumps(obj, default=default, **kwargs)
+    if not raws:
+        return out
+    parts = out.split(_MARK_ENCODED)
+    pieces = [parts[0]]
+    for raw, tail in zip(raws, parts[1:]):
+        pieces.append(raw)
+        pieces.append(tail)
+    return "".join(pieces)
+
+
+def encode(obj: Any) -> str:
+    """Kompaktes Encoding für einzelne Fragmente."""
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":"))
+
+
+class FragmentCache:
+    def __init__(self):
+        # callsign -> (key, RawJSON)
+        self._entries: Dict[str, tuple] = {}
+        self.hits = 0
+        self.misses = 0
+
+    def lookup(self, callsign: str, key: Any) -> Optional[RawJSON]:
+        """Gecachtes Fragment, wenn es zu key gehört, sonst None."""
+        entry = self._entries.get(callsign)
+        if entry is not None and (entry[0] is key or entry[0] == key):
+            self.hits += 1
+            return entry[1]
+        return None
+
+    def put(self, callsign: str, key: Any, obj: Any) -> RawJSON:
+        self.misses += 1
+        frag = RawJSON(encode(obj))
+        self._entries[callsign] = (key, frag)
+        return frag
+
+    def get(self, callsign: str, key: Any, build: Callable[..., Any], *args) -> RawJSON:
+        """
+        Fragment für callsign; build(*args) wird nur aufgerufen, wenn key nicht mehr passt.
+        key darf ein Tupel aus Records sein (Records haben kein __eq__ -> Identitätsvergleich).
+        """
+        frag = self.lookup(callsign, key)
+        if frag is None:
+            frag = self.put(callsign, key, build(*args))
+        return frag
+
+    def drop(self, callsign: str):
+        self._entries.pop(callsign, None)
+
+    def retain(self, live: Mapping[str, Any]):
+        """Einträge verwerfen, deren Callsign nicht mehr in live ist (nur wenn es welche gibt)."""
+        if len(self._entries) <= len(live):
+            return
+        # list(): Schlüssel als Kopie, parallele put() (anderer Thread) ändern sonst die Größe
+        for cs in [cs for cs in list(self._entries) if cs not in live]:
+            self._entries.pop(cs, None)
+
+    def __len__(self) -> int:
+        return len(self._entries)
@@ -0,0 +1,75 @@
+"""
+Inkrementeller Zeilen-Framer für den FSD-Empfangspfad.
+
+FSD trennt Pakete mit CRLF (manche Clients nur LF oder CR). Der Framer hält
+einen bytearray-Puffer, sucht nur in den neu angekommenen Bytes nach dem
+letzten Zeilenende und gibt alle vollständigen Zeilen auf einmal heraus.
+Der unvollständige Rest bleibt im Puffer; nur die eine Zeile, die über eine
+Chunk-Grenze reicht, wird zusammengesetzt. Überlange Zeilen werden verworfen.
+"""
+from typing import List
+
+MAX_LINE_DEFAULT = 8192
+
+
+class LineFramer:
+    __slots__ = ("max_line", "_buf", "_discarding", "dropped")
+
+    def __init__(self, max_line: int = MAX_LINE_DEFAULT):
+        self.max_line = max_line
+        self._buf = bytearray()
+        # True: aktuelle Zeile war zu lang und wird bis zum nächsten Zeilenende verworfen
+        self._discarding = False
+        self.dropped = 0
+
+    def feed(self, chunk: bytes) -> List[bytes]:
+        """Nimmt einen Chunk an und gibt alle jetzt vollständigen, nicht-leeren Zeilen zurück."""
+        # letztes Zeilenende nur im neuen Chunk suchen
+        end = max(chunk.rfind(b"\n"), chunk.rfind(b"\r"))
+
+        if end < 0:
+            if not self._discarding:
+                self._buf += chunk
+                if len(self._buf) > self.max_line:
+                    self._overflow()
+            return []
+
+        # bytes.splitlines trennt genau an \r\n, \r und \n; das erste Element ist
+        # immer der Text vor dem ersten Zeilenende (ggf. leer)
+        lines = chunk.splitlines()
+        tail = lines.pop() if end + 1 < len(chunk) else None
+
+        if self._discarding:
+            # Rest der überlangen Zeile verwerfen
+            lines[0] = b""
+            self._discarding = False
+        elif self._buf:
+            # nur die eine Zeile, die über die Chunk-Grenze geht, wird zusammengesetzt
+            self._buf += lines[0]
+            lines[0] = bytes(self._buf)
+            self._buf.clear()
+
+        max_line = self.max_line
+        out = [ln for ln in lines if ln and len(ln) <= max_line]
+        if len(out) != len(lines):
+            self.dropped += sum(1 for ln in lines if len(ln) > max_line)
+
+        if tail is not None:
+            self._buf += tail
+            if len(self._buf) > max_line:
+                self._overflow()
+        return out
+
+    def _overflow(self):
+        self._buf.clear()
+        self._discarding = True
+        self.dropped += 1
+
+    def pending(self) -> int:
+        """Anzahl gepufferter Bytes einer noch unvollständigen Zeile."""
+        return len(self._buf)
+
+    def reset(self):
+        self._buf.clear()
+        self._discarding = False
+
@@ -0,0 +1,412 @@
+"""
+Schneller Parser für den FSD-Client-Feed.
+
+Jede Zeile wird über eine Tabelle anhand des ersten Zeichens (@, %) bzw. des
+3-Zeichen-Kommandos (#DP, #AA, $FP, ...) an einen Handler verteilt.
+Pilotpositionen laufen zuerst über einen schnellen Pfad für das Classic-Format;
+nur wenn der scheitert, wird die Zeile tolerant geparst (Classic, dann Legacy)
+– pro Zeile, eine kaputte Zeile legt kein Format für die Verbindung fest. Ergebnisse sind schlanke __slots__-Records
+statt dicts; der Zeitstempel wird vom Aufrufer einmal pro Chunk übergeben.
+
+Formate siehe fsd/clinterface.cpp (sendpilotpos, sendatcpos, sendaa, sendap,
+senddp, sendda, sendplan) und docs/protocol.txt.
+"""
+import math
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+# =============================================================================
+# PBH (Pitch/Bank/Heading) – Lookup-Tabellen
+# =============================================================================
+PITCH_MULT = 256.0 / 90.0
+BANK_MULT = 512.0 / 180.0
+HDG_MULT = 1024.0 / 360.0
+
+
+def _sign_extend_10bit(x: int) -> int:
+    x &= 0x3FF
+    return x - 0x400 if (x & 0x200) else x
+
+
+# Jedes Teilfeld hat nur 1024 mögliche Werte -> einmal vorberechnen.
+# Die Formeln entsprechen exakt observer.unpack_pbh.
+PITCH_TABLE: List[int] = []
+BANK_TABLE: List[int] = []
+HDG_TABLE: List[float] = []        # heading_deg, auf 2 Stellen gerundet
+HDG_ROUND_TABLE: List[int] = []    # heading_deg_rounded
+
+for _raw in range(1024):
+    _signed = _sign_extend_10bit(_raw)
+    PITCH_TABLE.append(math.floor(_signed / -PITCH_MULT))
+    BANK_TABLE.append(math.floor(_signed / -BANK_MULT))
+    _hdg = _raw / HDG_MULT
+    HDG_TABLE.append(round(_hdg, 2))
+    HDG_ROUND_TABLE.append(int(round(_hdg)) % 360)
+del _raw, _signed, _hdg
+
+
+def decode_pbh(pbh: int) -> Tuple[float, int, int, int, bool]:
+    """-> (hdg_deg, hdg_deg_round, pitch_deg, bank_deg, on_ground)"""
+    hdg = (pbh >> 2) & 0x3FF
+    return (HDG_TABLE[hdg], HDG_ROUND_TABLE[hdg],
+            PITCH_TABLE[(pbh >> 22) & 0x3FF], BANK_TABLE[(pbh >> 12) & 0x3FF],
+            bool(pbh & 0x2))
+
+
+# =============================================================================
+# Records
+# =============================================================================
+class PilotPosition:
+    __slots__ = ("callsign", "squawk", "type", "lat", "lon", "alt", "gs", "vs",
+                 "pbh_u32", "hdg_deg", "hdg_deg_round", "pitch_deg", "bank_deg",
+                 "on_ground", "ts")
+
+    def __init__(self, callsign, squawk, type, lat, lon, alt, gs, vs, pbh_u32, ts,
+                 hdg_deg=0.0, hdg_deg_round=0, pitch_deg=0, bank_deg=0, on_ground=False):
+        self.callsign = callsign
+        self.squawk = squawk
+        self.type = type
+        self.lat = lat
+        self.lon = lon
+        self.alt = alt
+        self.gs = gs
+        self.vs = vs
+        self.pbh_u32 = pbh_u32
+        self.ts = ts
+        self.hdg_deg = hdg_deg
+        self.hdg_deg_round = hdg_deg_round
+        self.pitch_deg = pitch_deg
+        self.bank_deg = bank_deg
+        self.on_ground = on_ground
+
+    def decode(self):
+        (self.hdg_deg, self.hdg_deg_round, self.pitch_deg,
+         self.bank_deg, self.on_ground) = decode_pbh(self.pbh_u32)
+
+    def to_dict(self) -> Dict[str, Any]:
+        # gleiche Keys/Typen wie das frühere parse_position_line-Ergebnis
+        return {
+            "callsign": self.callsign,
+            "squawk": self.squawk,
+            "type": self.type,
+            "lat": self.lat,
+            "lon": self.lon,
+            "alt": self.alt,
+            "gs": self.gs,
+            "vs": self.vs,
+            "pbh_u32": self.pbh_u32,
+            "hdg_deg": self.hdg_deg,
+            "hdg_deg_round": self.hdg_deg_round,
+            "pitch_deg": self.pitch_deg,
+            "bank_deg": self.bank_deg,
+            "on_ground": self.on_ground,
+            "ts": self.ts,
+        }
+
+
+class AtcPosition:
+    __slots__ = ("callsign", "frequency", "facility", "visual_range", "rating",
+                 "lat", "lon", "alt", "ts")
+
+    def frequency_str(self) -> str:
+        # wie whazzup (fsd.cpp): 1xx.xxx, 0 = keine Frequenz
+        f = self.frequency
+        if f <= 0 or f >= 100000:
+            return "199.998"
+        return f"1{f // 1000:02d}.{f % 1000:03d}"
+
+
+class ClientAdd:
+    """#AA (ATC) bzw. #AP (Pilot) – Login eines Clients."""
+    __slots__ = ("callsign", "kind", "cid", "realname", "rating", "ts")
+
+
+class ClientRemove:
+    """#DA (ATC) bzw. #DP (Pilot) – Logout eines Clients."""
+    __slots__ = ("callsign", "kind", "cid", "ts")
+
+
+class FlightPlan:
+    __slots__ = ("callsign", "flight_rules", "aircraft", "tas", "departure",
+                 "deptime", "actdeptime", "altitude", "arrival", "hrs_enroute",
+                 "min_enroute", "hrs_fuel", "min_fuel", "alternate", "remarks",
+                 "route", "ts")
+
+    def to_vatsim(self) -> Dict[str, Any]:
+        return {
+            "flight_rules": self.flight_rules,
+            "aircraft": self.aircraft,
+            "aircraft_short": _aircraft_short(self.aircraft),
+            "departure": self.departure,
+            "arrival": self.arrival,
+            "alternate": self.alternate,
+            "cruise_tas": self.tas,
+            "altitude": self.altitude,
+            "deptime": self.deptime,
+            "enroute_time": _hhmm(self.hrs_enroute, self.min_enroute),
+            "fuel_time": _hhmm(self.hrs_fuel, self.min_fuel),
+            "remarks": self.remarks,
+            "route": self.route,
+        }
+
+
+def _hhmm(hours: str, minutes: str) -> str:
+    try:
+        return f"{int(hours):02d}{int(minutes):02d}"
+    except ValueError:
+        return f"{hours}{minutes}"
+
+
+def _aircraft_short(aircraft: str) -> str:
+    # "H/B744/L" -> "B744", "B738/L" -> "B738"
+    parts = aircraft.split("/")
+    if len(parts) >= 2 and len(parts[0]) == 1:
+        return parts[1]
+    return parts[0]
+
+
+class TextMessage:
+    __slots__ = ("sender", "receiver", "text", "ts")
+
+
+# =============================================================================
+# Parser
+# =============================================================================
+def _int(s: str) -> int:
+    try:
+        return int(s)
+    except ValueError:
+        return int(float(s))
+
+
+# Die Positions-Parser bekommen line.split(":") inkl. führendem "@" in p[0].
+# Schneller Pfad: so wie der Server formatiert (%d, %u). Squawk-Normalisierung
+# ("0200" -> "200") und PBH-Dekodierung wiederholen sich pro Flugzeug ständig und
+# werden pro Rohtext gemerkt; die Caches sind begrenzt (Müllwerte leeren sie).
+_CACHE_MAX = 8192
+_squawks: Dict[str, str] = {}
+_pbh_decoded: Dict[str, Tuple[int, float, int, int, int, bool]] = {}
+
+
+def _squawk(s: str) -> str:
+    sq = _squawks.get(s)
+    if sq is None:
+        sq = str(int(s))
+        if len(_squawks) >= _CACHE_MAX:
+            _squawks.clear()
+        _squawks[s] = sq
+    return sq
+
+
+def _pbh(s: str) -> Tuple[int, float, int, int, int, bool]:
+    # (pbh_u32, hdg_deg, hdg_deg_round, pitch_deg, bank_deg, on_ground)
+    d = _pbh_decoded.get(s)
+    if d is None:
+        pbh = int(s) & 0xFFFFFFFF
+        hdg = (pbh >> 2) & 0x3FF
+        d = (pbh, HDG_TABLE[hdg], HDG_ROUND_TABLE[hdg], PITCH_TABLE[(pbh >> 22) & 0x3FF],
+             BANK_TABLE[(pbh >> 12) & 0x3FF], bool(pbh & 0x2))
+        if len(_pbh_decoded) >= _CACHE_MAX:
+            _pbh_decoded.clear()
+        _pbh_decoded[s] = d
+    return d
+
+
+def _pilot_classic(p: List[str], ts: int) -> PilotPosition:
+    d = _pbh_decoded.get(p[8]) or _pbh(p[8])
+    return PilotPosition(p[1], _squawks.get(p[2]) or _squawk(p[2]), p[0][1:], float(p[4]), float(p[5]),
+                         int(p[6]), int(p[7]), 0, d[0], ts, d[1], d[2], d[3], d[4], d[5])
+
+
+def _pilot_classic_raw(p: List[str], ts: int) -> PilotPosition:
+    # maskiert wie der Einzelpfad: negative/zu große PBH würden np.fromiter(uint32) sprengen
+    return PilotPosition(p[1], _squawks.get(p[2]) or _squawk(p[2]), p[0][1:], float(p[4]), float(p[5]),
+                         int(p[6]), int(p[7]), 0, int(p[8]) & 0xFFFFFFFF, ts)
+
+
+# Toleranter Pfad (Leerzeichen, Zahlen als Float-Text), wie das alte parse_position_line
+def _pilot_classic_slow(p: List[str], ts: int) -> PilotPosition:
+    return PilotPosition(p[1].strip(), str(int(p[2].strip())), p[0][1:].strip(), float(p[4]), float(p[5]),
+                         _int(p[6]), _int(p[7]), 0, _int(p[8]) & 0xFFFFFFFF, ts)
+
+
+def _pilot_legacy(p: List[str], ts: int) -> PilotPosition:
+    return PilotPosition(p[0][1:].strip(), p[1].strip(), p[2].strip(), float(p[3]), float(p[4]),
+                         _int(p[5]), _int(p[6]), _int(p[8]), _int(p[7]) & 0xFFFFFFFF, ts)
+
+
+def _pilot_legacy_decoded(p: List[str], ts: int) -> PilotPosition:
+    r = _pilot_legacy(p, ts)
+    r.decode()
+    return r
+
+
+# Versuchsreihenfolge (Classic hat Vorrang):
+# (Felder inkl. "@", schnell+dekodiert, schnell+roh, tolerant)
+_PILOT_LAYOUTS = (
+    # Classic: @IDENTFLAG:CALLSIGN:TRANSPONDER:RATING:LAT:LON:ALT:GS:PBH:FLAGS
+    (10, _pilot_classic, _pilot_classic_raw, _pilot_classic_slow),
+    # Legacy:  @CALLSIGN:SQUAWK:TYPE:LAT:LON:ALT:GS:PBH:VS
+    (9, _pilot_legacy_decoded, _pilot_legacy, _pilot_legacy),
+)
+
+
+class FeedParser:
+    """
+    Zustandsbehafteter Parser – eine Instanz pro FSD-Verbindung.
+
+    parse(line, ts) liefert einen Record (PilotPosition, AtcPosition, ClientAdd,
+    ClientRemove, FlightPlan, TextMessage) oder None für unbekannte/kaputte Zeilen.
+    """
+
+    def __init__(self, decode: bool = True):
+        # False: PBH bleibt roh (pbh_u32), dekodiert wird später im Batch
+        self.decode = decode
+        self.errors = 0
+        self.reset()
+
+        self._by_char: Dict[str, Callable[[str, int], Any]] = {
+            "@": self._pilot_pos,
+            "%": self._atc_pos,
+        }
+        self._by_cmd: Dict[str, Callable[[str, int], Any]] = {
+            "#AA": self._add_atc,
+            "#AP": self._add_pilot,
+            "#DA": self._rm_atc,
+            "#DP": self._rm_pilot,
+            "#TM": self._text,
+            "$FP": self._plan,
+        }
+
+    def reset(self):
+        """Bei neuer Verbindung aufrufen – das Positionsformat wird neu erkannt."""
+        # Layout der Verbindung: Feldanzahl + schneller Parser; 0 = noch unbekannt
+        self._pilot_fields = 0
+        self._pilot_fast: Optional[Callable[[List[str], int], PilotPosition]] = None
+
+    def parse(self, line: str, ts: int):
+        h = self._by_char.get(line[0])
+        if h is None:
+            h = self._by_cmd.get(line[:3])
+            if h is None:
+                return None
+        try:
+            return h(line, ts)
+        except (ValueError, IndexError):
+            self.errors += 1
+            return None
+
+    # --- Handler -------------------------------------------------------------
+    def _pilot_pos(self, line: str, ts: int) -> Optional[PilotPosition]:
+        p = line.split(":")
+        # gemerktes Layout nur bei exakt passender Feldanzahl: eine 10-Feld-Zeile
+        # geht so nie durch den Legacy-Parser, solange Classic sie lesen kann
+        if len(p) == self._pilot_fields:
+            try:
+                return self._pilot_fast(p, ts)
+            except ValueError:
+                pass
+
+        # erste Zeile der Verbindung oder Zeile passt nicht: tolerant erkennen und
+        # das Layout dieser Zeile für die folgenden merken
+        for fields, fast, raw, slow in _PILOT_LAYOUTS:
+            if len(p) < fields:
+                continue
+            try:
+                r = slow(p, ts)
+            except ValueError:
+                continue
+            self._pilot_fields = fields
+            self._pilot_fast = fast if self.decode else raw
+            if self.decode:
+                r.decode()
+            return r
+        self.errors += 1
+        return None
+
+    def _atc_pos(self, line: str, ts: int) -> AtcPosition:
+        p = line[1:].split(":")
+        r = AtcPosition()
+        r.callsign = p[0].strip()
+        r.frequency = _int(p[1])
+        r.facility = _int(p[2])
+        r.visual_range = _int(p[3])
+        r.rating = _int(p[4])
+        r.lat = float(p[5])
+        r.lon = float(p[6])
+        r.alt = _int(p[7])
+        r.ts = ts
+        return r
+
+    def _add_atc(self, line: str, ts: int) -> ClientAdd:
+        # #AAcallsign:SERVER:realname:cid::rating
+        p = line[3:].split(":")
+        r = ClientAdd()
+        r.callsign = p[0].strip()
+        r.kind = "ATC"
+        r.realname = p[2] if len(p) > 2 else ""
+        r.cid = p[3] if len(p) > 3 else ""
+        r.rating = _int(p[5]) if len(p) > 5 and p[5] else 0
+        r.ts = ts
+        return r
+
+    def _add_pilot(self, line: str, ts: int) -> ClientAdd:
+        # #APcallsign:SERVER:cid::rating:protocol:simtype
+        p = line[3:].split(":")
+        r = ClientAdd()
+        r.callsign = p[0].strip()
+        r.kind = "PILOT"
+        r.realname = ""
+        r.cid = p[2] if len(p) > 2 else ""
+        r.rating = _int(p[4]) if len(p) > 4 and p[4] else 0
+        r.ts = ts
+        return r
+
+    def _rm(self, line: str, ts: int, kind: str) -> ClientRemove:
+        p = line[3:].split(":", 2)
+        r = ClientRemove()
+        r.callsign = p[0].strip()
+        r.kind = kind
+        r.cid = p[1] if len(p) > 1 else ""
+        r.ts = ts
+        return r
+
+    def _rm_atc(self, line: str, ts: int) -> ClientRemove:
+        return self._rm(line, ts, "ATC")
+
+    def _rm_pilot(self, line: str, ts: int) -> ClientRemove:
+        return self._rm(line, ts, "PILOT")
+
+    def _text(self, line: str, ts: int) -> TextMessage:
+        p = line[3:].split(":", 2)
+        r = TextMessage()
+        r.sender = p[0]
+        r.receiver = p[1] if len(p) > 1 else ""
+        r.text = p[2] if len(p) > 2 else ""
+        r.ts = ts
+        return r
+
+    def _plan(self, line: str, ts: int) -> FlightPlan:
+        # $FPcallsign:to:type:aircraft:tas:dep:deptime:actdeptime:alt:dest:
+        #    hrsenroute:minenroute:hrsfuel:minfuel:altairport:remarks:route
+        p = line[3:].split(":", 16)
+        if len(p) < 16:
+            raise ValueError("short flight plan")
+        r = FlightPlan()
+        r.callsign = p[0].strip()
+        r.flight_rules = p[2]
+        r.aircraft = p[3]
+        r.tas = p[4]
+        r.departure = p[5]
+        r.deptime = p[6]
+        r.actdeptime = p[7]
+        r.altitude = p[8]
+        r.arrival = p[9]
+        r.hrs_enroute = p[10]
+        r.min_enroute = p[11]
+        r.hrs_fuel = p[12]
+        r.min_fuel = p[13]
+        r.alternate = p[14]
+        r.remarks = p[15]
+        r.route = p[16] if len(p) > 16 else ""
+        r.ts = ts
+        return r
@@ -0,0 +1,128 @@
+"""
+Fertig encodierte JSON-Antworten mit vorkomprimierten Varianten (app.py).
+
+Ein VersionedBody gehört zu genau einem Stand der Daten: Body, starker ETag
+(Hash über den Inhalt) und Last-Modified stehen fest, gzip- und brotli-Variante
+werden beim ersten Bedarf einmal berechnet und danach für alle Anfragen
+wiederverwendet. respond() beantwortet If-None-Match / If-Modified-Since
+zuerst – ein 304 entsteht ohne Variantenwahl und ohne Body – und wählt sonst
+die Variante per Accept-Encoding.
+
+brotli ist optional (pip install brotli); ohne das Paket gibt es nur gzip.
+"""
+import gzip
+import hashlib
+import threading
+import time
+from typing import Dict, Optional, Tuple
+
+from werkzeug.http import http_date, parse_date
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+# kleine Bodies lohnen die Kompression nicht
+MIN_COMPRESS_SIZE = 1024
+GZIP_LEVEL = 6
+BROTLI_QUALITY = 5
+
+
+def _gzip(body: bytes) -> bytes:
+    # mtime=0: gleicher Inhalt -> gleiche Bytes
+    return gzip.compress(body, compresslevel=GZIP_LEVEL, mtime=0)
+
+
+def _brotli(body: bytes) -> bytes:
+    return brotli.compress(body, quality=BROTLI_QUALITY)
+
+
+# bei gleicher Qualität im Accept-Encoding gewinnt der erste Eintrag
+ENCODERS = {"br": _brotli} if brotli is not None else {}
+ENCODERS["gzip"] = _gzip
+
+
+class VersionedBody:
+    __slots__ = ("body", "etag", "last_modified", "mimetype", "_etags", "_http_date", "_variants", "_lock")
+
+    def __init__(self, body: bytes, last_modified: Optional[float] = None,
+                 mimetype: str = "application/json"):
+        self.body = body
+        self.etag = hashlib.blake2b(body, digest_size=12).hexdigest()
+        # HTTP-Datum hat Sekundenauflösung
+        self.last_modified = int(time.time() if last_modified is None else last_modified)
+        self.mimetype = mimetype
+        # alle ETags, die respond() für diesen Stand je ausgeben kann
+        self._etags = frozenset([self.etag] + [f"{self.etag}-{enc}" for enc in ENCODERS])
+        self._http_date = http_date(self.last_modified)
+        self._variants: Dict[str, bytes] = {}
+        self._lock = threading.Lock()
+
+    def variant(self, encoding: str) -> bytes:
+        data = self._variants.get(encoding)
+        if data is None:
+            with self._lock:
+                data = self._variants.get(encoding)
+                if data is None:
+                    data = ENCODERS[encoding](self.body)
+                    self._variants[encoding] = data
+        return data
+
+    def choose(self, accept_encodings) -> Tuple[Optional[str], bytes]:
+        """(Content-Encoding oder None, Bytes) passend zum Accept-Encoding des Clients."""
+        if len(self.body) >= MIN_COMPRESS_SIZE:
+            best = accept_encodings.best_match(ENCODERS)
+            if best is not None:
+                return best, self.variant(best)
+        return None, self.body
+
+    def _not_modified(self, request) -> Optional[str]:
+        """Passender ETag (bzw. "" bei If-Modified-Since), wenn der Client aktuell ist, sonst None."""
+        inm = request.headers.get("If-None-Match")
+        if inm is not None:
+            # schwacher Vergleich (RFC 9110): W/ und Anführungszeichen ignorieren
+            for tag in inm.split(","):
+                tag = tag.strip()
+                if tag == "*":
+                    return self.etag
+                if tag.startswith("W/"):
+                    tag = tag[2:]
+                tag = tag.strip('"')
+                if tag in self._etags:
+                    return tag
+            # If-Modified-Since zählt nur ohne If-None-Match
+            return None
+        ims = request.headers.get("If-Modified-Since")
+        if ims is not None:
+            since = parse_date(ims)
+            if since is not None and since.timestamp() >= self.last_modified:
+                return ""
+        return None
+
+    def _headers(self, resp):
+        resp.headers["Last-Modified"] = self._http_date
+        resp.vary.add("Accept-Encoding")
+        # Clients fragen jedes Mal nach, bekommen bei unverändertem Stand aber nur 304
+        resp.cache_control.no_cache = True
+
+    def respond(self, request, response_class):
+        if request.method in ("GET", "HEAD"):
+            tag = self._not_modified(request)
+            if tag is not None:
+                # vor Variantenwahl/Kompression: Revalidierung kostet keinen Body
+                resp = response_class(status=304)
+                resp.set_etag(tag or self.etag)
+                self._headers(resp)
+                return resp
+
+        encoding, data = self.choose(request.accept_encodings)
+        resp = response_class(data, mimetype=self.mimetype)
+        if encoding is not None:
+            resp.headers["Content-Encoding"] = encoding
+            # je Repräsentation ein eigener starker ETag
+            resp.set_etag(f"{self.etag}-{encoding}")
+        else:
+            resp.set_etag(self.etag)
+        self._headers(resp)
+        return resp
@@ -0,0 +1,161 @@
+"""
+Delta-Protokoll für Live-Updates (observer.py -> /api/live_update -> Dashboards).
+
+Jeder Push trägt eine fortlaufende Sequenznummer und die Epoche des Encoders
+(neu bei jedem Observer-Start). Es gibt zwei Nachrichtentypen:
+
+  {"type": "full",  "epoch": E, "seq": n, "clients": [...]}
+  {"type": "delta", "epoch": E, "seq": n, "base": n-1,
+   "added": [{...}], "changed": [{"callsign": cs, <nur geänderte Felder>}], "removed": [cs, ...]}
+
+Ein Empfänger, dessen letzte Sequenz nicht zu "base" passt (Lücke, Neustart),
+verwirft das Delta und fordert einen Keyframe an (HTTP 409 {"resync": true}).
+Zusätzlich sendet der Encoder alle `keyframe_interval` Sekunden einen Keyframe.
+
+Vollständige Clients (Keyframe, "added") enthält der Encoder als vorab
+encodierte Fragmente (fragcache.RawJSON) – Payloads daher mit fragcache.dumps
+serialisieren.
+"""
+import os
+from typing import Any, Callable, Dict, List, Mapping, Optional
+
+from fragcache import FragmentCache
+
+_MISSING = object()
+
+
+class DeltaEncoder:
+    """
+    Observer-Seite. encode() bekommt callsign -> Änderungsschlüssel: ein Record
+    (wird bei Updates ersetzt, nie verändert -> Identität) oder die Zeilenversion
+    aus traffic.TrafficTable. Unveränderte Clients werden nicht erneut serialisiert;
+    to_dict(callsign, schlüssel) liefert das dict nur für geänderte.
+    """
+
+    def __init__(self, keyframe_interval: float = 30.0):
+        self.keyframe_interval = keyframe_interval
+        self.epoch = os.urandom(4).hex()
+        self.seq = 0
+        self._last_keyframe = 0.0
+        self._force_keyframe = True
+        self._sent_recs: Dict[str, Any] = {}
+        self._sent_dicts: Dict[str, Dict[str, Any]] = {}
+        self.fragments = FragmentCache()
+
+    def request_keyframe(self):
+        """Nächster encode() liefert einen Keyframe (Resync, Push-Fehler)."""
+        self._force_keyframe = True
+
+    def encode(self, records: Mapping[str, Any], now: float,
+               to_dict: Callable[[str, Any], Dict[str, Any]] = lambda cs, r: r.to_dict()) -> Dict[str, Any]:
+        self.seq += 1
+        sent_recs = self._sent_recs
+        sent_dicts = self._sent_dicts
+        frags = self.fragments
+
+        if self._force_keyframe or (now - self._last_keyframe) >= self.keyframe_interval:
+            dicts: Dict[str, Dict[str, Any]] = {}
+            clients = []
+            for cs, r in records.items():
+                d = sent_dicts[cs] if sent_recs.get(cs, _MISSING) == r else to_dict(cs, r)
+                dicts[cs] = d
+                clients.append(frags.lookup(cs, r) or frags.put(cs, r, d))
+            frags.retain(records)
+            self._sent_recs = dict(records)
+            self._sent_dicts = dicts
+            self._force_keyframe = False
+            self._last_keyframe = now
+            return {"type": "full", "epoch": self.epoch, "seq": self.seq,
+                    "clients": clients}
+
+        added: List[Dict[str, Any]] = []
+        changed: List[Dict[str, Any]] = []
+        new_dicts: Dict[str, Dict[str, Any]] = {}
+        for cs, r in records.items():
+            old_rec = sent_recs.get(cs, _MISSING)
+            if old_rec == r:
+                new_dicts[cs] = sent_dicts[cs]
+                continue
+            d = to_dict(cs, r)
+            new_dicts[cs] = d
+            if old_rec is _MISSING:
+                added.append(frags.put(cs, r, d))
+                continue
+            old = sent_dicts[cs]
+            diff = {k: v for k, v in d.items() if old.get(k, _MISSING) != v}
+            if diff:
+                diff["callsign"] = cs
+                changed.append(diff)
+
+        removed = [cs for cs in sent_recs if cs not in records]
+        for cs in removed:
+            frags.drop(cs)
+
+        self._sent_recs = dict(records)
+        self._sent_dicts = new_dicts
+        return {"type": "delta", "epoch": self.epoch, "seq": self.seq, "base": self.seq - 1,
+                "added": added, "changed": changed, "removed": removed}
+
+
+class LiveState:
+    """
+    Empfänger-Seite (app.py). Hält callsign -> Client-dict und wendet Keyframes
+    und Deltas an. apply() liefert False, wenn ein Resync nötig ist.
+    """
+
+    def __init__(self):
+        self.clients: Dict[str, Dict[str, Any]] = {}
+        self.epoch: Optional[str] = None
+        self.seq = 0
+
+    def apply(self, msg: Dict[str, Any]) -> bool:
+        kind = msg.get("type", "full")
+        if kind == "full":
+            clients = msg.get("clients")
+            if not isinstance(clients, list):
+                clients = []
+            # inhaltsgleiche Clients behalten ihr bisheriges dict (Fragment-Cache in app.py bleibt gültig)
+            old = self.clients
+            fresh: Dict[str, Dict[str, Any]] = {}
+            for c in clients:
+                if isinstance(c, dict) and c.get("callsign"):
+                    prev = old.get(c["callsign"])
+                    fresh[c["callsign"]] = prev if prev == c else c
+            self.clients = fresh
+            self.epoch = msg.get("epoch")
+            self.seq = int(msg.get("seq", 0) or 0)
+            return True
+
+        if kind != "delta":
+            return False
+        if msg.get("epoch") != self.epoch or msg.get("base") != self.seq:
+            return False
+
+        clients = self.clients
+        for cs in msg.get("removed", ()):
+            clients.pop(cs, None)
+        for c in msg.get("added", ()):
+            clients[c["callsign"]] = c
+        for diff in msg.get("changed", ()):
+            cur = clients.get(diff["callsign"])
+            if cur is None:
+                return False
+            # neues dict statt update(): bereits ausgelieferte Snapshots bleiben unverändert
+            clients[diff["callsign"]] = {**cur, **diff}
+        self.seq = msg["seq"]
+        return True
+
+    def advance(self, msg: Dict[str, Any]) -> Optional["LiveState"]:
+        """
+        Wie apply(), aber auf einer Kopie; self bleibt unverändert (app.py baut den
+        neuen Stand außerhalb des Locks und tauscht nur die Referenz). None = Resync nötig.
+        """
+        nxt = LiveState()
+        # Keyframe baut ohnehin ein neues dict; ein Delta verändert die Kopie
+        nxt.clients = self.clients if msg.get("type", "full") == "full" else dict(self.clients)
+        nxt.epoch = self.epoch
+        nxt.seq = self.seq
+        return nxt if nxt.apply(msg) else None
+
+    def client_list(self) -> List[Dict[str, Any]]:
+        return list(self.clients.values())
@@ -0,0 +1,197 @@
+"""
+Metriken für Observer und Web-App im Prometheus-Textformat (observer.py, app.py).
+
+Counter, Gauge und Histogram (feste Buckets) ohne Locks: jede Metrik hat genau
+einen schreibenden Thread (Feed-Loop, Push-Thread, Writer-Thread); unter
+eventlet laufen alle Greenlets in einem OS-Thread, ein `+=` wird dort nie
+unterbrochen. Gelesen wird nur beim Scrape. Werte, die ohnehin schon irgendwo
+gezählt werden (Parser-Fehler, Queue-Drops, Anzahl Clients), hängen als
+Funktion am Metrik-Objekt und kosten im heißen Pfad nichts.
+
+Heiße Pfade zählen pro Chunk bzw. pro Request, nicht pro Zeile:
+
+    RX_LINES.inc(len(lines))
+    CHUNK_SECONDS.observe(time.perf_counter() - t0)
+
+render() liefert den Text für /metrics; serve() startet dafür einen eigenen
+kleinen HTTP-Server (Observer).
+"""
+import math
+import threading
+from bisect import bisect_left
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Sekunden: von einem Chunk (~100 µs) bis zum Push-Timeout
+LATENCY_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025,
+                   0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+Labels = Dict[str, str]
+Sample = Tuple[str, str, float]
+
+
+def _escape(v: str) -> str:
+    return v.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _label_str(labels: Labels, extra: str = "") -> str:
+    parts = [f'{k}="{_escape(str(v))}"' for k, v in labels.items()]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _fmt(v: float) -> str:
+    if isinstance(v, int) or (isinstance(v, float) and v.is_integer() and abs(v) < 1e15):
+        return str(int(v))
+    if math.isinf(v):
+        return "+Inf" if v > 0 else "-Inf"
+    return repr(float(v))
+
+
+class Counter:
+    kind = "counter"
+    __slots__ = ("name", "labels", "value", "fn")
+
+    def __init__(self, name: str, labels: Optional[Labels] = None, fn: Optional[Callable[[], float]] = None):
+        self.name = name
+        self.labels = labels or {}
+        self.value = 0
+        self.fn = fn
+
+    def inc(self, n: float = 1):
+        self.value += n
+
+    def samples(self) -> Iterator[Sample]:
+        yield self.name, _label_str(self.labels), self.fn() if self.fn is not None else self.value
+
+
+class Gauge(Counter):
+    kind = "gauge"
+    __slots__ = ()
+
+    def set(self, v: float):
+        self.value = v
+
+    def dec(self, n: float = 1):
+        self.value -= n
+
+
+class Histogram:
+    kind = "histogram"
+    __slots__ = ("name", "labels", "bounds", "counts", "sum")
+
+    def __init__(self, name: str, labels: Optional[Labels] = None, buckets: Sequence[float] = LATENCY_BUCKETS):
+        self.name = name
+        self.labels = labels or {}
+        self.bounds = tuple(sorted(buckets))
+        # ein Feld mehr für +Inf; kumuliert wird erst beim Scrape
+        self.counts = [0] * (len(self.bounds) + 1)
+        self.sum = 0.0
+
+    def observe(self, v: float):
+        self.counts[bisect_left(self.bounds, v)] += 1
+        self.sum += v
+
+    @property
+    def count(self) -> int:
+        return sum(self.counts)
+
+    def samples(self) -> Iterator[Sample]:
+        counts = list(self.counts)
+        total = 0
+        for bound, n in zip(self.bounds + (math.inf,), counts):
+            total += n
+            yield self.name + "_bucket", _label_str(self.labels, f'le="{_fmt(bound)}"'), total
+        yield self.name + "_sum", _label_str(self.labels), self.sum
+        yield self.name + "_count", _label_str(self.labels), total
+
+
+class Registry:
+    def __init__(self):
+        # name -> (typ, hilfe, [serien]); Reihenfolge = Registrierung
+        self._families: Dict[str, Tuple[str, str, List]] = {}
+        self._lock = threading.Lock()
+
+    def _register(self, cls, name: str, help: str, labels: Optional[Labels], **kw):
+        labels = labels or {}
+        with self._lock:
+            family = self._families.get(name)
+            if family is None:
+                family = self._families[name] = (cls.kind, help, [])
+            elif family[0] != cls.kind:
+                raise ValueError(f"metric {name} already registered as {family[0]}")
+            for metric in family[2]:
+                if metric.labels == labels:
+                    # neue Instanz (z.B. zweiter LiveObserver im Benchmark) übernimmt die Funktion
+                    if kw.get("fn") is not None:
+                        metric.fn = kw["fn"]
+                    return metric
+            metric = cls(name, labels, **kw)
+            family[2].append(metric)
+            return metric
+
+    def counter(self, name: str, help: str, labels: Optional[Labels] = None,
+                fn: Optional[Callable[[], float]] = None) -> Counter:
+        return self._register(Counter, name, help, labels, fn=fn)
+
+    def gauge(self, name: str, help: str, labels: Optional[Labels] = None,
+              fn: Optional[Callable[[], float]] = None) -> Gauge:
+        return self._register(Gauge, name, help, labels, fn=fn)
+
+    def histogram(self, name: str, help: str, labels: Optional[Labels] = None,
+                  buckets: Sequence[float] = LATENCY_BUCKETS) -> Histogram:
+        return self._register(Histogram, name, help, labels, buckets=buckets)
+
+    def unregister(self, name: str, labels: Optional[Labels] = None):
+        with self._lock:
+            family = self._families.get(name)
+            if family is not None:
+                family[2][:] = [m for m in family[2] if m.labels != (labels or {})]
+
+    def render(self) -> str:
+        with self._lock:
+            families = [(name, kind, help, list(series)) for name, (kind, help, series) in self._families.items()]
+        out = []
+        for name, kind, help, series in families:
+            if not series:
+                continue
+            out.append(f"# HELP {name} {help}")
+            out.append(f"# TYPE {name} {kind}")
+            for metric in series:
+                try:
+                    for sample, labels, value in metric.samples():
+                        out.append(f"{sample}{labels} {_fmt(value)}")
+                except Exception:
+                    # Fehler in einer Funktion darf den Scrape nicht kaputt machen
+                    continue
+        return "\n".join(out) + "\n"
+
+
+REGISTRY = Registry()
+
+
+def serve(registry: Registry, host: str, port: int) -> ThreadingHTTPServer:
+    """GET /metrics auf host:port in einem Daemon-Thread."""
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.split("?", 1)[0] != "/metrics":
+                self.send_error(404)
+                return
+            body = registry.render().encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", CONTENT_TYPE)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    httpd = ThreadingHTTPServer((host, port), Handler)
+    httpd.daemon_threads = True
+    threading.Thread(target=httpd.serve_forever, name="metrics", daemon=True).start()
+    return httpd
@@ -1,16 +1,36 @@
 #!/usr/bin/env python3
 import os
 import time
-import json
 import socket
+import asyncio
 import threading
+import concurrent.futures
 import urllib.request
+import urllib.error
+import urllib.parse
+import http.client
+import collections
 import math
-from typing import Optional, Dict, Any, List
+import random
+import functools
+from typing import Optional, Dict, Any, List, Callable
 from pathlib import Path
 from datetime import datetime, timezone
 import sys
 
+import fragcache
+import metrics
+import obslog
+from capture import CaptureWriter
+from fragcache import FragmentCache
+from framer import LineFramer
+from livedelta import DeltaEncoder
+from datawriter import FsdDataWriter
+from expiry import ExpiryWheel
+from traffic import TrafficTable
+from fsdparse import (FeedParser, PilotPosition, AtcPosition, ClientAdd, ClientRemove,
+                      FlightPlan, TextMessage)
+
 sys.stdout.reconfigure(line_buffering=True)
 sys.stderr.reconfigure(line_buffering=True)
 
@@ -19,14 +39,53 @@ sys.stderr.reconfigure(line_buffering=True)
 # =============================================================================
 FSD_HOST = os.environ.get("FSD_HOST", "127.0.0.1")
 FSD_PORT = int(os.environ.get("FSD_PORT", "6809"))
+# mehrere Server eines Mesh gleichzeitig: "host:port,host:port" oder "name=host:port,...";
+# leer = nur FSD_HOST:FSD_PORT. Ab dem zweiten Server meldet sich der Observer als FSD_CALLSIGN_<n> an
+# (FSD_LOGIN_LINE dagegen geht unverändert an alle Server)
+FSD_SERVERS = os.environ.get("FSD_SERVERS", "").strip()
 
 PUSH_URL = os.environ.get("FSD_PUSH_URL", "http://127.0.0.1:8080/api/live_update")
 PUSH_TOKEN = os.environ.get("FSD_PUSH_TOKEN", "my-super-secret-token")
 PUSH_INTERVAL = float(os.environ.get("FSD_PUSH_INTERVAL", "1.0"))
-
-DEBUG_RX = os.environ.get("FSD_DEBUG_RX", "1").strip() not in ("0", "false", "False", "")
+# "keepalive" (Default, persistente Verbindung + Sender-Thread) oder "urllib" (alt: neue Verbindung pro Push)
+PUSH_TRANSPORT = os.environ.get("FSD_PUSH_TRANSPORT", "keepalive").strip().lower()
+# max. wartende Pushes; bei Überlauf wird der älteste verworfen
+PUSH_QUEUE_MAX = int(os.environ.get("FSD_PUSH_QUEUE", "4"))
+# spätestens nach so vielen Sekunden ein vollständiger Keyframe statt Delta
+KEYFRAME_INTERVAL = float(os.environ.get("FSD_KEYFRAME_INTERVAL", "30"))
+
+# RX-Mitschnitt (Chunks + Zeilen) ist jetzt aus; FSD_DEBUG_RX=1 bzw. FSD_LOG="info,rx=debug"
+# schaltet ihn ein, FSD_LOG_SAMPLE/FSD_LOG_RATE dünnen aus (siehe obslog.py)
 SOCK_TIMEOUT_SEC = int(os.environ.get("FSD_SOCK_TIMEOUT", "30"))
 
+# "asyncio" (Default: gebündeltes Lesen, Push direkt nach frischen Daten) oder "thread" (blockierendes
+# recv + Push-Thread); Latenz/CPU-Vergleich siehe bench/bench_engine.py
+OBSERVER_ENGINE = os.environ.get("FSD_OBSERVER_ENGINE", "asyncio").strip().lower()
+# asyncio: ein fälliger Push wartet so lange auf den nächsten Chunk, um dessen Zeilen mitzunehmen
+PUSH_SETTLE = float(os.environ.get("FSD_PUSH_SETTLE", "0.02"))
+# asyncio: nach einem Chunk so lange nicht lesen (mehrere Chunks pro Loop-Durchlauf); ein fälliger
+# Push holt den Rest sofort ab. 0 = jeden Chunk einzeln lesen
+READ_COALESCE = float(os.environ.get("FSD_READ_COALESCE", "0.05"))
+RECONNECT_MAX_BACKOFF = float(os.environ.get("FSD_RECONNECT_MAX_BACKOFF", "30"))
+# Zeilen, die länger sind, werden verworfen (Schutz gegen Müll ohne Zeilenende)
+MAX_LINE_BYTES = int(os.environ.get("FSD_MAX_LINE", "8192"))
+# Clients ohne Paket seit so vielen Sekunden entfernen (auch ohne #DP/#DA); 0 = nie
+CLIENT_TTL = float(os.environ.get("FSD_CLIENT_TTL", "120"))
+# Obergrenze für gleichzeitig bekannte Callsigns; darüber fliegen die am längsten inaktiven raus (0 = aus)
+MAX_CLIENTS = int(os.environ.get("FSD_MAX_CLIENTS", "20000"))
+
+# Batch-Ingest: PBH aller Positionen eines Chunks gemeinsam mit NumPy dekodieren
+BATCH_INGEST = os.environ.get("FSD_BATCH_INGEST", "0").strip() not in ("0", "false", "False", "")
+# kleinere Bursts lohnen NumPy nicht -> skalare Tabellen-Dekodierung
+BATCH_MIN = int(os.environ.get("FSD_BATCH_MIN", "64"))
+
+if BATCH_INGEST:
+    try:
+        import pbhbatch
+    except ImportError:
+        obslog.get("config").log(obslog.WARN, "FSD_BATCH_INGEST=1, aber numpy fehlt -> skalarer Modus")
+        BATCH_INGEST = False
+
 # ---- Login defaults (passend zu deinem FSD-Server: #AA / #AP) ----
 FSD_LOGIN_MODE = os.environ.get("FSD_LOGIN_MODE", "AA").strip().upper()  # "AA" oder "AP"
 FSD_CALLSIGN = os.environ.get("FSD_CALLSIGN", "OBS1").strip()
@@ -51,6 +110,48 @@ UNIX_DIR = BASE_DIR / "unix"
 FSD_DATA_JSON_PATH = Path(
     os.environ.get("FSD_DATA_JSON_PATH", str(UNIX_DIR / "fsd-data.json"))
 )
+# 0 = kompakt (Default), sonst Einrückung wie früher (z.B. 2)
+FSD_DATA_JSON_INDENT = int(os.environ.get("FSD_DATA_JSON_INDENT", "0"))
+# zusätzlich fsd-data.json.gz schreiben (für Webserver mit gzip_static)
+FSD_DATA_JSON_GZIP = os.environ.get("FSD_DATA_JSON_GZIP", "0").strip() not in ("0", "false", "False", "")
+FSD_DATA_JSON_INTERVAL = float(os.environ.get("FSD_DATA_JSON_INTERVAL", "1.0"))
+
+# =============================================================================
+# Mitschnitt der Rohzeilen (capture.py), abspielbar mit replay.py
+# =============================================================================
+# leer = aus
+CAPTURE_DIR = os.environ.get("FSD_CAPTURE_DIR", "").strip()
+CAPTURE_SEGMENT_MB = float(os.environ.get("FSD_CAPTURE_SEGMENT_MB", "64"))
+CAPTURE_SEGMENT_SEC = float(os.environ.get("FSD_CAPTURE_SEGMENT_SEC", "3600"))
+# 0 = alle Segmente behalten
+CAPTURE_KEEP = int(os.environ.get("FSD_CAPTURE_KEEP", "0"))
+
+# =============================================================================
+# Logging (obslog.py)
+# =============================================================================
+LOG_CONN = obslog.get("conn")
+LOG_PUSH = obslog.get("push")
+LOG_CLIENTS = obslog.get("clients")
+LOG_PARSE = obslog.get("parse")
+LOG_RX_CHUNK = obslog.get("rx.chunk")
+LOG_RX_LINE = obslog.get("rx.line")
+RX_RING = obslog.RX_RING
+
+# =============================================================================
+# Metriken (metrics.py), Prometheus-Text auf http://FSD_METRICS_HOST:FSD_METRICS_PORT/metrics
+# =============================================================================
+# 0 = kein eigener Port
+METRICS_PORT = int(os.environ.get("FSD_METRICS_PORT", "9108"))
+METRICS_HOST = os.environ.get("FSD_METRICS_HOST", "127.0.0.1")
+METRICS = metrics.REGISTRY
+RX_BYTES = METRICS.counter("fsd_observer_rx_bytes_total", "Bytes received from the FSD server")
+RX_LINES = METRICS.counter("fsd_observer_rx_lines_total", "Lines received from the FSD server")
+CHUNK_SECONDS = METRICS.histogram("fsd_observer_chunk_seconds", "Time to frame, parse and apply one received chunk")
+CONNECTS = METRICS.counter("fsd_observer_connects_total", "Successful connections to the FSD server")
+PUSH_BUILD_SECONDS = METRICS.histogram("fsd_observer_push_build_seconds", "Time to build one push payload")
+PUSH_SECONDS = METRICS.histogram("fsd_observer_push_seconds", "Round trip of one POST to /api/live_update")
+PUSH_FAILURES = METRICS.counter("fsd_observer_push_failures_total", "Failed pushes (HTTP error or connection error)")
+PUSH_RESYNCS = METRICS.counter("fsd_observer_push_resyncs_total", "Pushes answered with 409 (web app requested a keyframe)")
 
 # =============================================================================
 # PBH Decoder (Swift-kompatible Semantik)
@@ -94,6 +195,9 @@ def unpack_pbh(pbh_u32: int) -> Dict[str, Any]:
 # =============================================================================
 def parse_position_line(line: str) -> Optional[Dict[str, Any]]:
     """
+    Einzelzeilen-Variante (Kompatibilität). Der Observer selbst nutzt
+    fsdparse.FeedParser (Format wird pro Zeile erkannt).
+
     Unterstützte Formate:
 
     (A) Classic FSD (wie in fsd/clinterface.cpp sendpilotpos):
@@ -102,95 +206,12 @@ def parse_position_line(line: str) -> Optional[Dict[str, Any]]:
     (B) Legacy/alt (dein bisheriges Erwartungsformat):
       @CALLSIGN:SQUAWK:TYPE:LAT:LON:ALT:GS:PBH:VS
     """
-    if "@" not in line:
+    i = line.find("@")
+    if i < 0:
         return None
-
-    line = line[line.find("@"):].strip()
-    if not line.startswith("@"):
-        return None
-
-    parts = line[1:].split(":")
-    if len(parts) < 9:
-        return None
-
-    # --- Versuch A: Classic FSD Format (10 Felder) ---
-    # IDENTFLAG ist oft ein einzelner Buchstabe (z.B. "P"), Callsign ist Text,
-    # LAT ist float etc.
-    if len(parts) >= 10:
-        identflag = parts[0].strip()
-        callsign = parts[1].strip()
-        try:
-            squawk = str(int(parts[2].strip()))
-            # rating = int(parts[3])  # optional
-            lat = float(parts[4])
-            lon = float(parts[5])
-            alt = int(float(parts[6]))
-            gs  = int(float(parts[7]))
-            pbh_raw = int(float(parts[8]))
-            # flags = int(parts[9])  # optional
-            vs = 0  # im Classic-Pilotpos nicht enthalten
-        except ValueError:
-            # falls es doch nicht passt, unten Fallback probieren
-            identflag = None
-        else:
-            decoded = unpack_pbh(pbh_raw)
-            return {
-                "callsign": callsign,
-                "squawk": squawk,
-                "type": identflag,     # für Anzeige im Dashboard
-                "lat": lat,
-                "lon": lon,
-                "alt": alt,
-                "gs": gs,
-                "vs": vs,
-
-                "pbh_u32": decoded["pbh_u32"],
-                "hdg_deg": round(decoded["heading_deg"], 2),
-                "hdg_deg_round": decoded["heading_deg_rounded"],
-                "pitch_deg": decoded["pitch_deg"],
-                "bank_deg": decoded["bank_deg"],
-                "on_ground": decoded["on_ground"],
-
-                "ts": int(time.time())
-            }
-
-    # --- Versuch B: Legacy Format (deine alte Erwartung) ---
-    if len(parts) >= 9:
-        callsign = parts[0].strip()
-        squawk = parts[1].strip()
-        ctype = parts[2].strip()
-
-        try:
-            lat = float(parts[3])
-            lon = float(parts[4])
-            alt = int(float(parts[5]))
-            gs  = int(float(parts[6]))
-            pbh_raw = int(float(parts[7]))
-            vs  = int(float(parts[8]))
-        except ValueError:
-            return None
-
-        decoded = unpack_pbh(pbh_raw)
-        return {
-            "callsign": callsign,
-            "squawk": squawk,
-            "type": ctype,
-            "lat": lat,
-            "lon": lon,
-            "alt": alt,
-            "gs": gs,
-            "vs": vs,
-
-            "pbh_u32": decoded["pbh_u32"],
-            "hdg_deg": round(decoded["heading_deg"], 2),
-            "hdg_deg_round": decoded["heading_deg_rounded"],
-            "pitch_deg": decoded["pitch_deg"],
-            "bank_deg": decoded["bank_deg"],
-            "on_ground": decoded["on_ground"],
-
-            "ts": int(time.time())
-        }
-
+    rec = FeedParser().parse(line[i:].strip(), int(time.time()))
+    if isinstance(rec, PilotPosition):
+        return rec.to_dict()
     return None
 
 
@@ -198,7 +219,7 @@ def parse_position_line(line: str) -> Optional[Dict[str, Any]]:
 # HTTP Push
 # =============================================================================
 def http_post_json(url: str, token: str, payload: dict) -> int:
-    data = json.dumps(payload).encode("utf-8")
+    data = fragcache.dumps(payload).encode("utf-8")
     req = urllib.request.Request(
         url=url,
         data=data,
@@ -211,6 +232,117 @@ def http_post_json(url: str, token: str, payload: dict) -> int:
     with urllib.request.urlopen(req, timeout=3) as resp:
         return resp.status
 
+
+class PushChannel:
+    """
+    Persistente Keep-Alive-Verbindung zu /api/live_update mit eigenem Sender-Thread.
+
+    submit() blockiert nie: Payloads landen in einer begrenzten Queue; ist sie
+    voll, fliegt der älteste Eintrag raus (drop-oldest). Eine langsame Web-App
+    bremst so nie den Observer. on_failure(status_or_exc) wird bei verworfenen
+    Payloads (None), HTTP-Fehlern (Statuscode) und Verbindungsfehlern (Exception)
+    aus dem Sender-Thread aufgerufen.
+    """
+
+    def __init__(self, url: str, token: str, maxlen: int = 4, timeout: float = 3.0,
+                 on_failure: Optional[Callable[[Any], None]] = None):
+        u = urllib.parse.urlsplit(url)
+        if u.scheme not in ("http", "https"):
+            raise ValueError(f"unsupported push url: {url}")
+        self._conn_cls = http.client.HTTPSConnection if u.scheme == "https" else http.client.HTTPConnection
+        self._host = u.hostname or "127.0.0.1"
+        self._port = u.port
+        self._path = (u.path or "/") + (f"?{u.query}" if u.query else "")
+        self._headers = {
+            "Content-Type": "application/json",
+            "X-FSD-Token": token,
+            "Connection": "keep-alive",
+        }
+        self._timeout = timeout
+        self._conn: Optional[http.client.HTTPConnection] = None
+        self._queue: collections.deque = collections.deque()
+        self._maxlen = maxlen
+        self._cond = threading.Condition()
+        self.on_failure = on_failure
+        self.dropped = 0
+        self.connects = 0
+        self.last_latency = 0.0
+
+    def start(self) -> "PushChannel":
+        threading.Thread(target=self._run, name="push-channel", daemon=True).start()
+        return self
+
+    def submit(self, payload: dict):
+        dropped = False
+        with self._cond:
+            if len(self._queue) >= self._maxlen:
+                self._queue.popleft()
+                self.dropped += 1
+                dropped = True
+            self._queue.append(payload)
+            self._cond.notify()
+        if dropped and self.on_failure:
+            self.on_failure(None)
+
+    def wait_idle(self, timeout: float) -> bool:
+        """Wartet, bis die Queue leer ist (replay.py am Ende); False bei Timeout."""
+        deadline = time.monotonic() + timeout
+        while self._queue and time.monotonic() < deadline:
+            time.sleep(0.05)
+        return not self._queue
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while not self._queue:
+                    self._cond.wait()
+                payload = self._queue.popleft()
+            t0 = time.perf_counter()
+            try:
+                status = self.post(fragcache.dumps(payload).encode("utf-8"))
+            except Exception as e:
+                if self.on_failure:
+                    self.on_failure(e)
+                continue
+            PUSH_SECONDS.observe(time.perf_counter() - t0)
+            if status >= 300 and self.on_failure:
+                self.on_failure(status)
+
+    def post(self, body: bytes) -> int:
+        """Sendet einen Body synchron über die persistente Verbindung; ein Retry nach Idle-Close."""
+        t0 = time.perf_counter()
+        for attempt in (0, 1):
+            try:
+                if self._conn is None:
+                    self._connect()
+                self._conn.request("POST", self._path, body=body, headers=self._headers)
+                resp = self._conn.getresponse()
+                resp.read()
+                if resp.will_close:
+                    self._close()
+                self.last_latency = time.perf_counter() - t0
+                return resp.status
+            except (http.client.HTTPException, OSError):
+                self._close()
+                if attempt:
+                    raise
+        return 0
+
+    def _connect(self):
+        self._conn = self._conn_cls(self._host, self._port, timeout=self._timeout)
+        self._conn.connect()
+        # Request/Response-Muster: kein Nagle-Delay auf der persistenten Verbindung
+        self._conn.sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self.connects += 1
+
+    def _close(self):
+        if self._conn is not None:
+            try:
+                self._conn.close()
+            except Exception:
+                pass
+            self._conn = None
+
 # =============================================================================
 # Debug Helpers
 # =============================================================================
@@ -219,62 +351,422 @@ def _hexdump_prefix(b: bytes, max_len: int = 96) -> str:
     return " ".join(f"{x:02x}" for x in bb) + (" ..." if len(b) > max_len else "")
 
 def log_rx_chunk(chunk: bytes):
-    if not DEBUG_RX:
+    if not LOG_RX_CHUNK.debug:
         return
-    try:
-        text = chunk.decode("utf-8", errors="replace")
-    except Exception:
-        text = "<decode failed>"
-    print(f"[observer] RX bytes len={len(chunk)} repr={chunk!r}")
-    print(f"[observer] RX text: {text}")
-    print(f"[observer] RX hex:  {_hexdump_prefix(chunk)}")
+    LOG_RX_CHUNK.log(obslog.DEBUG, "RX chunk", len=len(chunk),
+                     text=chunk.decode("utf-8", errors="replace"), hex=_hexdump_prefix(chunk))
+
+@functools.lru_cache(maxsize=4096)
+def _iso_utc(ts: int) -> str:
+    return datetime.fromtimestamp(ts, timezone.utc).isoformat().replace("+00:00", "Z")
+
+
+def _cid_int(ident: Optional[ClientAdd]) -> Optional[int]:
+    cid = ident.cid if ident is not None else ""
+    return int(cid) if str(cid).isdigit() else None
+
+
+def _vatsim_pilot(rec: PilotPosition, ident: Optional[ClientAdd], plan: Optional[FlightPlan]) -> Dict[str, Any]:
+    return {
+        "cid": _cid_int(ident),
+        "name": ident.realname if ident is not None else "",
+        "callsign": rec.callsign,
+        "server": "FSD",
+        "latitude": float(rec.lat),
+        "longitude": float(rec.lon),
+        "altitude": int(rec.alt),
+        "groundspeed": int(rec.gs),
+        "transponder": str(rec.squawk),
+        "heading": int(rec.hdg_deg_round),
+        # Zeit des letzten Pakets (nicht "jetzt") – sonst ändert sich der Feed jede Sekunde
+        "last_updated": _iso_utc(rec.ts),
+        "pilot_rating": 0,
+        "military_rating": 0,
+        "flight_plan": plan.to_vatsim() if plan is not None else None,
+        "logon_time": _iso_utc(ident.ts) if ident is not None else None,
+    }
+
+
+def _vatsim_controller(atc: AtcPosition, ident: Optional[ClientAdd]) -> Dict[str, Any]:
+    return {
+        "cid": _cid_int(ident),
+        "name": ident.realname if ident is not None else "",
+        "callsign": atc.callsign,
+        "frequency": atc.frequency_str(),
+        "facility": int(atc.facility),
+        "rating": int(atc.rating),
+        "server": "FSD",
+        "visual_range": int(atc.visual_range),
+        "text_atis": [],
+        "last_updated": _iso_utc(atc.ts),
+    }
+
+# =============================================================================
+# Feed-Quellen (FSD_SERVERS)
+# =============================================================================
+def parse_servers(spec: str) -> List[tuple]:
+    """ "a=host:6809,host2:6809" -> [(name, host, port), ...]; leer -> []."""
+    servers = []
+    for item in spec.split(","):
+        item = item.strip()
+        if not item:
+            continue
+        name, sep, addr = item.partition("=")
+        if not sep:
+            name, addr = "", item
+        host, _, port = addr.strip().rpartition(":")
+        if not host or not port.isdigit():
+            raise ValueError(f"FSD_SERVERS: expected host:port, got {item!r}")
+        servers.append((name.strip() or f"{host}:{port}", host, int(port)))
+    return servers
+
+
+class FeedSource:
+    """Eine Verbindung zu einem FSD-Server: eigener Parser und eigener Verbindungsstatus."""
+
+    def __init__(self, index: int, name: str, host: str, port: int, callsign: str, parser: FeedParser):
+        self.index = index
+        self.name = name
+        self.host = host
+        self.port = port
+        self.callsign = callsign
+        self.parser = parser
+        self.connected = False
+        self.since: Optional[int] = None
+        self.last_rx_ts = 0
+        self.lines = 0
+
+    def status(self) -> Dict[str, Any]:
+        return {"name": self.name, "connected": self.connected, "since": self.since, "last_rx": self.last_rx_ts}
+
+
+class _FeedProtocol(asyncio.BufferedProtocol):
+    """
+    asyncio-Engine: Chunks gehen direkt aus dem Event-Loop in feed_chunk. recv_into
+    in einen festen Puffer – recv() des Transports legt sonst pro Chunk 256 KiB an.
+    """
+
+    def __init__(self, observer: "LiveObserver", source: FeedSource, login: List[str]):
+        self.observer = observer
+        self.source = source
+        self.login = login
+        self.framer = LineFramer(MAX_LINE_BYTES)
+        self.view = memoryview(bytearray(65536))
+        self.loop = asyncio.get_running_loop()
+        self.closed: asyncio.Future = self.loop.create_future()
+        self.transport: Optional[asyncio.Transport] = None
+        self._resume: Optional[asyncio.TimerHandle] = None
+
+    def connection_made(self, transport: asyncio.BaseTransport):
+        self.transport = transport
+        self.observer._feeds.add(self)
+        for line in self.login:
+            transport.write((line + "\r\n").encode("utf-8", errors="ignore"))
+            LOG_CONN.log(obslog.INFO, "sent", line=line)
+        # vor dem ersten data_received: Parser-Reset und Status für die neue Verbindung
+        self.observer._on_connected(self.source)
+
+    def get_buffer(self, sizehint: int) -> memoryview:
+        return self.view
+
+    def buffer_updated(self, nbytes: int):
+        # Ausnahmen hier schließen die Verbindung (connection_lost mit dem Fehler)
+        self.observer.feed_chunk(self.framer, bytes(self.view[:nbytes]), source=self.source)
+        # Lesen kurz pausieren: weitere Chunks sammeln sich im Kernel und kommen in einem recv
+        if READ_COALESCE > 0 and self._resume is None and not self.observer._push_due:
+            self.transport.pause_reading()
+            self._resume = self.loop.call_later(READ_COALESCE, self.resume)
+
+    def resume(self) -> bool:
+        """Pausiertes Lesen sofort fortsetzen; True, wenn gesammelte Daten anstehen können."""
+        if self._resume is None:
+            return False
+        self._resume.cancel()
+        self._resume = None
+        if self.transport.is_closing():
+            return False
+        self.transport.resume_reading()
+        return True
+
+    def connection_lost(self, exc: Optional[Exception]):
+        if self._resume is not None:
+            self._resume.cancel()
+            self._resume = None
+        self.observer._feeds.discard(self)
+        if not self.closed.done():
+            self.closed.set_result(exc or ConnectionError("socket closed by server"))
+
 
 # =============================================================================
 # Observer
 # =============================================================================
 class LiveObserver:
     def __init__(self):
-        self.clients: Dict[str, Dict[str, Any]] = {}
+        # Piloten (Positionen) mit Zeilenversion; Zugriff nur unter self.lock
+        self.traffic = TrafficTable()
+        # Zusatzinfos aus #AA/#AP, % und $FP (für fsd-data.json)
+        self.controllers: Dict[str, AtcPosition] = {}
+        self.identities: Dict[str, ClientAdd] = {}
+        self.flightplans: Dict[str, FlightPlan] = {}
         self.lock = threading.Lock()
+        # letzte Aktivität pro Callsign (Position, #AA/#AP, $FP) für TTL und MAX_CLIENTS
+        self.expiry = ExpiryWheel(CLIENT_TTL if CLIENT_TTL > 0 else 10 * 365 * 86400.0)
+        self.expired_total = 0
+        self.evicted_total = 0
+        # vorab encodierte fsd-data.json-Einträge (nur vom Writer-Thread benutzt)
+        self._pilot_frags = FragmentCache()
+        self._atc_frags = FragmentCache()
+        self.delta = DeltaEncoder(KEYFRAME_INTERVAL)
+        self.data_writer = FsdDataWriter(
+            FSD_DATA_JSON_PATH, self.build_vatsim_like_json, indent=FSD_DATA_JSON_INDENT,
+            gzip_sibling=FSD_DATA_JSON_GZIP, min_interval=FSD_DATA_JSON_INTERVAL,
+        )
+        self.push_channel: Optional[PushChannel] = None
+        if PUSH_TRANSPORT == "keepalive":
+            self.push_channel = PushChannel(PUSH_URL, PUSH_TOKEN, maxlen=PUSH_QUEUE_MAX,
+                                            on_failure=self._on_push_failure)
+        elif PUSH_TRANSPORT != "urllib":
+            raise ValueError("FSD_PUSH_TRANSPORT must be 'keepalive' or 'urllib'")
+        self.capture: Optional[CaptureWriter] = None
+        if CAPTURE_DIR:
+            self.capture = CaptureWriter(CAPTURE_DIR, segment_bytes=int(CAPTURE_SEGMENT_MB * 1024 * 1024),
+                                         segment_seconds=CAPTURE_SEGMENT_SEC, keep=CAPTURE_KEEP)
+        self.batch_ingest = BATCH_INGEST
+        # Positionen des aktuellen Chunks (nur Batch-Modus)
+        self._pending: List[PilotPosition] = []
+        # FSD-Server (FSD_SERVERS); bei mehreren gilt pro Pilot die Quelle mit der neuesten Position
+        self.sources: List[FeedSource] = []
+        self._multi = False
+        self._own_callsigns: set = set()
+        # callsign -> Index der Quelle, deren Position in der Tabelle steht
+        self._origin: Dict[str, int] = {}
+        self.duplicates_total = 0
+        # thread-Engine: ein recv-Thread pro Quelle, verarbeitet wird nacheinander
+        self._feed_lock = threading.Lock()
+        for name, host, port in parse_servers(FSD_SERVERS) or [(f"{FSD_HOST}:{FSD_PORT}", FSD_HOST, FSD_PORT)]:
+            self.add_source(name, host, port)
+        # Quelle des gerade verarbeiteten Chunks
+        self._source = self.sources[0]
+        self._record_handlers = {
+            PilotPosition: self._on_pilot_position,
+            AtcPosition: self._on_atc_position,
+            ClientAdd: self._on_client_add,
+            ClientRemove: self._on_client_remove,
+            FlightPlan: self._on_flight_plan,
+            TextMessage: self._on_text_message,
+        }
         self.last_push = 0.0
-        # BOT/FSD Connection Status
+        # BOT/FSD Connection Status (zusammengefasst: verbunden, solange eine Quelle verbunden ist)
         self.fsd_connected = False
         self.fsd_connected_since = None
-        self.last_fsd_rx_ts = 0
-
-    def update_client(self, obj: Dict[str, Any]):
+        # nur im asyncio-Modus gesetzt: weckt den Push-Task bei neuen Daten
+        self._push_event: Optional[asyncio.Event] = None
+        self._feeds: set = set()
+        self._push_due = False
+        self._register_metrics()
+
+    def _register_metrics(self):
+        # Werte, die ohnehin gezählt werden: erst beim Scrape gelesen
+        m = METRICS
+        m.gauge("fsd_observer_clients", "Pilots in the traffic table", fn=lambda: len(self.traffic))
+        m.gauge("fsd_observer_controllers", "Controllers seen on the feed", fn=lambda: len(self.controllers))
+        m.gauge("fsd_observer_connected", "1 while connected to at least one FSD server",
+                fn=lambda: int(self.fsd_connected))
+        m.counter("fsd_observer_parse_errors_total", "Unparseable lines",
+                  fn=lambda: sum(src.parser.errors for src in self.sources))
+        m.counter("fsd_observer_duplicates_total", "Positions dropped as duplicate or older than another server's",
+                  fn=lambda: self.duplicates_total)
+        m.counter("fsd_observer_expired_total", "Clients removed after FSD_CLIENT_TTL", fn=lambda: self.expired_total)
+        m.counter("fsd_observer_evicted_total", "Clients evicted at FSD_MAX_CLIENTS", fn=lambda: self.evicted_total)
+        m.counter("fsd_observer_pushes_total", "Push payloads built", fn=lambda: self.delta.seq)
+        m.counter("fsd_observer_data_json_writes_total", "fsd-data.json writes", fn=lambda: self.data_writer.writes)
+        if self.push_channel is not None:
+            channel = self.push_channel
+            m.counter("fsd_observer_push_dropped_total", "Payloads dropped from the full push queue",
+                      fn=lambda: channel.dropped)
+        if self.capture is not None:
+            capture = self.capture
+            m.counter("fsd_observer_capture_lines_total", "Lines written to the capture",
+                      fn=lambda: capture.lines)
+            m.counter("fsd_observer_capture_dropped_total", "Lines dropped from the full capture queue",
+                      fn=lambda: capture.dropped)
+
+    def add_source(self, name: str, host: str, port: int) -> FeedSource:
+        index = len(self.sources)
+        # gleicher Callsign auf zwei Servern desselben Mesh wäre eine Doppelanmeldung
+        callsign = FSD_CALLSIGN if index == 0 else f"{FSD_CALLSIGN}_{index + 1}"
+        src = FeedSource(index, name, host, port, callsign, FeedParser(decode=not self.batch_ingest))
+        self.sources.append(src)
+        self._multi = len(self.sources) > 1
+        self._own_callsigns.add(callsign)
+        METRICS.gauge("fsd_observer_source_connected", "1 while connected to this FSD server",
+                      labels={"source": name}, fn=lambda: int(src.connected))
+        METRICS.counter("fsd_observer_source_rx_lines_total", "Lines received from this FSD server",
+                        labels={"source": name}, fn=lambda: src.lines)
+        return src
+
+    def update_client(self, rec: PilotPosition, source: int = 0):
+        with self.lock:
+            if self._multi and not self._accept_locked(rec, source):
+                return
+            self.traffic.upsert(rec)
+            self._touch_locked(rec.callsign, rec.ts)
+        self._notify_update()
+
+    def update_clients(self, records: List[PilotPosition], source: int = 0):
+        """Mehrere Positionen mit einem Lock-Durchgang übernehmen."""
+        upsert = self.traffic.upsert
+        touch = self._touch_locked
+        accept = self._accept_locked if self._multi else None
+        with self.lock:
+            for rec in records:
+                if accept is not None and not accept(rec, source):
+                    continue
+                upsert(rec)
+                touch(rec.callsign, rec.ts)
+        self._notify_update()
+
+    def _accept_locked(self, rec: PilotPosition, source: int) -> bool:
+        """
+        Latest-timestamp-wins über mehrere Quellen. Eine andere Quelle als die
+        bisherige überschreibt nur mit neuerem Zeitstempel (Sekunden) – im Mesh
+        weitergereichte Duplikate und verspätete ältere Stände fallen so heraus.
+        Ist die bisherige Quelle getrennt, übernimmt die nächste sofort.
+        """
+        cs = rec.callsign
+        owner = self._origin.get(cs)
+        if owner is not None and owner != source and self.sources[owner].connected:
+            last = self.traffic.last_ts(cs)
+            if last is not None and rec.ts <= last:
+                self.duplicates_total += 1
+                return False
+        self._origin[cs] = source
+        return True
+
+    def remove_client(self, callsign: str) -> bool:
+        with self.lock:
+            removed = self.traffic.remove(callsign)
+            self._origin.pop(callsign, None)
+            self.identities.pop(callsign, None)
+            self.flightplans.pop(callsign, None)
+            if callsign not in self.controllers:
+                self.expiry.discard(callsign)
+        self._notify_update()
+        return removed
+
+    def _touch_locked(self, callsign: str, ts: int):
+        expiry = self.expiry
+        # Platz schaffen, bevor ein neuer Callsign dazukommt (sonst träfe es bei gleichem ts den neuen)
+        if MAX_CLIENTS > 0 and len(expiry) >= MAX_CLIENTS and callsign not in expiry:
+            self._evict_oldest_locked()
+        expiry.touch(callsign, ts)
+
+    def _drop_locked(self, callsign: str):
+        self.traffic.remove(callsign)
+        self._origin.pop(callsign, None)
+        self.controllers.pop(callsign, None)
+        self.identities.pop(callsign, None)
+        self.flightplans.pop(callsign, None)
+
+    def _evict_oldest_locked(self):
+        # in Blöcken (5 % des Limits), damit eine Flut nicht pro Callsign evictet
+        count = len(self.expiry) - MAX_CLIENTS + max(1, MAX_CLIENTS // 20)
+        evicted = self.expiry.evict_oldest(count)
+        for cs in evicted:
+            self._drop_locked(cs)
+        self.evicted_total += len(evicted)
+        LOG_CLIENTS.log(obslog.WARN, "client cap reached, evicted oldest", count=len(evicted),
+                        max_clients=MAX_CLIENTS, first=evicted[0] if evicted else "")
+
+    def expire_stale(self, now: float) -> List[str]:
+        """Entfernt Clients ohne Aktivität seit CLIENT_TTL; erscheinen im nächsten Push als "removed"."""
+        if CLIENT_TTL <= 0:
+            return []
         with self.lock:
-            self.clients[obj["callsign"]] = obj
+            expired = self.expiry.expire(now)
+            for cs in expired:
+                self._drop_locked(cs)
+        if expired:
+            self.expired_total += len(expired)
+            if LOG_CLIENTS.info:
+                LOG_CLIENTS.log(obslog.INFO, "expired inactive clients", count=len(expired),
+                                callsigns=",".join(expired[:10]), ttl=CLIENT_TTL)
+        return expired
+
+    def _notify_update(self):
+        if self._push_event is not None:
+            self._push_event.set()
 
     def snapshot(self) -> List[Dict[str, Any]]:
+        # Snapshot ist eine Kopie -> Umwandlung außerhalb des Locks
         with self.lock:
-            return list(self.clients.values())
+            snap = self.traffic.snapshot()
+        return snap.to_dicts()
+
+    def _build_push_payload(self, now: float) -> Dict[str, Any]:
+        self.expire_stale(now)
+        with self.lock:
+            snap = self.traffic.snapshot()
+        # Änderungserkennung über die Zeilenversionen; dicts nur für geänderte Clients
+        payload = self.delta.encode(snap.versions(), now, lambda cs, ver: snap.to_dict(cs))
+        payload["ts"] = int(now)
+        payload["bot"] = {
+            "connected": bool(self.fsd_connected),
+            "since": self.fsd_connected_since,
+            "sources": [src.status() for src in self.sources],
+        }
+        return payload
+
+    def push_once(self, now: Optional[float] = None):
+        if now is None:
+            now = time.time()
+        t0 = time.perf_counter()
+        payload = self._build_push_payload(now)
+        PUSH_BUILD_SECONDS.observe(time.perf_counter() - t0)
+        # Build + Schreiben im Writer-Thread; eine langsame Platte verzögert den Push nicht
+        self.data_writer.submit()
+
+        if self.push_channel is not None:
+            self.push_channel.submit(payload)
+        else:
+            t0 = time.perf_counter()
+            try:
+                http_post_json(PUSH_URL, PUSH_TOKEN, payload)
+            except urllib.error.HTTPError as e:
+                # 409 = Web-App hat eine Lücke erkannt und will einen Keyframe
+                self.delta.request_keyframe()
+                if e.code != 409:
+                    PUSH_FAILURES.inc()
+                    LOG_PUSH.log(obslog.WARN, "push failed", error=str(e))
+                else:
+                    PUSH_RESYNCS.inc()
+            except Exception as e:
+                # Zustand der Web-App unbekannt -> nächster Push als Keyframe
+                self.delta.request_keyframe()
+                PUSH_FAILURES.inc()
+                LOG_PUSH.log(obslog.WARN, "push failed", error=str(e))
+            else:
+                PUSH_SECONDS.observe(time.perf_counter() - t0)
+        self.last_push = now
+
+    def _on_push_failure(self, reason: Any):
+        # verworfen (None), 409 Resync oder Fehler: Web-App-Zustand unklar -> Keyframe
+        self.delta.request_keyframe()
+        if reason == 409:
+            PUSH_RESYNCS.inc()
+        if reason is None or reason == 409:
+            return
+        PUSH_FAILURES.inc()
+        LOG_PUSH.log(obslog.WARN, "push failed", error=str(reason))
 
     def push_loop(self):
         while True:
             now = time.time()
             if (now - self.last_push) >= PUSH_INTERVAL:
-                payload = {
-                    "clients": self.snapshot(),
-                    "ts": int(now),
-                    "bot": {
-                        "connected": bool(self.fsd_connected),
-                        "since": self.fsd_connected_since
-                    }
-                }
-                try:
-                    self.write_fsd_data_json()
-                except Exception as e:
-                    print(f"[observer] fsd-data.json write failed: {e}")
-
-                try:
-                    http_post_json(PUSH_URL, PUSH_TOKEN, payload)
-                except Exception as e:
-                    print(f"[observer] push failes: {e}")
-                self.last_push = now
+                self.push_once(now)
             time.sleep(0.05)
 
-    def _build_login_line(self) -> str:
+    def _build_login_line(self, callsign: str = FSD_CALLSIGN) -> str:
         # Priorität: explizite FSD_LOGIN_LINE (1:1 senden)
         if LOGIN_LINE:
             return LOGIN_LINE.rstrip("\r\n")
@@ -283,23 +775,17 @@ class LiveObserver:
         if FSD_LOGIN_MODE == "AA":
             # Erwartet mindestens 7 Felder nach dem Kommando:
             # #AA + callsign : <unused> : realname : cid : pwd : level : revision
-            return f"#AA{FSD_CALLSIGN}::{FSD_REALNAME}:{FSD_CID}:{FSD_PASSWORD}:{FSD_LEVEL}:{FSD_REVISION}"
+            return f"#AA{callsign}::{FSD_REALNAME}:{FSD_CID}:{FSD_PASSWORD}:{FSD_LEVEL}:{FSD_REVISION}"
 
         if FSD_LOGIN_MODE == "AP":
             # Erwartet mindestens 8 Felder:
             # #AP + callsign : <unused> : cid : pwd : level : revision : simtype : realname
-            return f"#AP{FSD_CALLSIGN}::{FSD_CID}:{FSD_PASSWORD}:{FSD_LEVEL}:{FSD_REVISION}:{FSD_SIMTYPE}:{FSD_REALNAME}"
+            return f"#AP{callsign}::{FSD_CID}:{FSD_PASSWORD}:{FSD_LEVEL}:{FSD_REVISION}:{FSD_SIMTYPE}:{FSD_REALNAME}"
 
         # Fallback: bewusst klarer Fehler
         raise ValueError("FSD_LOGIN_MODE must be 'AA' or 'AP' (or set FSD_LOGIN_LINE explicitly)")
 
-    def _send_login(self, sock: socket.socket):
-        line = self._build_login_line()
-        wire = (line + "\r\n").encode("utf-8", errors="ignore")
-        sock.sendall(wire)
-        print(f"[observer] sent login: {line}")
-
-    def _send_atc_position(self, sock: socket.socket):
+    def _build_atc_position_line(self, callsign: str = FSD_CALLSIGN) -> str:
         # Werte kannst du später via ENV konfigurierbar machen
         freq = 0            # egal für Observer
         facility = 0        # 0 = OBS/DEL (für Observer egal)
@@ -310,79 +796,222 @@ class LiveObserver:
         lon = 0.0
         alt = 0
 
-        line = f"%{FSD_CALLSIGN}:{freq}:{facility}:{visualrange}:{rating}:{lat:.5f}:{lon:.5f}:{alt}"
+        return f"%{callsign}:{freq}:{facility}:{visualrange}:{rating}:{lat:.5f}:{lon:.5f}:{alt}"
+
+    def _send_login(self, sock: socket.socket, callsign: str = FSD_CALLSIGN):
+        line = self._build_login_line(callsign)
+        wire = (line + "\r\n").encode("utf-8", errors="ignore")
+        sock.sendall(wire)
+        LOG_CONN.log(obslog.INFO, "sent login", line=line)
+
+    def _send_atc_position(self, sock: socket.socket, callsign: str = FSD_CALLSIGN):
+        line = self._build_atc_position_line(callsign)
         sock.sendall((line + "\r\n").encode("utf-8", errors="ignore"))
-        print(f"[observer] sent atcpos: {line}")
+        LOG_CONN.log(obslog.INFO, "sent atcpos", line=line)
+
+    # -------------------------------------------------------------------------
+    # Gemeinsame Feed-Verarbeitung (beide Engines)
+    # -------------------------------------------------------------------------
+    def _on_connected(self, source: Optional[FeedSource] = None):
+        source = source or self.sources[0]
+        LOG_CONN.log(obslog.INFO, "tcp connected, waiting for server feed", server=source.name)
+        CONNECTS.inc()
+        if self.capture is not None:
+            self.capture.mark_connect(source.index)
+        source.parser.reset()
+        source.connected = True
+        source.since = source.last_rx_ts = int(time.time())
+        self._refresh_connected()
+        self._notify_update()
+
+    def _log_disconnect(self, e: Exception, retry: float, source: Optional[FeedSource] = None):
+        LOG_CONN.log(obslog.WARN, "disconnected", server=(source or self.sources[0]).name, error=str(e),
+                     retry=round(retry, 1))
+        # Verbindungsfehler sind normal; alles andere ist ein Verarbeitungsfehler -> Rohzeilen sichern
+        if not isinstance(e, (OSError, asyncio.TimeoutError)):
+            RX_RING.dump_on_error(f"{type(e).__name__}: {e}")
+
+    def _on_disconnected(self, source: Optional[FeedSource] = None):
+        source = source or self.sources[0]
+        source.connected = False
+        source.since = None
+        # Positionen bleiben stehen: im Mesh liefern die übrigen Server weiter, sonst greift die TTL
+        self._refresh_connected()
+        self._notify_update()
+
+    def _refresh_connected(self):
+        connected = any(src.connected for src in self.sources)
+        if not connected:
+            self.fsd_connected_since = None
+        elif self.fsd_connected_since is None:
+            self.fsd_connected_since = int(time.time())
+        self.fsd_connected = connected
+
+    def feed_chunk(self, framer: LineFramer, chunk: bytes, ts: Optional[int] = None,
+                   source: Optional[FeedSource] = None):
+        """
+        Übergibt einen empfangenen Chunk an den Framer und verarbeitet alle vollständigen Zeilen.
+        `ts` nur für replay.py (Zeit des Mitschnitts), sonst die aktuelle Zeit; `source`
+        ist die Verbindung, von der der Chunk stammt (Default: erster Server).
+        """
+        t0 = time.perf_counter()
+        log_rx_chunk(chunk)
+
+        # ein Zeitstempel pro Chunk statt pro Paket
+        if ts is None:
+            ts = int(time.time())
+        if source is None:
+            source = self.sources[0]
+        self._source = source
+        parser = source.parser
+        errors = parser.errors
+        lines = framer.feed(chunk)
+        source.last_rx_ts = ts
+        source.lines += len(lines)
+        if self.capture is not None:
+            # nur Queue-append; geschrieben wird im Capture-Thread
+            self.capture.record(lines, source.index)
+        for raw_line in lines:
+            s = raw_line.decode("utf-8", errors="ignore").strip()
+            if s:
+                self.handle_line(s, ts)
+        if self._pending:
+            self._flush_pending()
+        if parser.errors != errors:
+            LOG_PARSE.log(obslog.WARN, "unparseable lines", count=parser.errors - errors,
+                          total=parser.errors, server=source.name)
+            RX_RING.dump_on_error("parse error")
+        # Metriken pro Chunk, nicht pro Zeile
+        RX_BYTES.inc(len(chunk))
+        RX_LINES.inc(len(lines))
+        CHUNK_SECONDS.observe(time.perf_counter() - t0)
+
+    def _flush_pending(self):
+        records = self._pending
+        self._pending = []
+        if len(records) >= BATCH_MIN:
+            pbhbatch.decode_records(records)
+        else:
+            for r in records:
+                r.decode()
+        self.update_clients(records, self._source.index)
+
+    def handle_line(self, s: str, ts: Optional[int] = None):
+        if ts is None:
+            ts = int(time.time())
+
+        RX_RING.append((ts, s))
+        if LOG_RX_LINE.debug:
+            LOG_RX_LINE.log(obslog.DEBUG, "RX line", line=s)
+
+        rec = self._source.parser.parse(s, ts)
+        if rec is None:
+            return
+        handler = self._record_handlers.get(type(rec))
+        if handler is not None:
+            handler(rec)
+
+    def _on_pilot_position(self, rec: PilotPosition):
+        if self.batch_ingest:
+            self._pending.append(rec)
+        else:
+            self.update_client(rec, self._source.index)
 
-    
-    
-    def run(self):
-        threading.Thread(target=self.push_loop, daemon=True).start()
+    def _on_atc_position(self, rec: AtcPosition):
+        # eigene Verbindungen zu den anderen Servern nicht als Lotsen führen
+        if self._multi and rec.callsign in self._own_callsigns:
+            return
+        with self.lock:
+            self.controllers[rec.callsign] = rec
+            self._touch_locked(rec.callsign, rec.ts)
 
+    def _on_client_add(self, rec: ClientAdd):
+        if self._multi and rec.callsign in self._own_callsigns:
+            return
+        with self.lock:
+            self.identities[rec.callsign] = rec
+            self._touch_locked(rec.callsign, rec.ts)
+
+    def _on_client_remove(self, rec: ClientRemove):
+        # Reihenfolge wahren: Positionen vor dem #DP zuerst übernehmen
+        if self._pending:
+            self._flush_pending()
+        if rec.kind == "ATC":
+            with self.lock:
+                self.controllers.pop(rec.callsign, None)
+                self.identities.pop(rec.callsign, None)
+                if rec.callsign not in self.traffic:
+                    self.expiry.discard(rec.callsign)
+            return
+        if self._multi:
+            # verspätetes #DP über einen anderen Server, der Pilot ist inzwischen wieder da
+            with self.lock:
+                last = self.traffic.last_ts(rec.callsign)
+            if last is not None and last > rec.ts:
+                self.duplicates_total += 1
+                return
+        was_present = self.remove_client(rec.callsign)
+        if LOG_CLIENTS.info:
+            LOG_CLIENTS.log(obslog.INFO, "pilot removed via #DP", callsign=rec.callsign,
+                            was_present=was_present)
+
+    def _on_flight_plan(self, rec: FlightPlan):
+        with self.lock:
+            self.flightplans[rec.callsign] = rec
+            self._touch_locked(rec.callsign, rec.ts)
+
+    def _on_text_message(self, rec: TextMessage):
+        if rec.sender.lower() == "server":
+            source = self._source
+            if not source.connected:
+                source.connected = True
+                source.since = int(time.time())
+                self._refresh_connected()
+
+    # -------------------------------------------------------------------------
+    # Engine "thread": blockierendes recv + Push-Thread mit Polling
+    # -------------------------------------------------------------------------
+    def run_threaded(self):
+        threading.Thread(target=self.push_loop, daemon=True).start()
+        for source in self.sources[1:]:
+            threading.Thread(target=self._feed_threaded, args=(source,), name=f"feed-{source.index}",
+                             daemon=True).start()
+        self._feed_threaded(self.sources[0])
+
+    def _feed_threaded(self, source: FeedSource):
+        # Verarbeitung aller Quellen nacheinander (gemeinsamer Parser-Zustand, _pending)
+        feed_lock = self._feed_lock
         backoff = 1
         while True:
             sock: Optional[socket.socket] = None
             try:
-                print(f"[observer] connecting to {FSD_HOST}:{FSD_PORT} ...")
-                sock = socket.create_connection((FSD_HOST, FSD_PORT), timeout=8)
+                LOG_CONN.log(obslog.INFO, "connecting", host=source.host, port=source.port)
+                sock = socket.create_connection((source.host, source.port), timeout=8)
 
                 # dauerhaft verbunden bleiben: recv blockiert unbegrenzt
                 sock.settimeout(None)
 
-                self._send_login(sock)
-                self._send_atc_position(sock)
-                print("[observer] tcp connected, waiting for server feed...")
-                self.fsd_connected = True
-                if self.fsd_connected_since is None:
-                    self.fsd_connected_since = int(time.time())
-                self.last_fsd_rx_ts = int(time.time())
+                self._send_login(sock, source.callsign)
+                self._send_atc_position(sock, source.callsign)
+                with feed_lock:
+                    self._on_connected(source)
                 # nach erfolgreichem Connect Backoff zurücksetzen
                 backoff = 1
 
-                buf = b""
+                framer = LineFramer(MAX_LINE_BYTES)
                 while True:
                     chunk = sock.recv(4096)
                     if not chunk:
                         raise ConnectionError("socket closed by server")
-
-                    log_rx_chunk(chunk)
-
-                    buf += chunk
-                    buf = buf.replace(b"\r\n", b"\n").replace(b"\r", b"\n")
-
-                    while b"\n" in buf:
-                        raw_line, buf = buf.split(b"\n", 1)
-                        s = raw_line.decode("utf-8", errors="ignore").strip()
-                        if not s:
-                            continue
-                        if s.startswith("#TMServer:"):
-                            if not self.fsd_connected:
-                                self.fsd_connected = True
-                                self.fsd_connected_since = int(time.time())
-                                self.last_fsd_rx_ts = int(time.time())
-
-                        print(f"[observer] RX line: {s}")
-
-                        # --- Pilot Disconnect ---
-                        if s.startswith("#DP"):
-                            callsign = s[3:].split(":", 1)[0].strip()
-                            with self.lock:
-                                removed = self.clients.pop(callsign, None)
-                            print(f"[observer] pilot removed via #DP: {callsign} (was_present={removed is not None})")
-                            continue
-
-                        # --- Pilot Position ---
-                        if s.startswith("@"):
-                            obj = parse_position_line(s)
-                            if obj:
-                                self.update_client(obj)
+                    with feed_lock:
+                        self.feed_chunk(framer, chunk, source=source)
 
             except Exception as e:
-                self.fsd_connected = False
-                self.fsd_connected_since = None
-                print(f"[observer] disconnected: {e}. retry in {backoff}s")
+                with feed_lock:
+                    self._on_disconnected(source)
+                self._log_disconnect(e, backoff, source)
                 time.sleep(backoff)
-                backoff = min(backoff * 2, 30)
+                backoff = min(backoff * 2, RECONNECT_MAX_BACKOFF)
 
             finally:
                 try:
@@ -391,56 +1020,134 @@ class LiveObserver:
                 except Exception:
                     pass
 
+    # -------------------------------------------------------------------------
+    # Engine "asyncio": Protocol-Callbacks + ereignisgesteuerter Push
+    # -------------------------------------------------------------------------
+    async def _async_feed(self, source: FeedSource):
+        loop = asyncio.get_running_loop()
+        backoff = 1.0
+        while True:
+            transport: Optional[asyncio.BaseTransport] = None
+            try:
+                LOG_CONN.log(obslog.INFO, "connecting", host=source.host, port=source.port)
+                login = [self._build_login_line(source.callsign), self._build_atc_position_line(source.callsign)]
+                transport, protocol = await asyncio.wait_for(
+                    loop.create_connection(lambda: _FeedProtocol(self, source, login), source.host, source.port),
+                    timeout=8,
+                )
+                backoff = 1.0
+                raise await protocol.closed
+
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self._on_disconnected(source)
+                # Jitter, damit mehrere Observer nicht synchron reconnecten
+                delay = backoff * (0.8 + 0.4 * random.random())
+                self._log_disconnect(e, delay, source)
+                await asyncio.sleep(delay)
+                backoff = min(backoff * 2, RECONNECT_MAX_BACKOFF)
+
+            finally:
+                if transport is not None:
+                    transport.close()
+
+    async def _async_push_loop(self, executor: Optional[concurrent.futures.Executor]):
+        loop = asyncio.get_running_loop()
+        event = self._push_event
+        while True:
+            # Coalescing: höchstens ein Push pro PUSH_INTERVAL; ohne neue Daten Heartbeat (Bot-Status)
+            wait = self.last_push + PUSH_INTERVAL - time.time()
+            if wait > 0:
+                await asyncio.sleep(wait)
+
+            if event.is_set():
+                # fällig und Daten offen: gesammelte Chunks sofort lesen, auf den nächsten warten und
+                # direkt danach pushen – der Push enthält dann die gerade empfangenen Zeilen
+                self._push_due = True
+                # gesammelte Chunks zuerst (liegen schon im Kernel), dann ein frischer
+                rounds = 2 if sum([feed.resume() for feed in list(self._feeds)]) else 1
+                for _ in range(rounds):
+                    event.clear()
+                    try:
+                        await asyncio.wait_for(event.wait(), timeout=PUSH_SETTLE)
+                    except asyncio.TimeoutError:
+                        break
+                self._push_due = False
+            event.clear()
+
+            if executor is None:
+                # keepalive: Senden und Datei-I/O laufen ohnehin in eigenen Threads, nur Build hier
+                self.push_once(time.time())
+            else:
+                # urllib blockiert -> eigener Worker, Feed läuft weiter
+                await loop.run_in_executor(executor, self.push_once, time.time())
+
+    async def run_async(self):
+        self._push_event = asyncio.Event()
+        if self.push_channel is not None:
+            await asyncio.gather(*(self._async_feed(src) for src in self.sources), self._async_push_loop(None))
+            return
+        with concurrent.futures.ThreadPoolExecutor(max_workers=1, thread_name_prefix="push") as executor:
+            await asyncio.gather(*(self._async_feed(src) for src in self.sources),
+                                 self._async_push_loop(executor))
+
+    def run(self):
+        # kill -USR1 <pid> -> letzte Rohzeilen nach logs/observer-rx-*.log
+        obslog.install_dump_signal(RX_RING)
+        if METRICS_PORT:
+            try:
+                metrics.serve(METRICS, METRICS_HOST, METRICS_PORT)
+                LOG_CONN.log(obslog.INFO, "metrics listening", host=METRICS_HOST, port=METRICS_PORT)
+            except OSError as e:
+                # belegter Port darf den Observer nicht aufhalten
+                LOG_CONN.log(obslog.WARN, "metrics port unavailable", port=METRICS_PORT, error=str(e))
+        self.data_writer.start()
+        if self.push_channel is not None:
+            self.push_channel.start()
+        if self.capture is not None:
+            self.capture.start()
+            LOG_CONN.log(obslog.INFO, "capturing raw feed", dir=CAPTURE_DIR)
+        if OBSERVER_ENGINE == "thread":
+            self.run_threaded()
+        elif OBSERVER_ENGINE == "asyncio":
+            asyncio.run(self.run_async())
+        else:
+            raise ValueError("FSD_OBSERVER_ENGINE must be 'asyncio' or 'thread'")
+
     def build_vatsim_like_json(self) -> Dict[str, Any]:
+        """
+        fsd-data.json aus den Records; Einträge kommen aus den Fragment-Caches und
+        werden nur neu encodiert, wenn sich Position, #AA/#AP oder $FP geändert haben.
+        """
         now = datetime.now(timezone.utc)
-        clients = self.snapshot()
+        with self.lock:
+            snap = self.traffic.snapshot()
+            identities = dict(self.identities)
+            flightplans = dict(self.flightplans)
+            atc = dict(self.controllers)
 
+        pilot_frags = self._pilot_frags
         pilots = []
+        versions = snap.versions()
+        for cs, ver in versions.items():
+            ident = identities.get(cs)
+            plan = flightplans.get(cs)
+            key = (ver, ident, plan)
+            pilots.append(pilot_frags.lookup(cs, key)
+                          or pilot_frags.put(cs, key, _vatsim_pilot(snap.record(cs), ident, plan)))
+        pilot_frags.retain(versions)
+
+        atc_frags = self._atc_frags
         controllers = []
-
-        for c in clients:
-            item = {
-                "cid": int(c.get("cid", 0)) if str(c.get("cid", "")).isdigit() else None,
-                "name": c.get("realname", ""),
-                "callsign": c.get("callsign", ""),
-                "server": "FSD",
-                "latitude": float(c.get("lat", 0.0)),
-                "longitude": float(c.get("lon", 0.0)),
-                "altitude": int(c.get("alt", 0)),
-                "groundspeed": int(c.get("gs", 0)),
-                "transponder": str(c.get("squawk", "")),
-                "heading": int(c.get("hdg_deg_round", 0)),
-                "last_updated": now.isoformat().replace("+00:00", "Z"),
-            }
-
-            ctype = str(c.get("client_type", c.get("type", ""))).upper()
-
-            if ctype == "ATC":
-                controllers.append({
-                    "cid": item["cid"],
-                    "name": item["name"],
-                    "callsign": item["callsign"],
-                    "frequency": c.get("frequency", "199.998"),
-                    "facility": int(c.get("facility", 0)),
-                    "rating": int(c.get("rating", 0)),
-                    "server": "FSD",
-                    "visual_range": int(c.get("visual_range", 0)),
-                    "text_atis": [],
-                    "last_updated": item["last_updated"],
-                })
-            else:
-                pilots.append({
-                    **item,
-                    "pilot_rating": 0,
-                    "military_rating": 0,
-                    "flight_plan": None,
-                    "logon_time": c.get("logon_time"),
-                })
+        for cs, a in atc.items():
+            ident = identities.get(cs)
+            controllers.append(atc_frags.get(cs, (a, ident), _vatsim_controller, a, ident))
+        atc_frags.retain(atc)
 
         unique_users = {
-            str(c.get("cid") or c.get("callsign"))
-            for c in clients
-            if c.get("cid") or c.get("callsign")
+            str((identities[cs].cid if cs in identities else "") or cs)
+            for cs in (*versions, *atc)
         }
 
         return {
@@ -449,7 +1156,7 @@ class LiveObserver:
                 "reload": 1,
                 "update": now.strftime("%Y%m%d%H%M%S"),
                 "update_timestamp": now.isoformat().replace("+00:00", "Z"),
-                "connected_clients": len(clients),
+                "connected_clients": len(versions) + len(atc),
                 "unique_users": len(unique_users),
             },
             "pilots": pilots,
@@ -457,14 +1164,15 @@ class LiveObserver:
             "atis": [],
             "servers": [
                 {
-                    "ident": "FSD",
-                    "hostname_or_ip": FSD_HOST,
+                    "ident": "FSD" if src.index == 0 else f"FSD{src.index + 1}",
+                    "hostname_or_ip": src.host,
                     "location": "local",
-                    "name": "FSD Server",
+                    "name": "FSD Server" if not self._multi else f"FSD Server {src.name}",
                     "clients_connection_allowed": 1,
                     "client_connections_allowed": True,
                     "is_sweatbox": False,
                 }
+                for src in self.sources
             ],
             "prefiles": [],
             "facilities": [],
@@ -473,16 +1181,9 @@ class LiveObserver:
         }
 
 
-    def write_fsd_data_json(self):
-        payload = self.build_vatsim_like_json()
-        tmp = FSD_DATA_JSON_PATH.with_suffix(".json.tmp")
-
-        FSD_DATA_JSON_PATH.parent.mkdir(parents=True, exist_ok=True)
-
-        with open(tmp, "w", encoding="utf-8") as f:
-            json.dump(payload, f, ensure_ascii=False, indent=2)
-
-        os.replace(tmp, FSD_DATA_JSON_PATH)
+    def write_fsd_data_json(self) -> bool:
+        """Synchron schreiben (ohne Worker); False, wenn sich nichts geändert hat."""
+        return self.data_writer.write_if_changed(self.build_vatsim_like_json())
 
 
 if __name__ == "__main__":
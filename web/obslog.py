@@ -0,0 +1,243 @@
+"""
+Strukturiertes Logging für den Observer.
+
+- Kategorien (z.B. "rx.line", "push") mit eigenem Level, konfiguriert über
+  FSD_LOG="info,rx=off,rx.line=debug" (Default-Level + Präfix-Regeln,
+  die spezifischste Regel gewinnt).
+- Pro Kategorie Token-Bucket (FSD_LOG_RATE Meldungen/s, Burst FSD_LOG_BURST)
+  und 1-aus-N-Sampling (FSD_LOG_SAMPLE="rx.line=100").
+- Ringpuffer der letzten N Rohzeilen (FSD_RX_RING), Dump per SIGUSR1 oder bei Fehlern.
+
+Formatiert wird erst, nachdem Level, Sampling und Rate-Limit passiert sind.
+Für heiße Pfade zusätzlich vorher das Flag prüfen, dann kostet eine
+abgeschaltete Kategorie nur einen Attributzugriff:
+
+    if RX_LINE.debug:
+        RX_LINE.log(DEBUG, "RX line", line=s)
+"""
+import collections
+import os
+import sys
+import threading
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Deque, Dict, Optional, Tuple
+
+DEBUG = 10
+INFO = 20
+WARN = 30
+ERROR = 40
+OFF = 100
+
+LEVEL_NAMES = {"debug": DEBUG, "info": INFO, "warn": WARN, "warning": WARN, "error": ERROR, "off": OFF}
+_LABELS = {DEBUG: "DEBUG", INFO: "INFO", WARN: "WARN", ERROR: "ERROR"}
+
+PREFIX = "[observer]"
+
+
+def _truthy(v: str) -> bool:
+    return v.strip() not in ("0", "false", "False", "")
+
+
+def parse_rules(spec: str, cast=str) -> Tuple[Optional[Any], Dict[str, Any]]:
+    """"info,rx=off" -> (Default, {"rx": "off"})."""
+    default = None
+    rules: Dict[str, Any] = {}
+    for part in spec.split(","):
+        part = part.strip()
+        if not part:
+            continue
+        if "=" in part:
+            name, value = part.split("=", 1)
+            rules[name.strip()] = cast(value.strip())
+        else:
+            default = cast(part)
+    return default, rules
+
+
+def _match(name: str, rules: Dict[str, Any]) -> Optional[Any]:
+    # "rx.line" -> "rx.line", dann "rx"
+    while True:
+        if name in rules:
+            return rules[name]
+        if "." not in name:
+            return None
+        name = name.rsplit(".", 1)[0]
+
+
+class TokenBucket:
+    __slots__ = ("rate", "burst", "tokens", "stamp")
+
+    def __init__(self, rate: float, burst: float):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self.stamp = time.monotonic()
+
+    def take(self) -> bool:
+        if self.rate <= 0:
+            return True
+        now = time.monotonic()
+        self.tokens = min(self.burst, self.tokens + (now - self.stamp) * self.rate)
+        self.stamp = now
+        if self.tokens >= 1.0:
+            self.tokens -= 1.0
+            return True
+        return False
+
+
+class Category:
+    """Eine Log-Kategorie. debug/info/warn/error sind fertig berechnete Flags."""
+
+    __slots__ = ("name", "level", "sample", "bucket", "suppressed", "_count",
+                 "debug", "info", "warn", "error")
+
+    def __init__(self, name: str, level: int, sample: int, rate: float, burst: float):
+        self.name = name
+        self.sample = max(1, sample)
+        self.bucket = TokenBucket(rate, burst)
+        self.suppressed = 0
+        self._count = 0
+        self.set_level(level)
+
+    def set_level(self, level: int):
+        self.level = level
+        self.debug = level <= DEBUG
+        self.info = level <= INFO
+        self.warn = level <= WARN
+        self.error = level <= ERROR
+
+    def log(self, level: int, msg: str, *args, **fields):
+        if level < self.level:
+            return
+        # Sampling gilt nur für DEBUG/INFO; Warnungen und Fehler nie ausdünnen
+        if level < WARN and self.sample > 1:
+            self._count += 1
+            if self._count % self.sample:
+                return
+        if not self.bucket.take():
+            self.suppressed += 1
+            return
+        if args:
+            msg = msg % args
+        if self.suppressed:
+            fields["suppressed"] = self.suppressed
+            self.suppressed = 0
+        _emit(level, self.name, msg, fields)
+
+
+def _format_value(v: Any) -> str:
+    s = v if isinstance(v, str) else repr(v)
+    if not s or " " in s or '"' in s or "=" in s:
+        return '"' + s.replace("\\", "\\\\").replace('"', '\\"') + '"'
+    return s
+
+
+def _emit(level: int, name: str, msg: str, fields: Dict[str, Any]):
+    ts = datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%S.%f")[:-3] + "Z"
+    line = f"{PREFIX} {ts} {_LABELS.get(level, level)} {name}: {msg}"
+    if fields:
+        line += " " + " ".join(f"{k}={_format_value(v)}" for k, v in fields.items())
+    print(line, file=sys.stderr if level >= ERROR else sys.stdout)
+
+
+# =============================================================================
+# Konfiguration (ENV)
+# =============================================================================
+_default_level, _level_rules = parse_rules(os.environ.get("FSD_LOG", "info"),
+                                           lambda v: LEVEL_NAMES.get(v.lower(), INFO))
+DEFAULT_LEVEL = _default_level if _default_level is not None else INFO
+# altes Flag: FSD_DEBUG_RX=1 schaltet den RX-Mitschnitt ein
+if _truthy(os.environ.get("FSD_DEBUG_RX", "0")):
+    _level_rules.setdefault("rx", DEBUG)
+
+_, _sample_rules = parse_rules(os.environ.get("FSD_LOG_SAMPLE", ""), int)
+LOG_RATE = float(os.environ.get("FSD_LOG_RATE", "50"))
+LOG_BURST = float(os.environ.get("FSD_LOG_BURST", str(max(1.0, LOG_RATE * 2))))
+
+RX_RING_SIZE = int(os.environ.get("FSD_RX_RING", "2000"))
+# Dumps bei Fehlern höchstens so oft (Sekunden)
+RX_DUMP_MIN_INTERVAL = float(os.environ.get("FSD_RX_DUMP_INTERVAL", "60"))
+RX_DUMP_DIR = Path(os.environ.get("FSD_RX_DUMP_DIR",
+                                  str(Path(__file__).resolve().parent.parent / "logs")))
+
+_categories: Dict[str, Category] = {}
+_lock = threading.Lock()
+
+
+def get(name: str) -> Category:
+    with _lock:
+        cat = _categories.get(name)
+        if cat is None:
+            level = _match(name, _level_rules)
+            sample = _match(name, _sample_rules)
+            cat = Category(name, DEFAULT_LEVEL if level is None else level,
+                           sample or 1, LOG_RATE, LOG_BURST)
+            _categories[name] = cat
+        return cat
+
+
+def set_level(name: str, level: int):
+    """Level zur Laufzeit ändern (wirkt auf name und alle Unterkategorien)."""
+    _level_rules[name] = level
+    with _lock:
+        for cat in _categories.values():
+            lvl = _match(cat.name, _level_rules)
+            cat.set_level(DEFAULT_LEVEL if lvl is None else lvl)
+
+
+# =============================================================================
+# Ringpuffer der Rohzeilen
+# =============================================================================
+class RawRing:
+    """Letzte N Rohzeilen als (ts, line); append() ist ein einzelnes deque.append."""
+
+    def __init__(self, size: int, dump_dir: Path, min_interval: float = 60.0):
+        self.lines: Deque[Tuple[int, str]] = collections.deque(maxlen=max(1, size))
+        self.enabled = size > 0
+        self.dump_dir = Path(dump_dir)
+        self.min_interval = min_interval
+        self._last_error_dump = 0.0
+        self.append = self.lines.append if self.enabled else (lambda item: None)
+
+    def dump(self, reason: str) -> Optional[Path]:
+        """Schreibt den Puffer nach <dump_dir>/observer-rx-<zeit>.log."""
+        lines = list(self.lines)
+        stamp = datetime.now(timezone.utc).strftime("%Y%m%d-%H%M%S-%f")[:-3]
+        path = self.dump_dir / f"observer-rx-{stamp}.log"
+        try:
+            self.dump_dir.mkdir(parents=True, exist_ok=True)
+            with open(path, "w", encoding="utf-8") as f:
+                f.write(f"# reason: {reason}\n# lines: {len(lines)}\n")
+                for ts, line in lines:
+                    f.write(f"{ts} {line}\n")
+        except OSError as e:
+            _emit(ERROR, "rx.ring", "dump failed", {"error": str(e)})
+            return None
+        _emit(INFO, "rx.ring", "dumped", {"reason": reason, "lines": len(lines), "path": str(path)})
+        return path
+
+    def dump_on_error(self, reason: str) -> Optional[Path]:
+        """Wie dump(), aber höchstens alle min_interval Sekunden (Fehlerstürme)."""
+        if not self.enabled or not self.lines:
+            return None
+        now = time.monotonic()
+        if now - self._last_error_dump < self.min_interval:
+            return None
+        self._last_error_dump = now
+        return self.dump(reason)
+
+
+RX_RING = RawRing(RX_RING_SIZE, RX_DUMP_DIR, RX_DUMP_MIN_INTERVAL)
+
+
+def install_dump_signal(ring: RawRing = RX_RING) -> bool:
+    """SIGUSR1 -> Ringpuffer dumpen. Nur im Hauptthread und wo es SIGUSR1 gibt."""
+    import signal
+    if not hasattr(signal, "SIGUSR1") or threading.current_thread() is not threading.main_thread():
+        return False
+    # Dump in eigenem Thread: im Handler selbst wäre print() reentrant zum unterbrochenen Code
+    signal.signal(signal.SIGUSR1, lambda signum, frame: threading.Thread(
+        target=ring.dump, args=("SIGUSR1",), name="rx-dump", daemon=True).start())
+    return True
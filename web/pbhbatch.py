@@ -0,0 +1,55 @@
+"""
+Gebündelte PBH-Dekodierung mit NumPy (optional, FSD_BATCH_INGEST=1).
+
+Alle Pilotpositionen eines Empfangs-Bursts werden roh geparst (FeedParser mit
+decode=False) und hier in einem Schritt dekodiert: Bit-Unpacking, 10-Bit-
+Vorzeichenerweiterung und Grad-Umrechnung laufen als Array-Operationen.
+Die Ergebnisse sind identisch mit observer.unpack_pbh (gleiche IEEE-Formeln,
+Runden jeweils half-even).
+"""
+from typing import List, Tuple
+
+import numpy as np
+
+from fsdparse import PITCH_MULT, BANK_MULT, HDG_MULT, PilotPosition
+
+
+def _sign_extend_10bit(x: np.ndarray) -> np.ndarray:
+    # x - 0x400, falls Bit 9 gesetzt
+    return x - ((x & 0x200) << 1)
+
+
+def decode_pbh_array(words: np.ndarray) -> Tuple[np.ndarray, ...]:
+    """
+    words: uint32-Array mit PBH-Worten.
+    -> (hdg_deg (2 Stellen), hdg_deg_round, pitch_deg, bank_deg, on_ground)
+    """
+    w = words.astype(np.int64, copy=False)
+    hdg_raw = (w >> 2) & 0x3FF
+    bank_raw = _sign_extend_10bit((w >> 12) & 0x3FF)
+    pitch_raw = _sign_extend_10bit((w >> 22) & 0x3FF)
+
+    heading = hdg_raw / HDG_MULT
+    hdg_deg = np.round(heading, 2)
+    hdg_round = np.rint(heading).astype(np.int64) % 360
+    pitch_deg = np.floor(pitch_raw / -PITCH_MULT).astype(np.int64)
+    bank_deg = np.floor(bank_raw / -BANK_MULT).astype(np.int64)
+    on_ground = (w & 0x2) != 0
+    return hdg_deg, hdg_round, pitch_deg, bank_deg, on_ground
+
+
+def decode_records(records: List[PilotPosition]):
+    """Dekodiert die PBH-Felder aller Records in einem Durchgang (in place)."""
+    n = len(records)
+    if not n:
+        return
+    words = np.fromiter((r.pbh_u32 for r in records), dtype=np.uint32, count=n)
+    hdg_deg, hdg_round, pitch, bank, ground = decode_pbh_array(words)
+    # tolist() liefert Python-float/int/bool -> JSON-Ausgabe wie im Skalar-Pfad
+    for r, h, hr, p, b, g in zip(records, hdg_deg.tolist(), hdg_round.tolist(),
+                                 pitch.tolist(), bank.tolist(), ground.tolist()):
+        r.hdg_deg = h
+        r.hdg_deg_round = hr
+        r.pitch_deg = p
+        r.bank_deg = b
+        r.on_ground = g
@@ -0,0 +1,86 @@
+"""
+Verfolgt den FSD-Prozess, ohne jede Sekunde alle Prozesse des Hosts zu scannen.
+
+Der Prozess wird einmal per process_iter() gesucht; danach genügt
+Process.is_running() (vergleicht PID und create_time, erkennt also auch eine
+wiederverwendete PID). Erst wenn der Prozess weg ist, wird wieder gescannt –
+höchstens alle `scan_interval` Sekunden, solange er nicht gefunden wird.
+"""
+import os
+import threading
+import time
+from typing import Any, Dict, Optional
+
+import psutil
+
+
+class ProcessTracker:
+    def __init__(self, exe_path: str, scan_interval: float = 5.0):
+        self.target = os.path.realpath(str(exe_path))
+        self.scan_interval = scan_interval
+        self.scans = 0
+        self._proc: Optional[psutil.Process] = None
+        self._last_scan = float("-inf")
+        self._lock = threading.Lock()
+
+    def _matches(self, proc: psutil.Process) -> bool:
+        exe = proc.info.get("exe")
+        cmd = proc.info.get("cmdline")
+        # 1) sauberster Fall: exe-Pfad stimmt exakt
+        if exe and os.path.realpath(exe) == self.target:
+            return True
+        # 2) Fallback: erstes cmdline-Argument ist das Binary
+        return bool(cmd) and os.path.realpath(cmd[0]) == self.target
+
+    def _scan(self) -> Optional[psutil.Process]:
+        self.scans += 1
+        for proc in psutil.process_iter(["pid", "exe", "cmdline"]):
+            try:
+                if self._matches(proc):
+                    # erster cpu_percent()-Aufruf liefert 0.0 und startet die Messung
+                    proc.cpu_percent(interval=None)
+                    return proc
+            except (psutil.NoSuchProcess, psutil.AccessDenied):
+                continue
+            except Exception:
+                continue
+        return None
+
+    def get(self) -> Optional[psutil.Process]:
+        with self._lock:
+            proc = self._proc
+            if proc is not None:
+                try:
+                    if proc.is_running():
+                        return proc
+                except psutil.Error:
+                    pass
+                self._proc = None
+                # Prozess gerade verschwunden -> sofort neu suchen (Neustart)
+                self._last_scan = float("-inf")
+
+            now = time.monotonic()
+            if now - self._last_scan < self.scan_interval:
+                return None
+            self._last_scan = now
+            self._proc = self._scan()
+            return self._proc
+
+    def sample(self) -> Optional[Dict[str, Any]]:
+        """PID, Uptime, CPU (seit dem letzten Aufruf) und RSS des FSD-Prozesses; None, wenn er nicht läuft."""
+        proc = self.get()
+        if proc is None:
+            return None
+        try:
+            with proc.oneshot():
+                return {
+                    "pid": proc.pid,
+                    "uptime_sec": int(time.time() - proc.create_time()),
+                    "cpu_percent": proc.cpu_percent(interval=None),
+                    "rss_mb": round(proc.memory_info().rss / (1024 * 1024), 1),
+                }
+        except psutil.NoSuchProcess:
+            with self._lock:
+                self._proc = None
+                self._last_scan = float("-inf")
+            return None
@@ -0,0 +1,203 @@
+#!/usr/bin/env python3
+"""
+Spielt einen Mitschnitt (FSD_CAPTURE_DIR, siehe capture.py) wieder ab.
+
+    python replay.py /var/lib/fsd/capture --speed 10
+    python replay.py capture-...-0001.fsdcap.gz --speed max --no-push
+    python replay.py /var/lib/fsd/capture --mode socket --port 6809 --speed 1
+
+--mode inprocess (Default): eigener LiveObserver; Chunks gehen direkt in
+feed_chunk, Pushes nach FSD_PUSH_URL und fsd-data.json wie im Observer (mit
+--no-push werden die Payloads nur gebaut) im Takt FSD_PUSH_INTERVAL der
+Mitschnitt-Zeit. Zeitstempel der Records sind die des Mitschnitts, TTL und
+Delta-Keyframes verhalten sich also wie im Original, auch bei --speed max.
+
+--mode socket: lokaler FSD-Ersatz; ein echter observer.py (FSD_HOST/FSD_PORT)
+meldet sich an und bekommt die Zeilen über TCP, wie vom Server.
+
+Mitschnitte mehrerer Server (FSD_SERVERS) laufen in-process wieder über
+getrennte Quellen; im Socket-Modus gibt es nur eine Verbindung, dort mit
+--source einen Server auswählen.
+
+Lücken zwischen den Records (Observer-Neustart, Segmente aus verschiedenen
+Läufen) werden auf --max-gap Sekunden gekürzt.
+"""
+import argparse
+import socket
+import sys
+import time
+from typing import Iterable, Iterator, List, Optional, Tuple
+
+import capture
+import observer
+from framer import LineFramer
+
+# (Sekunden seit Beginn, "chunk" | "connect", Zeilen, Quelle)
+Step = Tuple[float, str, List[bytes], int]
+
+
+def timeline(records: Iterable[capture.Record], max_gap: float = 5.0) -> Iterator[Step]:
+    """Records -> Schritte auf einer durchgehenden Zeitachse; Zeilen eines Chunks zusammengefasst."""
+    max_gap_ns = int(max_gap * 1e9)
+    offset = None
+    last = None
+    pending: List[bytes] = []
+    pending_ts = pending_src = None
+    for ts, kind, data, source in records:
+        if kind == "start":
+            continue
+        if pending and (kind != "line" or ts != pending_ts or source != pending_src):
+            yield (pending_ts - offset) / 1e9, "chunk", pending, pending_src
+            pending = []
+        if last is None:
+            offset = ts
+        elif ts - last > max_gap_ns or ts < last:
+            # Pause (oder anderer Lauf) -> nach max_gap weiter
+            offset += ts - last - max_gap_ns
+        last = ts
+        if kind == "connect":
+            yield (ts - offset) / 1e9, "connect", [], source
+        elif kind == "line":
+            pending_ts, pending_src = ts, source
+            pending.append(data)
+    if pending:
+        yield (pending_ts - offset) / 1e9, "chunk", pending, pending_src
+
+
+class Pacer:
+    """Wartet bis zur Abspielzeit eines Schritts; speed=None = so schnell wie möglich."""
+
+    def __init__(self, speed: Optional[float]):
+        self.speed = speed
+        self.t0 = time.monotonic()
+        self.late = 0.0
+
+    def wait(self, t: float):
+        if self.speed is None:
+            return
+        delay = self.t0 + t / self.speed - time.monotonic()
+        if delay > 0:
+            time.sleep(delay)
+        else:
+            self.late = max(self.late, -delay)
+
+
+def replay_inprocess(steps: Iterable[Step], speed: Optional[float], push: bool = True) -> dict:
+    obs = observer.LiveObserver()
+    if push:
+        obs.data_writer.start()
+        if obs.push_channel is not None:
+            obs.push_channel.start()
+    pacer = Pacer(speed)
+    wall0 = time.time()
+    framers = {}
+    lines = chunks = pushes = 0
+    t = 0.0
+    for t, kind, data, index in steps:
+        pacer.wait(t)
+        now = wall0 + t
+        # Quellen des Mitschnitts, die FSD_SERVERS nicht kennt, kommen dazu
+        while index >= len(obs.sources):
+            obs.add_source(f"capture-{len(obs.sources)}", "capture", 0)
+        source = obs.sources[index]
+        if kind == "connect" or index not in framers:
+            framers[index] = LineFramer(observer.MAX_LINE_BYTES)
+            obs._on_connected(source)
+        if kind == "connect":
+            continue
+        obs.feed_chunk(framers[index], b"\r\n".join(data) + b"\r\n", int(now), source)
+        lines += len(data)
+        chunks += 1
+        if now - obs.last_push >= observer.PUSH_INTERVAL:
+            if push:
+                obs.push_once(now)
+            else:
+                obs._build_push_payload(now)
+                obs.last_push = now
+            pushes += 1
+    if push:
+        # Endstand noch ausliefern
+        obs.push_once(wall0 + t)
+        pushes += 1
+        if obs.push_channel is not None:
+            obs.push_channel.wait_idle(5.0)
+    return {"lines": lines, "chunks": chunks, "pushes": pushes, "capture_sec": t, "late_sec": pacer.late,
+            "wall_sec": time.monotonic() - pacer.t0, "duplicates": obs.duplicates_total,
+            "parse_errors": sum(src.parser.errors for src in obs.sources), "clients": len(obs.traffic)}
+
+
+def replay_socket(steps: Iterable[Step], speed: Optional[float], host: str, port: int,
+                  accept_timeout: float = 60.0) -> dict:
+    srv = socket.create_server((host, port))
+    srv.settimeout(accept_timeout)
+    print(f"warte auf Observer an {host}:{srv.getsockname()[1]} ...")
+    try:
+        conn, addr = srv.accept()
+    finally:
+        srv.close()
+    with conn:
+        conn.settimeout(10)
+        login = conn.recv(4096).split(b"\r\n", 1)[0]
+        print(f"Observer {addr[0]}:{addr[1]} angemeldet: {login.decode('utf-8', 'replace')}")
+        conn.settimeout(None)
+        pacer = Pacer(speed)
+        lines = chunks = 0
+        t = 0.0
+        for t, kind, data, _ in steps:
+            if kind != "chunk":
+                continue
+            pacer.wait(t)
+            conn.sendall(b"\r\n".join(data) + b"\r\n")
+            lines += len(data)
+            chunks += 1
+    return {"lines": lines, "chunks": chunks, "capture_sec": t, "late_sec": pacer.late,
+            "wall_sec": time.monotonic() - pacer.t0}
+
+
+def parse_speed(value: str) -> Optional[float]:
+    if value.lower() in ("max", "0", "inf"):
+        return None
+    speed = float(value.lower().rstrip("x"))
+    if speed <= 0:
+        raise argparse.ArgumentTypeError("speed must be > 0 or 'max'")
+    return speed
+
+
+def main():
+    ap = argparse.ArgumentParser(description="FSD-Mitschnitt abspielen")
+    ap.add_argument("paths", nargs="+", help="Capture-Verzeichnis oder .fsdcap.gz-Segmente")
+    ap.add_argument("--speed", type=parse_speed, default=1.0, help="1, 10, ... oder max")
+    ap.add_argument("--mode", choices=("inprocess", "socket"), default="inprocess")
+    ap.add_argument("--no-push", action="store_true", help="inprocess: Payloads nur bauen, nicht senden")
+    ap.add_argument("--host", default="127.0.0.1", help="socket: Adresse zum Lauschen")
+    ap.add_argument("--port", type=int, default=6809, help="socket: Port (0 = frei)")
+    ap.add_argument("--source", type=int, help="nur diesen Server des Mitschnitts (Index in FSD_SERVERS)")
+    ap.add_argument("--max-gap", type=float, default=5.0, help="längere Pausen auf so viele Sekunden kürzen")
+    args = ap.parse_args()
+
+    files = [seg for p in args.paths for seg in capture.segments(p)]
+    if not files:
+        sys.exit("❌ keine Segmente gefunden")
+    records = capture.read_capture(files)
+    if args.source is not None:
+        records = (r for r in records if r[3] == args.source or r[1] == "start")
+    steps = timeline(records, args.max_gap)
+
+    if args.mode == "socket":
+        stats = replay_socket(steps, args.speed, args.host, args.port)
+    else:
+        stats = replay_inprocess(steps, args.speed, push=not args.no_push)
+    wall = stats["wall_sec"]
+
+    print(f"✅ {len(files)} Segment(e), {stats['lines']} Zeilen in {stats['chunks']} Chunks")
+    print(f"Mitschnitt {stats['capture_sec']:.1f} s, abgespielt in {wall:.2f} s "
+          f"(x{stats['capture_sec'] / wall if wall > 0 else 0:.1f}), {stats['lines'] / wall if wall > 0 else 0:.0f} Zeilen/s")
+    if stats["late_sec"] > 0.5:
+        print(f"⚠️ bis zu {stats['late_sec']:.2f} s hinter dem Takt")
+    for key in ("pushes", "duplicates", "parse_errors", "clients"):
+        if key in stats:
+            print(f"{key}: {stats[key]}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,283 @@
+"""
+Gleichmäßiges Gitter über Live-Positionen für Bounding-Box-Abfragen (app.py).
+
+Jede Zelle ist `cell_deg` Grad groß und hält die Callsigns, die gerade darin
+stehen. update() verschiebt einen Callsign nur, wenn er die Zelle wechselt;
+query() besucht nur die Zellen, die die Box schneidet, und prüft nur die
+Kandidaten in Randzellen exakt; schneidet die Box mehr Zellen, als belegt
+sind (Weltansicht), wird stattdessen einmal über alle Positionen gefiltert. Der Aufwand hängt
+damit von der Treffermenge ab, nicht vom gesamten Verkehr.
+
+Boxen im Leaflet-Format west,south,east,north; west > east bedeutet, dass die
+Box über die Datumsgrenze reicht.
+"""
+import math
+from typing import Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+BBox = Tuple[float, float, float, float]
+
+
+def parse_bbox(s: str) -> Optional[BBox]:
+    """"west,south,east,north" -> Box mit normierten Längen; None, wenn ungültig."""
+    try:
+        west, south, east, north = (float(v) for v in s.split(","))
+    except (ValueError, AttributeError):
+        return None
+    if not all(math.isfinite(v) for v in (west, south, east, north)) or south > north:
+        return None
+    # Leaflet liefert nach mehrfachem Weiterscrollen Längen außerhalb ±180
+    if east - west >= 360:
+        west, east = -180.0, 180.0
+    else:
+        west, east = _wrap_lon(west), _wrap_lon(east)
+        if east == -180.0 and west > east:
+            east = 180.0
+    return west, max(south, -90.0), east, min(north, 90.0)
+
+
+def pad_bbox(bbox: BBox, deg: float) -> BBox:
+    """Box um deg Grad nach allen Seiten vergrößern (Breite begrenzt, Länge über die Datumsgrenze)."""
+    west, south, east, north = bbox
+    width = east - west if west <= east else east - west + 360.0
+    south, north = max(south - deg, -90.0), min(north + deg, 90.0)
+    if width + 2 * deg >= 360.0:
+        return -180.0, south, 180.0, north
+    west, east = _wrap_lon(west - deg), _wrap_lon(east + deg)
+    if east == -180.0:
+        east = 180.0
+    return west, south, east, north
+
+
+def _wrap_lon(lon: float) -> float:
+    if -180.0 <= lon < 180.0:
+        return lon
+    return (lon + 180.0) % 360.0 - 180.0
+
+
+class GridIndex:
+    def __init__(self, cell_deg: float = 1.0):
+        self.cell_deg = cell_deg
+        self._cols = int(math.ceil(360.0 / cell_deg))
+        self._rows = int(math.ceil(180.0 / cell_deg))
+        self._cells: Dict[int, Set[str]] = {}
+        # callsign -> (lat, lon, zelle)
+        self._pos: Dict[str, Tuple[float, float, int]] = {}
+
+    def __len__(self) -> int:
+        return len(self._pos)
+
+    def __contains__(self, callsign: str) -> bool:
+        return callsign in self._pos
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._pos)
+
+    def _col(self, lon: float) -> int:
+        return min(self._cols - 1, int((_wrap_lon(lon) + 180.0) // self.cell_deg))
+
+    def _row(self, lat: float) -> int:
+        return min(self._rows - 1, max(0, int((lat + 90.0) // self.cell_deg)))
+
+    def update(self, callsign: str, lat: float, lon: float) -> bool:
+        """Position setzen; False (und Callsign entfernt), wenn lat/lon unbrauchbar sind."""
+        try:
+            lat = float(lat)
+            lon = float(lon)
+        except (TypeError, ValueError):
+            self.remove(callsign)
+            return False
+        if not (math.isfinite(lat) and math.isfinite(lon)) or abs(lat) > 90.0:
+            self.remove(callsign)
+            return False
+        if not -180.0 <= lon < 180.0:
+            lon = _wrap_lon(lon)
+        # _row()/_col() inline: update() läuft für jede Positionsmeldung
+        cols = self._cols
+        col = int((lon + 180.0) // self.cell_deg)
+        row = int((lat + 90.0) // self.cell_deg)
+        cell = min(row, self._rows - 1) * cols + min(col, cols - 1)
+        old = self._pos.get(callsign)
+        self._pos[callsign] = (lat, lon, cell)
+        if old is not None:
+            if old[2] == cell:
+                return True
+            self._discard(callsign, old[2])
+        bucket = self._cells.get(cell)
+        if bucket is None:
+            self._cells[cell] = {callsign}
+        else:
+            bucket.add(callsign)
+        return True
+
+    def remove(self, callsign: str) -> bool:
+        old = self._pos.pop(callsign, None)
+        if old is None:
+            return False
+        self._discard(callsign, old[2])
+        return True
+
+    def _discard(self, callsign: str, cell: int):
+        bucket = self._cells[cell]
+        bucket.discard(callsign)
+        if not bucket:
+            del self._cells[cell]
+
+    def retain(self, live: Iterable[str]):
+        """Alles entfernen, was nicht in live ist (nach einem Keyframe)."""
+        live = live if isinstance(live, (set, dict)) else set(live)
+        for cs in [cs for cs in self._pos if cs not in live]:
+            self.remove(cs)
+
+    def _lon_ranges(self, west: float, east: float) -> List[Tuple[float, float]]:
+        return [(west, east)] if west <= east else [(west, 180.0), (-180.0, east)]
+
+    def _col_ranges(self, ranges: List[Tuple[float, float]]) -> Tuple[List[Tuple[int, int]], Set[int]]:
+        col_ranges = [(self._col(w), self._col(e) if e < 180.0 else self._cols - 1) for w, e in ranges]
+        # Spalten mit west/east liegen nur teilweise in der Box
+        edge_cols = {c for pair in col_ranges for c in pair}
+        if len(col_ranges) == 2 and col_ranges[1][1] >= col_ranges[0][0]:
+            # fast 360° über die Datumsgrenze: beide Teile teilen sich eine Spalte
+            col_ranges = [(0, self._cols - 1)]
+        return col_ranges, edge_cols
+
+    def cell_of(self, callsign: str) -> Optional[int]:
+        entry = self._pos.get(callsign)
+        return entry[2] if entry is not None else None
+
+    def members(self, cell: int) -> Set[str]:
+        return self._cells.get(cell, set())
+
+    def cells(self, bbox: BBox) -> List[int]:
+        """IDs aller Zellen, die die Box schneidet (auch leere)."""
+        west, south, east, north = bbox
+        col_ranges, _ = self._col_ranges(self._lon_ranges(west, east))
+        return [row * self._cols + col
+                for row in range(self._row(south), self._row(north) + 1)
+                for c0, c1 in col_ranges
+                for col in range(c0, c1 + 1)]
+
+    def query(self, bbox: BBox) -> List[str]:
+        """Callsigns innerhalb der Box (Ränder inklusive)."""
+        west, south, east, north = bbox
+        ranges = self._lon_ranges(west, east)
+        r0, r1 = self._row(south), self._row(north)
+        # Kandidaten in Randspalten/-zeilen exakt prüfen
+        col_ranges, edge_cols = self._col_ranges(ranges)
+        n_cells = (r1 - r0 + 1) * sum(c1 - c0 + 1 for c0, c1 in col_ranges)
+
+        pos = self._pos
+        out: List[str] = []
+
+        if len(ranges) == 1:
+            (w, e), = ranges
+
+            def inside(cs: str) -> bool:
+                lat, lon, _ = pos[cs]
+                return south <= lat <= north and w <= lon <= e
+        else:
+            (w, _), (_, e) = ranges
+
+            def inside(cs: str) -> bool:
+                lat, lon, _ = pos[cs]
+                return south <= lat <= north and (lon >= w or lon <= e)
+
+        if n_cells >= len(self._cells):
+            # Box größer als die belegte Fläche (Weltansicht): einfacher Scan ist billiger
+            if len(ranges) == 1:
+                return [cs for cs, (lat, lon, _) in pos.items() if south <= lat <= north and w <= lon <= e]
+            return [cs for cs, (lat, lon, _) in pos.items()
+                    if south <= lat <= north and (lon >= w or lon <= e)]
+
+        cells = self._cells
+        for row in range(r0, r1 + 1):
+            base = row * self._cols
+            edge_row = row == r0 or row == r1
+            for c0, c1 in col_ranges:
+                for col in range(c0, c1 + 1):
+                    bucket = cells.get(base + col)
+                    if not bucket:
+                        continue
+                    # innere Zellen liegen komplett in der Box -> ohne Einzelprüfung
+                    if edge_row or col in edge_cols:
+                        out.extend(filter(inside, bucket))
+                    else:
+                        out.extend(bucket)
+        return out
+
+
+class ClusterGrid(GridIndex):
+    """
+    GridIndex mit laufender Summe pro Zelle (Anzahl, Σlat, Σlon). update()/remove()
+    korrigieren nur die betroffenen Zellen; clusters() fasst die Zellen zu
+    gröberen Kacheln zusammen (Aufwand ~ belegte Zellen, nicht Flugzeuge) und
+    merkt sich das Ergebnis bis zur nächsten Änderung.
+    """
+
+    def __init__(self, cell_deg: float = 1.0):
+        super().__init__(cell_deg)
+        self._agg: Dict[int, List[float]] = {}
+        self.version = 0
+        self._cache: Dict[int, Tuple[int, List[Tuple[int, float, float, int]]]] = {}
+
+    def _account(self, entry: Tuple[float, float, int], sign: int):
+        lat, lon, cell = entry
+        agg = self._agg.get(cell)
+        if agg is None:
+            agg = self._agg[cell] = [0, 0.0, 0.0]
+        agg[0] += sign
+        if agg[0] == 0:
+            # leere Zelle weg, damit sich keine Rundungsfehler ansammeln
+            del self._agg[cell]
+            return
+        agg[1] += sign * lat
+        agg[2] += sign * lon
+
+    def update(self, callsign: str, lat: float, lon: float) -> bool:
+        old = self._pos.get(callsign)
+        if not super().update(callsign, lat, lon):
+            # ungültige Position: remove() hat die Summen schon korrigiert
+            return False
+        new = self._pos[callsign]
+        if old is not None:
+            if old == new:
+                return True
+            self._account(old, -1)
+        self._account(new, 1)
+        self.version += 1
+        return True
+
+    def remove(self, callsign: str) -> bool:
+        old = self._pos.get(callsign)
+        if not super().remove(callsign):
+            return False
+        self._account(old, -1)
+        self.version += 1
+        return True
+
+    def clusters(self, factor: int = 1) -> List[Tuple[int, float, float, int]]:
+        """[(kachel, lat, lon, anzahl)] für Kacheln aus factor x factor Zellen; lat/lon = Mittelpunkt."""
+        cached = self._cache.get(factor)
+        if cached is not None and cached[0] == self.version:
+            return cached[1]
+        cols = self._cols
+        tile_cols = -(-cols // factor)
+        tiles: Dict[int, List[float]] = {}
+        for cell, (n, slat, slon) in self._agg.items():
+            row, col = divmod(cell, cols)
+            key = (row // factor) * tile_cols + col // factor
+            tile = tiles.get(key)
+            if tile is None:
+                tiles[key] = [n, slat, slon]
+            else:
+                tile[0] += n
+                tile[1] += slat
+                tile[2] += slon
+        result = [(key, slat / n, slon / n, n) for key, (n, slat, slon) in tiles.items()]
+        self._cache[factor] = (self.version, result)
+        return result
+
+    def cluster_factor(self, zoom: float, target_px: float = 64.0) -> int:
+        """Zellen pro Kachel (Zweierpotenz), damit eine Kachel bei zoom ca. target_px breit ist."""
+        # Web-Mercator: 360° = 256 * 2^zoom Pixel
+        deg = target_px * 360.0 / (256.0 * 2 ** math.floor(zoom))
+        return 2 ** max(0, round(math.log2(max(deg / self.cell_deg, 1.0))))
@@ -0,0 +1,22 @@
+"""
+Gemeinsame Einrichtung für die Tests (cd web && python -m pytest -q).
+
+Die Module in web/ sind flach und werden wie in app.py/observer.py direkt
+importiert; dafür kommt web/ in sys.path.
+"""
+import os
+import sys
+from pathlib import Path
+
+WEB_DIR = Path(__file__).resolve().parent.parent
+if str(WEB_DIR) not in sys.path:
+    sys.path.insert(0, str(WEB_DIR))
+
+# Observer ohne Metrik-Port und ohne Info-Logs
+os.environ.setdefault("FSD_LOG", "warn")
+os.environ.setdefault("FSD_METRICS_PORT", "0")
+
+
+def pilot_line(callsign: str, lat: float, lon: float, alt: int = 30000, gs: int = 450, pbh: int = 0) -> bytes:
+    """Positionszeile im Classic-Format (wie bench.common.pilot_line, inkl. CRLF)."""
+    return f"@N:{callsign}:1200:1:{lat:.5f}:{lon:.5f}:{alt}:{gs}:{pbh}:0\r\n".encode("ascii")
@@ -0,0 +1,66 @@
+from framer import LineFramer
+
+
+def feed_all(framer, chunks):
+    out = []
+    for chunk in chunks:
+        out.extend(framer.feed(chunk))
+    return out
+
+
+def test_complete_lines_in_one_chunk():
+    f = LineFramer()
+    assert f.feed(b"a\r\nb\r\n") == [b"a", b"b"]
+    assert f.pending() == 0
+
+
+def test_partial_line_is_kept_until_line_end():
+    f = LineFramer()
+    assert f.feed(b"@N:ABC") == []
+    assert f.pending() == 6
+    assert f.feed(b":1200\r\n@N:X") == [b"@N:ABC:1200"]
+    assert f.pending() == 4
+    assert f.feed(b"YZ\r\n") == [b"@N:XYZ"]
+    assert f.pending() == 0
+
+
+def test_crlf_split_across_chunks():
+    f = LineFramer()
+    assert f.feed(b"one\r") == [b"one"]
+    # das \n gehört noch zum vorigen Zeilenende -> keine leere Zeile
+    assert f.feed(b"\ntwo\r\n") == [b"two"]
+
+
+def test_mixed_line_endings():
+    f = LineFramer()
+    assert f.feed(b"a\nb\rc\r\n\r\nd") == [b"a", b"b", b"c"]
+    assert f.feed(b"\n") == [b"d"]
+
+
+def test_every_split_point_gives_the_same_lines():
+    data = b"@N:AAA:1\r\n@N:BBB:2\r\n#TMserver:x\n@N:CCC:3\r\n"
+    expected = [b"@N:AAA:1", b"@N:BBB:2", b"#TMserver:x", b"@N:CCC:3"]
+    for i in range(len(data) + 1):
+        for j in range(i, len(data) + 1):
+            assert feed_all(LineFramer(), [data[:i], data[i:j], data[j:]]) == expected, (i, j)
+
+
+def test_byte_by_byte():
+    data = b"first\r\nsecond\r\nthird\r\n"
+    assert feed_all(LineFramer(), [data[i:i + 1] for i in range(len(data))]) == [b"first", b"second", b"third"]
+
+
+def test_overlong_line_is_dropped_until_next_line_end():
+    f = LineFramer(max_line=8)
+    assert f.feed(b"0123456789") == []
+    assert f.dropped == 1
+    assert f.feed(b"abc\r\nok\r\n") == [b"ok"]
+    assert f.feed(b"x" * 20 + b"\r\nfine\r\n") == [b"fine"]
+    assert f.dropped == 2
+
+
+def test_reset_discards_partial_line():
+    f = LineFramer()
+    f.feed(b"half")
+    f.reset()
+    assert f.feed(b"new\r\n") == [b"new"]
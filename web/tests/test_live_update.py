@@ -0,0 +1,85 @@
+"""Delta-Protokoll über /api/live_update und /api/live_snapshot (app.py)."""
+import pytest
+
+import app as A
+
+TOKEN = "test-token"
+
+
+@pytest.fixture
+def client(monkeypatch):
+    monkeypatch.setattr(A, "LIVE_PUSH_TOKEN", TOKEN)
+    return A.app.test_client()
+
+
+def push(c, msg):
+    return c.post("/api/live_update", json=msg, headers={"X-FSD-Token": TOKEN})
+
+
+def pilot(cs, lat=50.0, lon=8.0, alt=30000):
+    return {"callsign": cs, "lat": lat, "lon": lon, "alt": alt, "gs": 450, "ts": 1}
+
+
+def delta(epoch, seq, base, added=(), changed=(), removed=()):
+    return {"type": "delta", "epoch": epoch, "seq": seq, "base": base,
+            "added": list(added), "changed": list(changed), "removed": list(removed)}
+
+
+def snapshot(c):
+    data = c.get("/api/live_snapshot").get_json()
+    return data["epoch"], data["seq"], {p["callsign"]: p for p in data["clients"]}
+
+
+def test_unauthorized(client):
+    assert client.post("/api/live_update", json={}, headers={"X-FSD-Token": "nope"}).status_code == 401
+
+
+def test_keyframe_then_deltas(client):
+    r = push(client, {"type": "full", "epoch": "e1", "seq": 1, "clients": [pilot("A"), pilot("B")]})
+    assert r.status_code == 200 and r.get_json()["ok"]
+    assert snapshot(client)[:2] == ("e1", 1)
+
+    r = push(client, delta("e1", 2, 1, added=[pilot("C")], changed=[{"callsign": "A", "alt": 31000}],
+                           removed=["B"]))
+    assert r.status_code == 200
+    epoch, seq, clients = snapshot(client)
+    assert (epoch, seq) == ("e1", 2)
+    assert set(clients) == {"A", "C"}
+    assert clients["A"]["alt"] == 31000
+
+
+@pytest.mark.parametrize("bad", [
+    delta("e1", 5, 4, changed=[{"callsign": "A", "alt": 1}]),   # Lücke in der Sequenz
+    delta("e2", 2, 1, changed=[{"callsign": "A", "alt": 1}]),   # andere Epoche
+    delta("e1", 1, 0),                                          # veraltet / doppelt
+])
+def test_gap_answers_409_and_keeps_state(client, bad):
+    push(client, {"type": "full", "epoch": "e1", "seq": 1, "clients": [pilot("A")]})
+    r = push(client, bad)
+    assert r.status_code == 409
+    assert r.get_json() == {"ok": False, "resync": True}
+    epoch, seq, clients = snapshot(client)
+    assert (epoch, seq) == ("e1", 1)
+    assert clients["A"]["alt"] == 30000
+
+
+def test_keyframe_after_resync(client):
+    push(client, {"type": "full", "epoch": "e1", "seq": 1, "clients": [pilot("A")]})
+    assert push(client, delta("e1", 3, 2, removed=["A"])).status_code == 409
+    # Observer antwortet mit einem Keyframe (neue Epoche nach Neustart)
+    r = push(client, {"type": "full", "epoch": "e2", "seq": 1, "clients": [pilot("Z")]})
+    assert r.status_code == 200
+    assert push(client, delta("e2", 2, 1, changed=[{"callsign": "Z", "gs": 200}])).status_code == 200
+    epoch, seq, clients = snapshot(client)
+    assert (epoch, seq) == ("e2", 2)
+    assert set(clients) == {"Z"} and clients["Z"]["gs"] == 200
+
+
+def test_snapshot_etag_changes_with_state(client):
+    push(client, {"type": "full", "epoch": "e1", "seq": 1, "clients": [pilot("A")]})
+    first = client.get("/api/live_snapshot")
+    etag = first.headers["ETag"]
+    assert client.get("/api/live_snapshot", headers={"If-None-Match": etag}).status_code == 304
+    push(client, delta("e1", 2, 1, changed=[{"callsign": "A", "alt": 1}]))
+    second = client.get("/api/live_snapshot", headers={"If-None-Match": etag})
+    assert second.status_code == 200 and second.headers["ETag"] != etag
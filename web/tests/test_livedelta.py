@@ -0,0 +1,85 @@
+import pytest
+
+import fragcache
+from livedelta import DeltaEncoder, LiveState
+
+
+def client(cs, lat=50.0, alt=30000):
+    return {"callsign": cs, "lat": lat, "lon": 8.0, "alt": alt}
+
+
+def roundtrip(msg):
+    # wie der HTTP-Push: RawJSON-Fragmente -> JSON -> dicts
+    return fragcache.loads(fragcache.dumps(msg))
+
+
+def test_encoder_keyframe_then_delta():
+    enc = DeltaEncoder(keyframe_interval=1e9)
+    recs = {"A": client("A"), "B": client("B")}
+    full = roundtrip(enc.encode(recs, 0, to_dict=lambda cs, r: r))
+    assert full["type"] == "full" and full["seq"] == 1
+    assert sorted(c["callsign"] for c in full["clients"]) == ["A", "B"]
+
+    recs2 = {"A": client("A", alt=31000), "C": client("C")}
+    delta = roundtrip(enc.encode(recs2, 1, to_dict=lambda cs, r: r))
+    assert delta["type"] == "delta"
+    assert (delta["epoch"], delta["seq"], delta["base"]) == (full["epoch"], 2, 1)
+    assert delta["changed"] == [{"alt": 31000, "callsign": "A"}]
+    assert [c["callsign"] for c in delta["added"]] == ["C"]
+    assert delta["removed"] == ["B"]
+
+
+def test_state_follows_encoder():
+    enc = DeltaEncoder(keyframe_interval=1e9)
+    state = LiveState()
+    recs = {}
+    for step in range(20):
+        recs = dict(recs)
+        recs[f"N{step}"] = client(f"N{step}")
+        recs.pop(f"N{step - 5}", None)
+        if step % 3 == 0 and "N%d" % (step - 1) in recs:
+            recs["N%d" % (step - 1)] = client("N%d" % (step - 1), lat=51.0 + step)
+        state = state.advance(roundtrip(enc.encode(recs, step, to_dict=lambda cs, r: r)))
+        assert state is not None
+        assert state.clients == recs
+        assert state.seq == enc.seq
+
+
+def test_advance_leaves_old_state_untouched():
+    state = LiveState().advance({"type": "full", "epoch": "e", "seq": 1, "clients": [client("A")]})
+    nxt = state.advance({"type": "delta", "epoch": "e", "seq": 2, "base": 1,
+                         "added": [client("B")], "changed": [{"callsign": "A", "alt": 1}], "removed": []})
+    assert set(state.clients) == {"A"} and state.clients["A"]["alt"] == 30000 and state.seq == 1
+    assert set(nxt.clients) == {"A", "B"} and nxt.clients["A"]["alt"] == 1 and nxt.seq == 2
+
+
+@pytest.mark.parametrize("msg", [
+    # Lücke: base passt nicht zur letzten Sequenz
+    {"type": "delta", "epoch": "e", "seq": 4, "base": 3, "added": [], "changed": [], "removed": []},
+    # neue Epoche (Observer-Neustart) ohne Keyframe
+    {"type": "delta", "epoch": "f", "seq": 2, "base": 1, "added": [], "changed": [], "removed": []},
+    # Änderung an einem unbekannten Client
+    {"type": "delta", "epoch": "e", "seq": 2, "base": 1, "added": [], "changed": [{"callsign": "Z", "alt": 1}],
+     "removed": []},
+    {"type": "bogus", "epoch": "e", "seq": 2},
+])
+def test_advance_requests_resync(msg):
+    state = LiveState().advance({"type": "full", "epoch": "e", "seq": 1, "clients": [client("A")]})
+    assert state.advance(msg) is None
+    assert state.seq == 1 and set(state.clients) == {"A"}
+
+
+def test_keyframe_recovers_after_resync():
+    enc = DeltaEncoder(keyframe_interval=1e9)
+    enc.encode({"A": client("A")}, 0, to_dict=lambda cs, r: r)
+    lost = {"A": client("A"), "B": client("B")}
+    enc.encode(lost, 1, to_dict=lambda cs, r: r)  # geht verloren
+    gap = roundtrip(enc.encode({"B": client("B")}, 2, to_dict=lambda cs, r: r))
+
+    state = LiveState()
+    assert state.advance(gap) is None
+    enc.request_keyframe()
+    key = roundtrip(enc.encode({"B": client("B")}, 3, to_dict=lambda cs, r: r))
+    assert key["type"] == "full"
+    state = state.advance(key)
+    assert state.clients == {"B": client("B")} and state.seq == key["seq"] and state.epoch == enc.epoch
@@ -0,0 +1,167 @@
+"""
+Positionsverlauf pro Flugzeug als Ringpuffer fester Größe (app.py).
+
+Jeder Callsign bekommt beim ersten Sample einen Ring aus `samples` Einträgen in
+typisierten Arrays:
+
+  ts 'd' (8) | lat 'f' (4) | lon 'f' (4) | alt 'i' (4) | gs 'H' (2) | hdg 'H' (2)  = 24 Byte/Sample
+
+Dazu kommt der Objekt-Overhead: je Array ein Header (sys.getsizeof, ~64 Byte)
+plus das _Ring-Objekt – bei 128 Samples also 3072 Byte Nutzdaten, ~3.9 KB real.
+bytes_per_aircraft misst diesen Wert an einem Muster-Ring; nicht enthalten sind
+nur Callsign-String und dict-Eintrag (~100 Byte, je nach Callsign).
+
+Der Speicher pro Flugzeug steht damit fest (bytes_per_aircraft); die Gesamtgrenze
+(max_bytes) ergibt die maximale Anzahl Ringe, darüber wird der am längsten nicht
+aktualisierte Ring verworfen. Neue Samples werden nur übernommen, wenn seit dem
+letzten mindestens `min_interval` Sekunden vergangen sind.
+
+trail() liest den Ring in einem Durchgang in zeitlicher Reihenfolge aus;
+simplify() reduziert ihn per Douglas-Peucker.
+"""
+import math
+import sys
+from array import array
+from collections import OrderedDict
+from typing import Any, List, Optional, Sequence
+
+FIELDS = (("ts", "d"), ("lat", "f"), ("lon", "f"), ("alt", "i"), ("gs", "H"), ("hdg", "H"))
+SAMPLE_BYTES = sum(array(code).itemsize for _, code in FIELDS)
+
+# Meter pro Grad (lokale equirektangulare Projektion reicht für Trails)
+M_PER_DEG_LAT = 110_574.0
+M_PER_DEG_LON = 111_320.0
+
+
+class _Ring:
+    __slots__ = ("ts", "lat", "lon", "alt", "gs", "hdg", "head", "count")
+
+    def __init__(self, size: int):
+        for name, code in FIELDS:
+            setattr(self, name, array(code, bytes(array(code).itemsize * size)))
+        self.head = 0
+        self.count = 0
+
+
+def _ring_bytes(size: int) -> int:
+    """Tatsächlicher Speicher eines Rings (Arrays inkl. Header + Objekt)."""
+    ring = _Ring(size)
+    return sys.getsizeof(ring) + sum(sys.getsizeof(getattr(ring, name)) for name, _ in FIELDS)
+
+
+def _int(v: Any, lo: int, hi: int) -> int:
+    try:
+        return min(hi, max(lo, int(v)))
+    except (TypeError, ValueError):
+        return 0
+
+
+class TrackStore:
+    """Nicht thread-safe; app.py ruft unter TRACKS_LOCK auf."""
+
+    def __init__(self, samples: int = 128, max_bytes: int = 64 * 1024 * 1024, min_interval: float = 5.0):
+        self.samples = max(2, samples)
+        self.min_interval = min_interval
+        self.bytes_per_aircraft = _ring_bytes(self.samples)
+        self.max_aircraft = max(1, max_bytes // self.bytes_per_aircraft)
+        self.evicted = 0
+        # Reihenfolge = letzte Aktualisierung (LRU vorne)
+        self._rings: "OrderedDict[str, _Ring]" = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._rings)
+
+    def __contains__(self, callsign: str) -> bool:
+        return callsign in self._rings
+
+    @property
+    def memory_bytes(self) -> int:
+        return len(self._rings) * self.bytes_per_aircraft
+
+    def record(self, callsign: str, ts: float, lat: float, lon: float,
+               alt: Any = 0, gs: Any = 0, hdg: Any = 0) -> bool:
+        """Sample anhängen; False, wenn es wegen min_interval verworfen wurde."""
+        ring = self._rings.get(callsign)
+        if ring is None:
+            if len(self._rings) >= self.max_aircraft:
+                self._rings.popitem(last=False)
+                self.evicted += 1
+            ring = self._rings[callsign] = _Ring(self.samples)
+        else:
+            if ring.count and ts - ring.ts[(ring.head - 1) % self.samples] < self.min_interval:
+                return False
+            self._rings.move_to_end(callsign)
+        i = ring.head
+        ring.ts[i] = ts
+        ring.lat[i] = lat
+        ring.lon[i] = lon
+        ring.alt[i] = _int(alt, -2 ** 31, 2 ** 31 - 1)
+        ring.gs[i] = _int(gs, 0, 0xFFFF)
+        ring.hdg[i] = _int(hdg, -2 ** 31, 2 ** 31 - 1) % 360
+        ring.head = (i + 1) % self.samples
+        if ring.count < self.samples:
+            ring.count += 1
+        return True
+
+    def discard(self, callsign: str):
+        self._rings.pop(callsign, None)
+
+    def trail(self, callsign: str, since: Optional[float] = None) -> Optional[List[List[Any]]]:
+        """[[ts, lat, lon, alt, gs, hdg], ...] älteste zuerst; None, wenn unbekannt."""
+        ring = self._rings.get(callsign)
+        if ring is None:
+            return None
+        head = ring.head
+
+        def ordered(col: array) -> array:
+            # ein Durchgang: Slices statt Index-Arithmetik pro Sample
+            return col[:ring.count] if ring.count < self.samples else col[head:] + col[:head]
+
+        # float32 -> 5 Nachkommastellen (~1 m), sonst kommen Artefakte wie 50.00199890136719 raus
+        lat = [round(v, 5) for v in ordered(ring.lat)]
+        lon = [round(v, 5) for v in ordered(ring.lon)]
+        out = [list(s) for s in zip(ordered(ring.ts), lat, lon, ordered(ring.alt),
+                                    ordered(ring.gs), ordered(ring.hdg))]
+        if since is not None:
+            out = [s for s in out if s[0] > since]
+        return out
+
+
+def simplify(points: Sequence[Sequence[float]], tolerance_m: float) -> List[int]:
+    """
+    Douglas-Peucker über (lat, lon) an Index 1/2 der Punkte; liefert die Indizes
+    der behaltenen Punkte. Abstände in Metern (lokale Projektion um den ersten Punkt).
+    """
+    n = len(points)
+    if n <= 2 or tolerance_m <= 0:
+        return list(range(n))
+    kx = M_PER_DEG_LON * math.cos(math.radians(points[0][1]))
+    lon0 = points[0][2]
+    # Datumsgrenze: Längen relativ zum ersten Punkt auf ±180 bringen
+    xs = [((p[2] - lon0 + 180.0) % 360.0 - 180.0) * kx for p in points]
+    ys = [p[1] * M_PER_DEG_LAT for p in points]
+    keep = [False] * n
+    keep[0] = keep[-1] = True
+    tol2 = tolerance_m * tolerance_m
+    stack = [(0, n - 1)]
+    while stack:
+        a, b = stack.pop()
+        ax, ay = xs[a], ys[a]
+        dx, dy = xs[b] - ax, ys[b] - ay
+        seg2 = dx * dx + dy * dy
+        best, best_d2 = -1, tol2
+        for i in range(a + 1, b):
+            px, py = xs[i] - ax, ys[i] - ay
+            if seg2 > 0:
+                t = max(0.0, min(1.0, (px * dx + py * dy) / seg2))
+                ex, ey = px - t * dx, py - t * dy
+            else:
+                ex, ey = px, py
+            d2 = ex * ex + ey * ey
+            if d2 > best_d2:
+                best, best_d2 = i, d2
+        if best >= 0:
+            keep[best] = True
+            stack.append((a, best))
+            stack.append((best, b))
+    return [i for i in range(n) if keep[i]]
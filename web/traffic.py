@@ -0,0 +1,105 @@
+"""
+Tabelle der Live-Piloten (observer.py).
+
+Pro Callsign liegt ein (PilotPosition, Zeilenversion)-Paar in einem dict. Der
+Record ist __slots__-basiert und wird nach dem Einfügen nicht mehr verändert
+(jedes Update bringt einen neuen Record), darum dürfen Snapshots ihn teilen.
+Jede Schreiboperation vergibt eine neue, tabellenweit eindeutige
+Zeilenversion – Änderungserkennung (Delta, Fragment-Caches) vergleicht nur
+diese Zahl.
+
+snapshot() liefert einen unveränderlichen, versionierten Stand (flache Kopie
+des dicts); solange sich nichts ändert, wird derselbe Snapshot wiederverwendet.
+"""
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from fsdparse import PilotPosition
+
+Row = Tuple[PilotPosition, int]
+
+
+class TrafficSnapshot:
+    """Stand der Tabelle zu einer Version; Zugriff per Callsign."""
+
+    __slots__ = ("version", "_rows")
+
+    def __init__(self, version: int, rows: Dict[str, Row]):
+        self.version = version
+        self._rows = rows
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._rows)
+
+    def __contains__(self, callsign: str) -> bool:
+        return callsign in self._rows
+
+    def versions(self) -> Dict[str, int]:
+        """callsign -> Zeilenversion (ändert sich bei jedem Update des Clients)."""
+        return {cs: ver for cs, (_rec, ver) in self._rows.items()}
+
+    def row_version(self, callsign: str) -> int:
+        return self._rows[callsign][1]
+
+    def record(self, callsign: str) -> PilotPosition:
+        return self._rows[callsign][0]
+
+    def to_dict(self, callsign: str) -> Dict[str, Any]:
+        return self._rows[callsign][0].to_dict()
+
+    def to_dicts(self) -> List[Dict[str, Any]]:
+        return [rec.to_dict() for rec, _ver in self._rows.values()]
+
+
+class TrafficTable:
+    """Nicht thread-safe; der Observer schützt Zugriffe mit seinem Lock."""
+
+    def __init__(self):
+        self._rows: Dict[str, Row] = {}
+        self.version = 0
+        self._snapshot: Optional[TrafficSnapshot] = None
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    def __contains__(self, callsign: str) -> bool:
+        return callsign in self._rows
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._rows)
+
+    def upsert(self, rec: PilotPosition):
+        ver = self.version = self.version + 1
+        self._rows[rec.callsign] = (rec, ver)
+
+    def upsert_many(self, records: Iterable[PilotPosition]):
+        rows = self._rows
+        ver = self.version
+        for rec in records:
+            ver += 1
+            rows[rec.callsign] = (rec, ver)
+        self.version = ver
+
+    def remove(self, callsign: str) -> bool:
+        if self._rows.pop(callsign, None) is None:
+            return False
+        self.version += 1
+        return True
+
+    def last_ts(self, callsign: str) -> Optional[int]:
+        """Zeitstempel der aktuellen Position (None = unbekannt)."""
+        row = self._rows.get(callsign)
+        return None if row is None else row[0].ts
+
+    def get(self, callsign: str) -> Optional[PilotPosition]:
+        row = self._rows.get(callsign)
+        return None if row is None else row[0]
+
+    def snapshot(self) -> TrafficSnapshot:
+        snap = self._snapshot
+        if snap is None or snap.version != self.version:
+            snap = TrafficSnapshot(self.version, dict(self._rows))
+            self._snapshot = snap
+        return snap
@@ -0,0 +1,212 @@
+"""
+whazzup.txt (vom FSD-Server alle WHAZZUPCHECK Sekunden neu geschrieben) lesen und cachen.
+
+Client-Zeile laut fsd.cpp (38 Felder):
+
+  callsign:cid:realname:ATC|PILOT:freq:lat:lon:alt:gs:
+  aircraft:tas:dep:plannedalt:dest:server:protocol:rating:transponder:facility:visualrange:
+  revision:type:deptime:actdeptime:hrs:min:hrsfuel:minfuel:altap:remarks:route:
+  ::::::logontime
+
+Der Cache ist an (mtime_ns, size) der Datei gebunden (filewatch.CachedFile);
+solange sich die Datei nicht ändert, liefert get() denselben Eintrag inkl.
+fertig encodiertem JSON-Body und ETag. Gleichzeitige Anfragen nach einer
+Änderung teilen sich einen einzigen Parse-Durchgang.
+"""
+import json
+import os
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from filewatch import CachedFile
+
+# Feldindizes (fsd.cpp, WhazzUp)
+F_CALLSIGN, F_CID, F_REALNAME, F_TYPE, F_FREQ, F_LAT, F_LON, F_ALT, F_GS = range(9)
+F_AIRCRAFT, F_TAS, F_DEP, F_PLANNED_ALT, F_DEST = range(9, 14)
+F_SERVER, F_PROTOCOL, F_RATING, F_TRANSPONDER, F_FACILITY, F_VISUAL_RANGE = range(14, 20)
+(F_REVISION, F_FP_TYPE, F_DEPTIME, F_ACTDEPTIME, F_HRS, F_MIN, F_HRS_FUEL, F_MIN_FUEL,
+ F_ALTERNATE, F_REMARKS, F_ROUTE) = range(20, 31)
+FULL_FIELDS = 38
+
+
+def _int(s: str) -> int:
+    try:
+        return int(s)
+    except ValueError:
+        return 0
+
+
+def _logon_iso(s: str) -> Optional[str]:
+    # sprintgmt: YYYYMMDDhhmmss
+    if len(s) != 14 or not s.isdigit():
+        return None
+    return f"{s[0:4]}-{s[4:6]}-{s[6:8]}T{s[8:10]}:{s[10:12]}:{s[12:14]}Z"
+
+
+def _flight_plan(p: List[str]) -> Optional[Dict[str, Any]]:
+    # ohne Flugplan schreibt der Server nur Leerfelder (Typ-Feld leer)
+    if not p[F_FP_TYPE] and not p[F_AIRCRAFT]:
+        return None
+    return {
+        "aircraft": p[F_AIRCRAFT],
+        "cruise_tas": _int(p[F_TAS]),
+        "departure": p[F_DEP],
+        "altitude": p[F_PLANNED_ALT],
+        "arrival": p[F_DEST],
+        "revision": _int(p[F_REVISION]),
+        "flight_rules": p[F_FP_TYPE],
+        "deptime": p[F_DEPTIME],
+        "actdeptime": p[F_ACTDEPTIME],
+        "enroute_time": f"{_int(p[F_HRS]):02d}{_int(p[F_MIN]):02d}",
+        "fuel_time": f"{_int(p[F_HRS_FUEL]):02d}{_int(p[F_MIN_FUEL]):02d}",
+        "alternate": p[F_ALTERNATE],
+        "remarks": p[F_REMARKS],
+        "route": p[F_ROUTE],
+    }
+
+
+def parse_client_line(line: str) -> Optional[Dict[str, Any]]:
+    parts = line.split(":")
+    if len(parts) < 8:
+        return None
+
+    # Basisfelder wie bisher (Strings, damit bestehende Frontends unverändert funktionieren)
+    if parts[F_TYPE].upper() in ("PILOT", "ATC"):
+        client = {
+            "callsign": parts[F_CALLSIGN],
+            "cid": parts[F_CID],
+            "realname": parts[F_REALNAME],
+            "type": parts[F_TYPE],
+            "lat": parts[F_LAT],
+            "lon": parts[F_LON],
+            "alt": parts[F_ALT],
+        }
+    else:
+        return {
+            "callsign": parts[0],
+            "cid": parts[1],
+            "realname": parts[2],
+            "type": "UNKNOWN",
+            "lat": parts[4],
+            "lon": parts[5],
+            "alt": parts[6] if len(parts) > 6 else "0",
+        }
+
+    if len(parts) >= FULL_FIELDS:
+        client.update({
+            "frequency": parts[F_FREQ] or None,
+            "groundspeed": _int(parts[F_GS]),
+            "server": parts[F_SERVER],
+            "protocol": parts[F_PROTOCOL],
+            "rating": _int(parts[F_RATING]),
+            "transponder": parts[F_TRANSPONDER],
+            "facility": _int(parts[F_FACILITY]),
+            "visual_range": _int(parts[F_VISUAL_RANGE]),
+            "flight_plan": _flight_plan(parts),
+            # letztes Feld; davor liegen 6 reservierte Leerfelder
+            "logon_time": _logon_iso(parts[-1]),
+        })
+    return client
+
+
+def parse_whazzup(lines: Iterable[str]) -> Tuple[Dict[str, str], List[Dict[str, Any]], List[Dict[str, Any]]]:
+    """Ein Durchgang über die Zeilen -> (general, clients, servers)."""
+    general: Dict[str, str] = {}
+    clients: List[Dict[str, Any]] = []
+    servers: List[Dict[str, Any]] = []
+    section = None
+    for line in lines:
+        line = line.strip()
+        if not line or line.startswith(";"):
+            continue
+        if line.startswith("![DateStamp]"):
+            general["datestamp"] = line[len("![DateStamp]"):]
+            continue
+        if line[0] == "!":
+            section = line
+            continue
+        if section == "!CLIENTS":
+            client = parse_client_line(line)
+            if client is not None:
+                clients.append(client)
+        elif section == "!GENERAL":
+            key, sep, value = line.partition("=")
+            if sep:
+                general[key.strip()] = value.strip()
+        elif section == "!SERVERS":
+            p = line.split(":")
+            if len(p) >= 5:
+                servers.append({"ident": p[0], "hostname": p[1], "location": p[2],
+                                "name": p[3], "clients_allowed": p[4] == "1"})
+    return general, clients, servers
+
+
+class WhazzupEntry:
+    __slots__ = ("key", "general", "clients", "servers", "body", "etag")
+
+    def __init__(self, key: Optional[Tuple[int, int]], general: Dict[str, str],
+                 clients: List[Dict[str, Any]], servers: List[Dict[str, Any]]):
+        self.key = key
+        self.general = general
+        self.clients = clients
+        self.servers = servers
+        # /api/clients liefert nur die Client-Liste – einmal encodiert, danach aus dem Speicher
+        self.body = json.dumps(clients, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+        self.etag = f"{key[0]:x}-{key[1]:x}" if key else "missing"
+
+
+EMPTY = WhazzupEntry(None, {}, [], [])
+
+
+class WhazzupCache(CachedFile):
+    """whazzup.txt als WhazzupEntry; ohne FileWatcher prüft get() per stat() auf Änderungen."""
+
+    def __init__(self, path: Path):
+        super().__init__(path, missing=EMPTY)
+
+    def load(self, f) -> WhazzupEntry:
+        st = os.fstat(f.fileno())
+        general, clients, servers = parse_whazzup(f.read().decode("utf-8", errors="ignore").splitlines())
+        print(f"✅ {len(clients)} Clients erfolgreich geparst.")
+        return WhazzupEntry((st.st_mtime_ns, st.st_size), general, clients, servers)
+
+    def on_missing(self):
+        print(f"⚠️ Datei nicht gefunden: {self.path}")
+
+    def on_error(self, e: Exception):
+        print(f"❌ Fehler beim Parsen von {self.path}: {e}")
+
+
+class ClientTableDiff:
+    """
+    Zuletzt verteilter Stand der Client-Tabelle (für Socket.IO-Push).
+    update() liefert einen Zeilen-Diff, wenn sich die Datei geändert hat:
+
+      {"seq": n, "base": n-1, "added": [row], "changed": [row], "removed": [callsign]}
+
+    Zeilen sind immer vollständig (Schlüssel: callsign).
+    """
+
+    def __init__(self):
+        self.seq = 0
+        self.rows: Dict[str, Dict[str, Any]] = {}
+        self._entry: Optional[WhazzupEntry] = None
+
+    def update(self, entry: WhazzupEntry) -> Optional[Dict[str, Any]]:
+        if entry is self._entry:
+            return None
+        self._entry = entry
+        old = self.rows
+        new = {c["callsign"]: c for c in entry.clients}
+        added = [c for cs, c in new.items() if cs not in old]
+        changed = [c for cs, c in new.items() if cs in old and old[cs] != c]
+        removed = [cs for cs in old if cs not in new]
+        self.rows = new
+        if not (added or changed or removed):
+            return None
+        self.seq += 1
+        return {"seq": self.seq, "base": self.seq - 1,
+                "added": added, "changed": changed, "removed": removed}
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {"seq": self.seq, "clients": list(self.rows.values())}